@@ -0,0 +1,103 @@
+"""
+Benchmark the robot broker's round-trip latency and throughput with concurrent clients.
+
+A broker serving the dummy backend runs in this process, and each client runs in its own
+process. Every client reads digital pins one round trip at a time, timing each, then sets
+servos in batches of `--batch` positions per message.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from robot.backends.base import ServoPosition  # noqa: E402
+from robot.backends.dummy import (  # noqa: E402
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.backends.remote.broker import RobotBroker  # noqa: E402
+from robot.backends.remote.client import RemoteRobot  # noqa: E402
+from robot.loop import LatencyHistogram  # noqa: E402
+
+
+def client(path: str, duration: float, batch: int) -> Tuple[List[float], int, float]:
+    """Run one client, returning its round-trip times, and the servo positions it set."""
+    remote = RemoteRobot(path)
+    remote.setup()
+    assembly = remote.servo_assemblies()["SERVO"]
+    round_trips = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        assembly.gpio_read_digital(0)
+        round_trips.append(time.perf_counter() - start)
+
+    positions = {servo: ServoPosition(50) for servo in range(batch)}
+    servo_sets = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        assembly.set_servos(positions)
+        servo_sets += batch
+    elapsed = time.perf_counter() - start
+    remote.close()
+    return round_trips, servo_sets, elapsed
+
+
+def measure(path: str, clients: int, duration: float, batch: int) -> None:
+    """Run some number of clients at once, and report their combined results."""
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.starmap(client, [(path, duration, batch)] * clients)
+    histogram = LatencyHistogram()
+    for round_trips, _, _ in results:
+        for round_trip in round_trips:
+            histogram.record(round_trip)
+    reads = sum(len(round_trips) for round_trips, _, _ in results)
+    servo_sets = sum(count / elapsed for _, count, elapsed in results)
+    print(
+        "{clients:2} clients: {reads:8.0f} reads/s (p50 <= {p50:6.1f} us, "
+        "p99 <= {p99:6.1f} us), {servo_sets:9.0f} batched servo sets/s".format(
+            clients=clients,
+            reads=reads / duration,
+            p50=histogram.percentile(50) * 1e6,
+            p99=histogram.percentile(99) * 1e6,
+            servo_sets=servo_sets,
+        )
+    )
+
+
+def main(args: List[str]) -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=1.0)
+    parser.add_argument("--batch", type=int, default=16)
+    options = parser.parse_args(args)
+
+    backend = DummyRobot(
+        motor_boards={
+            "MOTOR": DummyMotorBoard([DummyMotorChannel() for _ in range(2)])
+        },
+        power_boards={"POWER": DummyPowerBoard()},
+        servo_assemblies={"SERVO": DummyServoAssembly(num_servos=options.batch)},
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "robot.sock")
+        with RobotBroker(backend, path):
+            for clients in options.clients:
+                measure(path, clients, options.duration, options.batch)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
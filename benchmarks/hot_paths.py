@@ -0,0 +1,396 @@
+"""
+Benchmark the frontend hot paths against the dummy backends.
+
+Each path is run against both the dummy backends and counting backends, which do nothing but
+count calls, so that the frontend's own overhead can be told apart from the backend's. For
+each, the time per operation is reported along with the bytes allocated per operation, as
+measured by `tracemalloc`.
+
+Results can be saved as a baseline with `--save`, and later compared against it with
+`--compare`, which exits non-zero if any path has regressed. Timings vary from run to run, so
+a path has only slowed down if its median time has grown by more than `--threshold` plus
+the spread of its timings in either run. Allocations hardly vary, so a path allocating more
+than `--bytes-threshold` extra bytes per operation, and more than 1% extra, has regressed too.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from robot import BRAKE, PinMode, Robot  # noqa: E402
+from robot.backends.base import (  # noqa: E402
+    BaseMotorBoard,
+    BaseMotorChannel,
+    BasePowerBoard,
+    BaseRobot,
+    BaseServoAssembly,
+    CommandResponse,
+    MotorPower,
+    ServoPosition,
+)
+from robot.backends.dummy import (  # noqa: E402
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+Operation = Callable[[], None]
+
+
+class CountingMotorChannel(BaseMotorChannel):
+    """Motor channel which only counts calls."""
+
+    def __init__(self) -> None:
+        """Construct, with no calls counted."""
+        self.calls = 0
+
+    def forwards(self, power: MotorPower) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def backwards(self, power: MotorPower) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def brake(self) -> None:
+        """Count a call."""
+        self.calls += 1
+
+
+class CountingMotorBoard(BaseMotorBoard):
+    """Motor board of counting channels."""
+
+    def __init__(self, num_channels: int = 2) -> None:
+        """Construct with a given number of channels."""
+        self._channels = [CountingMotorChannel() for _ in range(num_channels)]
+
+    def channels(self) -> Sequence[BaseMotorChannel]:
+        """Get the channels."""
+        return self._channels
+
+
+class CountingPowerBoard(BasePowerBoard):
+    """Power board which only counts calls."""
+
+    def __init__(self) -> None:
+        """Construct, with no calls counted."""
+        self.calls = 0
+
+    def enable_outputs(self) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def disable_outputs(self) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def wait_for_start_button(self) -> None:
+        """Count a call."""
+        self.calls += 1
+
+
+class CountingServoAssembly(BaseServoAssembly):
+    """Servo assembly which only counts calls, reading every pin as low."""
+
+    _RESPONSE = CommandResponse(message=b"", error=False)
+
+    def __init__(self, num_servos: int = 16, num_pins: int = 18) -> None:
+        """Construct with given numbers of servos and pins."""
+        self._num_servos = num_servos
+        self._num_pins = num_pins
+        self.calls = 0
+
+    def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Count a call."""
+        self.calls += 1
+        return self._RESPONSE
+
+    def num_servos(self) -> int:
+        """Get the number of servos."""
+        return self._num_servos
+
+    def set_servo(self, servo: int, position: Optional[ServoPosition]) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Count a call."""
+        self.calls += 1
+        return 0.0
+
+    def gpio_output_high(self, pin: int) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def gpio_output_low(self, pin: int) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def gpio_set_input(self, pin: int) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def gpio_set_input_pullup(self, pin: int) -> None:
+        """Count a call."""
+        self.calls += 1
+
+    def gpio_read_digital(self, pin: int) -> bool:
+        """Count a call."""
+        self.calls += 1
+        return False
+
+    def gpio_read_analogue(self, pin: int) -> float:
+        """Count a call."""
+        self.calls += 1
+        return 0.0
+
+    def gpio_num_pins(self) -> int:
+        """Get the number of pins."""
+        return self._num_pins
+
+
+def dummy_backend() -> BaseRobot:
+    """Build a dummy robot with one of each board."""
+    return DummyRobot(
+        motor_boards={
+            "MOTOR": DummyMotorBoard([DummyMotorChannel(), DummyMotorChannel()])
+        },
+        power_boards={"POWER": DummyPowerBoard()},
+        servo_assemblies={"SERVO": DummyServoAssembly()},
+    )
+
+
+def counting_backend() -> BaseRobot:
+    """Build a robot of counting boards, with one of each board."""
+    return DummyRobot(
+        motor_boards={"MOTOR": CountingMotorBoard()},
+        power_boards={"POWER": CountingPowerBoard()},
+        servo_assemblies={"SERVO": CountingServoAssembly()},
+    )
+
+
+BACKENDS: Mapping[str, Callable[[], BaseRobot]] = {
+    "dummy": dummy_backend,
+    "counting": counting_backend,
+}
+
+
+def operations(make_backend: Callable[[], BaseRobot]) -> Dict[str, Operation]:
+    """Get the operations to benchmark, each run against a fresh robot."""
+    robot = Robot(wait_for_start_button=False, backend=make_backend())
+    motor_board = robot.motor_boards["MOTOR"]
+    servo_board = robot.servo_boards["SERVO"]
+    servo = servo_board.servos[0]
+    pin = servo_board.gpios[2]
+    pin.mode = PinMode.INPUT
+    toggle = [False]
+
+    def motor_set_output() -> None:
+        # Alternate values so that writes aren't suppressed by the output cache
+        toggle[0] = not toggle[0]
+        motor_board.m0 = 0.5 if toggle[0] else -0.5
+
+    def motor_set_output_unchanged() -> None:
+        motor_board.m1 = BRAKE
+
+    def servo_set() -> None:
+        toggle[0] = not toggle[0]
+        servo.position = 0.5 if toggle[0] else -0.5
+
+    def gpio_read() -> None:
+        pin.read()
+
+    def direct_command() -> None:
+        servo_board.direct_command("ping", 1)
+
+    def robot_init() -> None:
+        Robot(wait_for_start_button=False, backend=make_backend())
+
+    return {
+        "motor_set_output": motor_set_output,
+        "motor_set_output_unchanged": motor_set_output_unchanged,
+        "servo_set": servo_set,
+        "gpio_read": gpio_read,
+        "direct_command": direct_command,
+        "robot_init": robot_init,
+    }
+
+
+def time_operation(operation: Operation, *, number: int, repeat: int) -> List[float]:
+    """Get the time per call of an operation, in nanoseconds, for each of several runs."""
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                operation()
+            samples.append((time.perf_counter_ns() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def spread(samples: Sequence[float]) -> float:
+    """Get the interquartile range of some timings, relative to their median."""
+    lower, _, upper = statistics.quantiles(samples, n=4)
+    return (upper - lower) / statistics.median(samples)
+
+
+def allocations(operation: Operation, *, number: int) -> float:
+    """Get the mean bytes allocated per call of an operation, including any freed again."""
+    operation()
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(number):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / number
+
+
+def calibrate(operation: Operation, *, target: float = 0.05) -> int:
+    """Find a number of calls of an operation taking roughly `target` seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= target / 10 or number >= 1 << 20:
+            return max(1, int(number * target / max(time.perf_counter() - start, 1e-9)))
+        number *= 2
+
+
+def run(
+    *, repeat: int, only: Optional[Sequence[str]] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Run every benchmark, keyed by 'backend:operation'.
+
+    Each result has the median ns/op, the spread of the ns/op timings, and bytes/op.
+    """
+    results = {}
+    for backend_name, make_backend in BACKENDS.items():
+        for name, operation in operations(make_backend).items():
+            key = "{backend}:{name}".format(backend=backend_name, name=name)
+            if only and not any(pattern in key for pattern in only):
+                continue
+            number = calibrate(operation)
+            samples = time_operation(operation, number=number, repeat=repeat)
+            results[key] = {
+                "ns_per_op": statistics.median(samples),
+                "ns_spread": spread(samples),
+                "bytes_per_op": allocations(operation, number=min(number, 1000)),
+            }
+    return results
+
+
+def compare(
+    results: Mapping[str, Mapping[str, float]],
+    baseline: Mapping[str, Mapping[str, float]],
+    threshold: float,
+    bytes_threshold: float,
+) -> List[str]:
+    """
+    Describe each benchmark which has regressed from the baseline.
+
+    A benchmark has regressed if it has slowed down by more than the threshold, plus the
+    larger spread of its timings, or allocates more than `bytes_threshold` extra bytes, and
+    more than 1% extra, per operation.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        previous = baseline[key]
+        change = result["ns_per_op"] / previous["ns_per_op"] - 1
+        noise = max(result["ns_spread"], previous.get("ns_spread", 0.0))
+        if change > threshold + noise:
+            regressions.append(
+                "{key} is {change:.1%} slower than the baseline (timings vary by "
+                "{noise:.1%})".format(key=key, change=change, noise=noise)
+            )
+        extra = result["bytes_per_op"] - previous["bytes_per_op"]
+        if extra > max(bytes_threshold, previous["bytes_per_op"] / 100):
+            regressions.append(
+                "{key} allocates {extra:.0f} more bytes per operation than the "
+                "baseline".format(key=key, extra=extra)
+            )
+    return regressions
+
+
+def main(args: List[str]) -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=21)
+    parser.add_argument("--only", action="append", help="only run matching benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="save results as the baseline"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="compare against the baseline"
+    )
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--bytes-threshold", type=float, default=16.0)
+    options = parser.parse_args(args)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if options.compare:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    results = run(repeat=options.repeat, only=options.only)
+    for key, result in results.items():
+        line = "{key:40} {ns:12.0f} ns/op +/-{spread:6.1%} {bytes:10.0f} B/op".format(
+            key=key,
+            ns=result["ns_per_op"],
+            spread=result["ns_spread"],
+            bytes=result["bytes_per_op"],
+        )
+        if key in baseline:
+            line += " {change:+7.1%}".format(
+                change=result["ns_per_op"] / baseline[key]["ns_per_op"] - 1
+            )
+        print(line)
+
+    if options.save:
+        with open(options.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if options.compare:
+        regressions = compare(
+            results, baseline, options.threshold, options.bytes_threshold
+        )
+        for regression in regressions:
+            print("Regression: {regression}".format(regression=regression))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""
+Benchmark cold `import robot` time.
+
+Each sample imports the package in a fresh interpreter, using `-X importtime` to measure only
+the import itself rather than interpreter startup. With `--max-ms`, exits non-zero if the
+median import time exceeds the limit, so it can be used to catch regressions.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str) -> float:
+    """Import a module in a fresh interpreter, returning the cumulative time in ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = (x.strip() for x in line.split("|"))
+        if name == module:
+            return int(cumulative_us) / 1000
+    raise RuntimeError("Module {} not seen in import timings".format(module))
+
+
+def main(args: List[str]) -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="robot")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None)
+    options = parser.parse_args(args)
+
+    samples = [measure_import(options.module) for _ in range(options.repeat)]
+    median = statistics.median(samples)
+    print(
+        "import {module}: median {median:.2f} ms, min {min:.2f} ms, max {max:.2f} ms".format(
+            module=options.module, median=median, min=min(samples), max=max(samples)
+        )
+    )
+
+    if options.max_ms is not None and median > options.max_ms:
+        print("Import time exceeds limit of {:.2f} ms".format(options.max_ms))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
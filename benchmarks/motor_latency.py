@@ -0,0 +1,61 @@
+"""
+Measure the live motor board backend's command-to-wire latency against the emulated board.
+
+Commands are made from the calling thread at a fixed rate, and the backend's latency
+histogram is reported: the time from each command being made to its frame being written.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from robot.backends.base import MotorPower  # noqa: E402
+from robot.backends.live.emulator import MotorBoardEmulator  # noqa: E402
+from robot.backends.live.motor import LiveMotorBoard  # noqa: E402
+
+
+def main(args: List[str]) -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--hz", type=float, default=1000)
+    options = parser.parse_args(args)
+
+    with MotorBoardEmulator() as emulator:
+        backend = LiveMotorBoard(emulator.port)
+        channel = backend.channels()[0]
+        call_time = 0.0
+        for n in range(options.count):
+            start = time.perf_counter()
+            channel.forwards(MotorPower((n % 100) / 100))
+            call_time += time.perf_counter() - start
+            time.sleep(1 / options.hz)
+        backend.flush()
+        backend.close()
+
+    latency = backend.latency
+    print(
+        "{count} commands in {frames} frames, mean call time {call:.1f} us".format(
+            count=options.count,
+            frames=backend.frames_sent,
+            call=call_time / options.count * 1e6,
+        )
+    )
+    print(
+        "command-to-wire latency: mean {mean:.1f} us, p50 <= {p50:.0f} us, "
+        "p99 <= {p99:.0f} us".format(
+            mean=latency.sum / latency.total * 1e6,
+            p50=latency.percentile(50) * 1e6,
+            p99=latency.percentile(99) * 1e6,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
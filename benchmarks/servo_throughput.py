@@ -0,0 +1,93 @@
+"""
+Benchmark live servo assembly command throughput against the Arduino emulator.
+
+The pipelined backend is compared with the same backend in blocking mode, in which every
+command waits for its response before the next is sent. The emulator delays each response by
+`--latency` seconds, to model the round trip over a real serial link.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from robot.backends.base import ServoPosition  # noqa: E402
+from robot.backends.live.emulator import ArduinoEmulator  # noqa: E402
+from robot.backends.live.servo import LiveServoAssembly  # noqa: E402
+
+
+def servo_sets(backend: LiveServoAssembly, count: int) -> None:
+    """Set servo positions, then wait for the board to have handled them."""
+    for n in range(count):
+        backend.set_servo(n % 16, ServoPosition(n % 101))
+    backend.gpio_read_digital(0)
+
+
+def digital_reads(backend: LiveServoAssembly, count: int) -> None:
+    """Read digital pins, keeping every read in flight at once where possible."""
+    if not backend.pipelined:
+        for n in range(count):
+            backend.gpio_read_digital(n % 18)
+        return
+    futures = [
+        backend.send_command([b"read", str(n % 18).encode("ascii")])
+        for n in range(count)
+    ]
+    for future in futures:
+        assert future is not None
+        future.result()
+
+
+def measure(
+    workload: Callable[[LiveServoAssembly, int], None],
+    *,
+    pipelined: bool,
+    latency: float,
+    count: int
+) -> float:
+    """Run a workload against a fresh emulator, returning commands per second."""
+    with ArduinoEmulator(latency=latency) as emulator:
+        backend = LiveServoAssembly(emulator.port, pipelined=pipelined, timeout=60)
+        try:
+            start = time.perf_counter()
+            workload(backend, count)
+            return count / (time.perf_counter() - start)
+        finally:
+            backend.close()
+
+
+def main(args: List[str]) -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--count", type=int, default=500)
+    options = parser.parse_args(args)
+
+    for name, workload in (
+        ("servo sets", servo_sets),
+        ("digital reads", digital_reads),
+    ):
+        blocking = measure(
+            workload, pipelined=False, latency=options.latency, count=options.count
+        )
+        pipelined = measure(
+            workload, pipelined=True, latency=options.latency, count=options.count
+        )
+        print(
+            "{name:15} blocking {blocking:9.0f} commands/s, "
+            "pipelined {pipelined:9.0f} commands/s ({speedup:.1f}x)".format(
+                name=name,
+                blocking=blocking,
+                pipelined=pipelined,
+                speedup=pipelined / blocking,
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
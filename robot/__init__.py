@@ -1,10 +1,40 @@
 """Robot API."""
 
-from robot.motor import MotorDriveSpecialState
-from robot.robot import Robot
-from robot.servo import CommandError, PinMode, PinValue
+import importlib
+from typing import Any, List
 
-BRAKE = MotorDriveSpecialState.BRAKE
-COAST = MotorDriveSpecialState.COAST
+# Names are resolved on first access, so that importing the package doesn't pull in every
+# frontend and backend module.
+_LAZY_NAMES = {
+    "BRAKE": ("robot.motor", "MotorDriveSpecialState.BRAKE"),
+    "COAST": ("robot.motor", "MotorDriveSpecialState.COAST"),
+    "Robot": ("robot.robot", "Robot"),
+    "CommandError": ("robot.servo", "CommandError"),
+    "Edge": ("robot.edges", "Edge"),
+    "PinMode": ("robot.servo", "PinMode"),
+    "PinValue": ("robot.servo", "PinValue"),
+}
 
-__all__ = ["BRAKE", "COAST", "Robot", "CommandError", "PinMode", "PinValue"]
+__all__ = ["BRAKE", "COAST", "Robot", "CommandError", "Edge", "PinMode", "PinValue"]
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve and cache a lazily-imported name."""
+    try:
+        module_name, path = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError(
+            "module {module!r} has no attribute {name!r}".format(
+                module=__name__, name=name
+            )
+        ) from None
+    value: Any = importlib.import_module(module_name)
+    for attribute in path.split("."):
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the module's attributes, including those not yet imported."""
+    return sorted(set(globals()) | set(__all__))
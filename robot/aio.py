@@ -0,0 +1,342 @@
+"""Asynchronous (asyncio) front-end API."""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
+
+from robot.backends.base import (
+    BaseAsyncMotorBoard,
+    BaseAsyncPowerBoard,
+    BaseAsyncRobot,
+    BaseAsyncServoAssembly,
+    BaseRobot,
+)
+from robot.backends.executor import ExecutorRobot
+from robot.motor import MotorBoard, MotorDriveSpecialState, MotorDriveState
+from robot.robot import Robot
+from robot.servo import CommandError, PinMode, PinValue, ServoBoard
+
+AsyncRobotType = TypeVar("AsyncRobotType", bound="AsyncRobot")
+
+
+class AsyncMotorBoard:
+    """Asynchronous motor board."""
+
+    def __init__(
+        self, serial: str, backend: BaseAsyncMotorBoard, num_channels: int
+    ) -> None:
+        """Construct by serial/backend and number of channels."""
+        self.serial = serial
+        self._backend = backend
+        self._channel_states: Dict[int, MotorDriveState] = {
+            n: MotorDriveSpecialState.COAST for n in range(num_channels)
+        }
+
+    @classmethod
+    async def create(
+        cls, serial: str, backend: BaseAsyncMotorBoard
+    ) -> "AsyncMotorBoard":
+        """Construct by serial/backend, interrogating the backend."""
+        return cls(serial, backend, await backend.num_channels())
+
+    def get_output(self, channel: int) -> MotorDriveState:
+        """Get the state of a motor channel."""
+        return self._channel_states[channel]
+
+    async def set_output(self, channel: int, state: MotorDriveState) -> None:
+        """Set the state of a motor channel."""
+        await self.set_outputs({channel: state})
+
+    async def set_outputs(self, states: Dict[int, MotorDriveState]) -> None:
+        """Set the states of several motor channels at once."""
+        commands = {}
+        for channel, state in states.items():
+            if channel not in self._channel_states:
+                raise ValueError(
+                    "No such motor channel: {channel}".format(channel=channel)
+                )
+            commands[channel] = MotorBoard._command_for_state(state)
+        self._channel_states.update(states)
+        await self._backend.apply_commands(commands)
+
+    @property
+    def m0(self) -> MotorDriveState:
+        """Motor channel 0 state."""
+        return self.get_output(0)
+
+    @property
+    def m1(self) -> MotorDriveState:
+        """Motor channel 1 state."""
+        return self.get_output(1)
+
+
+class AsyncPowerBoard:
+    """Asynchronous power board."""
+
+    def __init__(self, serial: str, backend: BaseAsyncPowerBoard) -> None:
+        """Construct by serial/backend."""
+        self.serial = serial
+        self._backend = backend
+
+    @classmethod
+    async def create(
+        cls, serial: str, backend: BaseAsyncPowerBoard
+    ) -> "AsyncPowerBoard":
+        """Construct by serial/backend, disabling the outputs."""
+        await backend.disable_outputs()
+        return cls(serial, backend)
+
+    async def wait_start(self) -> None:
+        """Wait for the start button to be pressed."""
+        await self._backend.wait_for_start_button()
+        await self._backend.enable_outputs()
+
+
+class AsyncGPIOPin:
+    """An individual GPIO pin, accessed asynchronously."""
+
+    def __init__(self, index: int, backend: BaseAsyncServoAssembly) -> None:
+        """
+        Construct internally.
+
+        This takes a pin index, and a backend.
+        """
+        self._index = index
+        self._backend = backend
+        self._mode = PinMode.INPUT
+
+    @property
+    def mode(self) -> PinMode:
+        """Get the pin's current mode."""
+        return self._mode
+
+    async def set_mode(self, new_mode: PinMode) -> None:
+        """Set the pin's mode."""
+        self._mode = new_mode
+        await {
+            PinMode.INPUT: self._backend.gpio_set_input,
+            PinMode.INPUT_PULLUP: self._backend.gpio_set_input_pullup,
+            PinMode.OUTPUT_HIGH: self._backend.gpio_output_high,
+            PinMode.OUTPUT_LOW: self._backend.gpio_output_low,
+        }[new_mode](self._index)
+
+    async def read(self) -> PinValue:
+        """Read the current digital value on the pin."""
+        if self._mode not in (PinMode.INPUT, PinMode.INPUT_PULLUP):
+            raise ValueError("Cannot read from this pin in output mode.")
+
+        return {False: PinValue.LOW, True: PinValue.HIGH}[
+            await self._backend.gpio_read_digital(self._index)
+        ]
+
+
+class AsyncServo:
+    """An individual servo output on an asynchronous servo board."""
+
+    def __init__(self, index: int, backend: BaseAsyncServoAssembly) -> None:
+        """Construct for internal use, from an index and a backend."""
+        self._index = index
+        self._backend = backend
+        self._position: Optional[float] = None
+
+    @property
+    def position(self) -> Optional[float]:
+        """Get the current position to which this servo is driven."""
+        return self._position
+
+    async def set_position(self, new_position: Optional[float]) -> None:
+        """Drive this servo to a new position."""
+        if new_position is None:
+            # We don't actually support setting to `None` alas
+            self._position = None
+            return
+        mapped_position = ServoBoard._position_for_value(new_position)
+        self._position = new_position
+        await self._backend.set_servos({self._index: mapped_position})
+
+
+class AsyncServoBoard:
+    """Asynchronous servo board."""
+
+    def __init__(
+        self,
+        serial: str,
+        backend: BaseAsyncServoAssembly,
+        *,
+        num_servos: int,
+        num_pins: int
+    ) -> None:
+        """Construct by serial/backend and numbers of servos and pins."""
+        self.serial = serial
+        self._backend = backend
+        self._num_pins = num_pins
+        self.servos = [AsyncServo(n, backend) for n in range(num_servos)]
+        self.gpios = [AsyncGPIOPin(n, backend) for n in range(num_pins)]
+
+    @classmethod
+    async def create(
+        cls, serial: str, backend: BaseAsyncServoAssembly
+    ) -> "AsyncServoBoard":
+        """Construct by serial/backend, interrogating the backend."""
+        num_servos = await backend.num_servos()
+        num_pins = await backend.gpio_num_pins()
+        return cls(serial, backend, num_servos=num_servos, num_pins=num_pins)
+
+    async def direct_command(self, *args: Iterable[Any]) -> str:
+        """
+        Issue a command directly to the Arduino.
+
+        The arguments are converted to strings and then encoded in UTF-8. The response is also
+        decoded as UTF-8.
+
+        In the event of an error response, `CommandError` is raised.
+        """
+        encoded_arguments = [str(x).encode("utf-8") for x in args]
+        response = await self._backend.direct_command(encoded_arguments)
+
+        if response.error:
+            raise CommandError(response.message.decode("utf-8"))
+
+        return response.message.decode("utf-8")
+
+    async def read_ultrasound(self, output_pin: int, input_pin: int) -> float:
+        """
+        Send out an ultrasound ping.
+
+        The ping is generated on `output_pin`, and we wait for an echo on `input_pin`. The time
+        between transmit and receive is returned, in seconds.
+        """
+        self._validate_pin(output_pin)
+        self._validate_pin(input_pin)
+        return await self._backend.ultrasound_pulse(output_pin, input_pin)
+
+    def _validate_pin(self, pin: int) -> None:
+        if pin < 0:
+            raise ValueError(
+                "Pin indices must be >= 0 (was given {pin})".format(pin=pin)
+            )
+        if pin >= self._num_pins:
+            raise ValueError(
+                "Pin indices must be < {num_pins} (was given {pin})".format(
+                    num_pins=self._num_pins, pin=pin
+                )
+            )
+
+
+Board = TypeVar("Board", AsyncMotorBoard, AsyncServoBoard)
+
+
+class AsyncRobot:
+    """
+    Main robot, for use from asyncio code.
+
+    Construct with `await AsyncRobot.create(...)`. Operations on different boards may be run
+    concurrently, for instance with `asyncio.gather`.
+    """
+
+    def __init__(
+        self,
+        *,
+        backend: BaseAsyncRobot,
+        power_board: AsyncPowerBoard,
+        motor_boards: Dict[str, AsyncMotorBoard],
+        servo_boards: Dict[str, AsyncServoBoard]
+    ) -> None:
+        """Construct from already-constructed boards; see `create`."""
+        self._backend = backend
+        self.power_board = power_board
+        self.motor_boards = motor_boards
+        self.servo_boards = servo_boards
+
+    @classmethod
+    async def create(
+        cls: Type[AsyncRobotType],
+        *,
+        wait_for_start_button: bool = True,
+        backend: Optional[Union[BaseAsyncRobot, BaseRobot]] = None
+    ) -> AsyncRobotType:
+        """
+        Set up the backend and construct the robot.
+
+        Synchronous backends are adapted to run on per-board worker threads. The boards are
+        interrogated concurrently.
+        """
+        if backend is None:
+            backend = Robot._get_default_backend()
+        if isinstance(backend, BaseRobot):
+            backend = ExecutorRobot(backend)
+
+        await backend.setup()
+
+        power_boards = backend.power_boards()
+        if len(power_boards) == 0:
+            raise RuntimeError("There is no power board connected.")
+        elif len(power_boards) > 1:
+            raise RuntimeError("There are multiple power boards connected.")
+        ((power_board_serial, power_board_backend),) = power_boards.items()
+
+        motor_serials = list(backend.motor_boards().keys())
+        servo_serials = list(backend.servo_assemblies().keys())
+        power_board, motor_boards, servo_boards = await asyncio.gather(
+            AsyncPowerBoard.create(power_board_serial, power_board_backend),
+            asyncio.gather(
+                *(
+                    AsyncMotorBoard.create(serial, board)
+                    for serial, board in backend.motor_boards().items()
+                )
+            ),
+            asyncio.gather(
+                *(
+                    AsyncServoBoard.create(serial, board)
+                    for serial, board in backend.servo_assemblies().items()
+                )
+            ),
+        )
+
+        robot = cls(
+            backend=backend,
+            power_board=power_board,
+            motor_boards=dict(zip(motor_serials, motor_boards)),
+            servo_boards=dict(zip(servo_serials, servo_boards)),
+        )
+
+        if wait_for_start_button:
+            await robot.power_board.wait_start()
+
+        return robot
+
+    async def close(self) -> None:
+        """Release the resources held by the backend."""
+        await self._backend.close()
+
+    async def __aenter__(self: AsyncRobotType) -> AsyncRobotType:
+        """Enter an `async with` block."""
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the robot on leaving an `async with` block."""
+        await self.close()
+
+    @property
+    def motor_board(self) -> AsyncMotorBoard:
+        """Get the one motor board, if there is just one."""
+        return self._only_board(list(self.motor_boards.values()), "motor")
+
+    @property
+    def servo_board(self) -> AsyncServoBoard:
+        """Get the one servo board, if there is just one."""
+        return self._only_board(list(self.servo_boards.values()), "servo")
+
+    @staticmethod
+    def _only_board(boards: List[Board], kind: str) -> Board:
+        if not boards:
+            raise RuntimeError(
+                "There are no {kind} boards connected.".format(kind=kind)
+            )
+        if len(boards) > 1:
+            raise RuntimeError(
+                "There are multiple {kind} boards connected, use `.{kind}_boards` "
+                "and index by serial number. Serial numbers: {serials}".format(
+                    kind=kind, serials=", ".join(x.serial for x in boards)
+                )
+            )
+        return boards[0]
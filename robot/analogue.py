@@ -0,0 +1,199 @@
+"""Background sampling of analogue GPIO inputs."""
+
+import abc
+import array
+import statistics
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+from robot.background import BackgroundTask
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of floats, overwriting the oldest values once full.
+
+    Values are held in a preallocated `array.array`, which can be viewed as a NumPy array
+    without copying using `as_numpy`.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Construct, empty, with a given capacity."""
+        if capacity < 1:
+            raise ValueError(
+                "Ring buffers must have a capacity of at least 1 (was given {capacity})".format(
+                    capacity=capacity
+                )
+            )
+        self._data = array.array("d", bytes(8 * capacity))
+        self._capacity = capacity
+        self._next = 0
+        self._length = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Get the maximum number of values held."""
+        return self._capacity
+
+    def __len__(self) -> int:
+        """Get the number of values currently held."""
+        return self._length
+
+    def append(self, value: float) -> None:
+        """Add a value, overwriting the oldest if the buffer is full."""
+        with self._lock:
+            self._data[self._next] = value
+            self._next = (self._next + 1) % self._capacity
+            if self._length < self._capacity:
+                self._length += 1
+
+    def clear(self) -> None:
+        """Discard all values."""
+        with self._lock:
+            self._next = 0
+            self._length = 0
+
+    def latest(self) -> float:
+        """Get the most recently added value."""
+        with self._lock:
+            if not self._length:
+                raise LookupError("Ring buffer is empty")
+            return self._data[self._next - 1]
+
+    def last(self, count: Optional[int] = None) -> List[float]:
+        """Get the most recent `count` values, or all values, oldest first."""
+        with self._lock:
+            if count is None or count > self._length:
+                count = self._length
+            end = self._next
+            start = end - count
+            if start >= 0:
+                return self._data[start:end].tolist()
+            return self._data[start:].tolist() + self._data[:end].tolist()
+
+    def as_numpy(self) -> "numpy.ndarray[Any, Any]":
+        """
+        View the underlying storage as a NumPy array, without copying.
+
+        The view is in storage order rather than chronological order: once the buffer has
+        wrapped, the oldest value is at index `start`. The view reflects subsequent appends.
+        """
+        import numpy
+
+        return numpy.frombuffer(self._data, dtype=numpy.float64)[: self._length]
+
+    @property
+    def start(self) -> int:
+        """Get the storage index of the oldest value."""
+        return self._next if self._length == self._capacity else 0
+
+    def mean(self, window: Optional[int] = None) -> float:
+        """Get the mean of the most recent `window` values, or of all values."""
+        return statistics.fmean(self._window(window))
+
+    def median(self, window: Optional[int] = None) -> float:
+        """Get the median of the most recent `window` values, or of all values."""
+        return statistics.median(self._window(window))
+
+    def min(self, window: Optional[int] = None) -> float:
+        """Get the minimum of the most recent `window` values, or of all values."""
+        return min(self._window(window))
+
+    def max(self, window: Optional[int] = None) -> float:
+        """Get the maximum of the most recent `window` values, or of all values."""
+        return max(self._window(window))
+
+    def _window(self, window: Optional[int]) -> List[float]:
+        values = self.last(window)
+        if not values:
+            raise LookupError("Ring buffer is empty")
+        return values
+
+
+class Sampler(BackgroundTask):
+    """
+    Samples a set of channels at a fixed rate on a background thread.
+
+    Subclasses take one sample of every channel at a time. Each channel's samples are held in
+    its own `RingBuffer`, alongside a buffer of the monotonic time at which each round of
+    samples was taken. Rounds missed by falling behind are skipped, and counted in
+    `overruns`.
+    """
+
+    def __init__(
+        self, channels: Iterable[int], *, rate: float, capacity: int, name: str
+    ) -> None:
+        """Construct, idle, for some channels, given the rate in Hz and the thread name."""
+        if rate <= 0:
+            raise ValueError(
+                "Sample rates must be > 0 (was given {rate})".format(rate=rate)
+            )
+        super().__init__(name)
+        self._period = 1.0 / rate
+        self._buffers: Dict[int, RingBuffer] = {
+            channel: RingBuffer(capacity) for channel in channels
+        }
+        self.timestamps = RingBuffer(capacity)
+        self.overruns = 0
+
+    @abc.abstractmethod
+    def _sample(self) -> Sequence[float]:
+        raise NotImplementedError
+
+    def sample_once(self) -> None:
+        """Take a single round of samples, on the calling thread."""
+        for buffer, value in zip(self._buffers.values(), self._sample()):
+            buffer.append(value)
+        self.timestamps.append(time.monotonic())
+
+    def _run(self) -> None:
+        for ticks in self._ticks(self._period):
+            self.overruns += ticks - 1
+            self.sample_once()
+
+
+class AnalogueSampler(Sampler):
+    """
+    Samples a set of analogue pins at a fixed rate on a background thread.
+
+    Each pin's samples are held in its own `RingBuffer`, available from `buffer`, alongside a
+    buffer of the monotonic time at which each round of samples was taken.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[int], float],
+        pins: Iterable[int],
+        *,
+        rate: float,
+        capacity: int = 1024
+    ) -> None:
+        """Construct, given a callable to read a pin, the pins, and the rate in Hz."""
+        super().__init__(pins, rate=rate, capacity=capacity, name="analogue-sampler")
+        self._read = read
+
+    @property
+    def pins(self) -> List[int]:
+        """Get the pins being sampled."""
+        return list(self._buffers)
+
+    def buffer(self, pin: int) -> RingBuffer:
+        """Get the buffer of samples for a pin."""
+        return self._buffers[pin]
+
+    def _sample(self) -> Sequence[float]:
+        return [self._read(pin) for pin in self._buffers]
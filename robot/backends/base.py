@@ -1,12 +1,25 @@
 """Base instances of robot backends."""
 
 import abc
-from typing import Iterable, Mapping, NewType, Optional, Sequence
+import enum
+from typing import Iterable, Mapping, NewType, Optional, Sequence, Tuple
 
 MotorPower = NewType("MotorPower", float)
 ServoPosition = NewType("ServoPosition", int)
 
 
+@enum.unique
+class MotorAction(enum.Enum):
+    """Primitive actions which a motor channel can be asked to perform."""
+
+    FORWARDS = "forwards"
+    BACKWARDS = "backwards"
+    BRAKE = "brake"
+
+
+MotorCommand = Tuple[MotorAction, MotorPower]
+
+
 class BaseMotorChannel(metaclass=abc.ABCMeta):
     """Abstract motor channel."""
 
@@ -25,6 +38,18 @@ class BaseMotorChannel(metaclass=abc.ABCMeta):
         """Short the motor channels together."""
         raise NotImplementedError
 
+    def apply(self, command: MotorCommand) -> None:
+        """Perform a primitive motor command on this channel."""
+        action, power = command
+        if action is MotorAction.FORWARDS:
+            self.forwards(power)
+        elif action is MotorAction.BACKWARDS:
+            self.backwards(power)
+        elif action is MotorAction.BRAKE:
+            self.brake()
+        else:
+            raise AssertionError("Unknown motor action: {action}".format(action=action))
+
 
 class BaseMotorBoard(metaclass=abc.ABCMeta):
     """Abstract motor board implementation."""
@@ -34,6 +59,17 @@ class BaseMotorBoard(metaclass=abc.ABCMeta):
         """Get all channels of this motor board."""
         raise NotImplementedError
 
+    def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """
+        Perform commands on several channels, keyed by channel index, at once.
+
+        Backends which can update multiple channels in one transfer should override this. The
+        default implementation falls back to commanding each channel in turn.
+        """
+        channels = self.channels()
+        for index, command in commands.items():
+            channels[index].apply(command)
+
 
 class BasePowerBoard(metaclass=abc.ABCMeta):
     """Abstract power board implementation."""
@@ -53,6 +89,15 @@ class BasePowerBoard(metaclass=abc.ABCMeta):
         """Await the start button being pressed."""
         raise NotImplementedError
 
+    def read_battery(self) -> Optional[Tuple[float, float]]:
+        """
+        Read the battery's voltage, in volts, and the current drawn from it, in amps.
+
+        Backends whose boards can measure the battery should override this. The default
+        implementation returns None, meaning that the measurements aren't available.
+        """
+        return None
+
 
 class CommandResponse(object):
     """A response to an Arduino command."""
@@ -70,7 +115,15 @@ class CommandResponse(object):
 
 
 class BaseServoAssembly(metaclass=abc.ABCMeta):
-    """Abstract servo assembly implementation."""
+    """
+    Abstract servo assembly implementation.
+
+    Frontend features such as analogue sampling call into the backend from background threads,
+    so implementations must serialise access to the hardware themselves.
+    """
+
+    bulk_digital_reads = False
+    """Whether `gpio_read_all_digital` reads every pin at once, rather than each in turn."""
 
     @abc.abstractmethod
     def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
@@ -87,6 +140,16 @@ class BaseServoAssembly(metaclass=abc.ABCMeta):
         """Set a given servo to some specified position, including undriven."""
         raise NotImplementedError
 
+    def set_servos(self, positions: Mapping[int, Optional[ServoPosition]]) -> None:
+        """
+        Set several servos, keyed by index, at once.
+
+        Backends which can update multiple servos in one command should override this. The
+        default implementation falls back to setting each servo in turn.
+        """
+        for servo, position in positions.items():
+            self.set_servo(servo, position)
+
     @abc.abstractmethod
     def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
         """
@@ -121,6 +184,16 @@ class BaseServoAssembly(metaclass=abc.ABCMeta):
         """Read a digital value from a GPIO pin."""
         raise NotImplementedError
 
+    def gpio_read_all_digital(self) -> Sequence[bool]:
+        """
+        Read the digital values of every GPIO pin, indexed by pin.
+
+        Backends which can read all pins in a single command should override this, and set
+        `bulk_digital_reads`. The default implementation falls back to reading each pin in
+        turn.
+        """
+        return [self.gpio_read_digital(pin) for pin in range(self.gpio_num_pins())]
+
     @abc.abstractmethod
     def gpio_read_analogue(self, pin: int) -> float:
         """Read an analogue value, in volts, from a given GPIO pin."""
@@ -154,3 +227,139 @@ class BaseRobot(metaclass=abc.ABCMeta):
     def servo_assemblies(self) -> Mapping[str, BaseServoAssembly]:
         """Get servo assemblies by ID."""
         raise NotImplementedError
+
+    def rescan(self) -> None:
+        """
+        Look for boards connected, disconnected or reset since the last scan.
+
+        Backends whose boards can come and go while running should override this, so that
+        the boards returned afterwards reflect what is connected. A board which has been reset
+        or re-enumerated should be returned as a new object under the same serial. The
+        default implementation does nothing, for backends whose boards are fixed at setup.
+        """
+
+
+class BaseAsyncMotorBoard(metaclass=abc.ABCMeta):
+    """Abstract asynchronous motor board implementation."""
+
+    @abc.abstractmethod
+    async def num_channels(self) -> int:
+        """Get the number of channels on this motor board."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """Perform commands on one or more channels, keyed by channel index."""
+        raise NotImplementedError
+
+
+class BaseAsyncPowerBoard(metaclass=abc.ABCMeta):
+    """Abstract asynchronous power board implementation."""
+
+    @abc.abstractmethod
+    async def enable_outputs(self) -> None:
+        """Drive the main outputs to the battery voltage."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def disable_outputs(self) -> None:
+        """Drop the main outputs back to high-impedance."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def wait_for_start_button(self) -> None:
+        """Await the start button being pressed."""
+        raise NotImplementedError
+
+
+class BaseAsyncServoAssembly(metaclass=abc.ABCMeta):
+    """Abstract asynchronous servo assembly implementation."""
+
+    @abc.abstractmethod
+    async def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Issue a direct, raw command."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def num_servos(self) -> int:
+        """Get the number of available servos."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set_servos(
+        self, positions: Mapping[int, Optional[ServoPosition]]
+    ) -> None:
+        """Set one or more servos, keyed by index, to specified positions."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """
+        Trigger an ultrasound detection with a given input and output pin pair.
+
+        The time delta is returned in seconds.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_output_high(self, pin: int) -> None:
+        """Drive a given GPIO pin to high output."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_output_low(self, pin: int) -> None:
+        """Drive a given GPIO pin to low output."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_set_input(self, pin: int) -> None:
+        """Set a given GPIO into high-impedance input mode."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_set_input_pullup(self, pin: int) -> None:
+        """Set a given GPIO into pulled-up input mode."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_read_digital(self, pin: int) -> bool:
+        """Read a digital value from a GPIO pin."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_read_analogue(self, pin: int) -> float:
+        """Read an analogue value, in volts, from a given GPIO pin."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def gpio_num_pins(self) -> int:
+        """Get the number of available GPIO pins."""
+        raise NotImplementedError
+
+
+class BaseAsyncRobot(metaclass=abc.ABCMeta):
+    """Abstract asynchronous robot implementation."""
+
+    @abc.abstractmethod
+    async def setup(self) -> None:
+        """Make all connections and start running."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def motor_boards(self) -> Mapping[str, BaseAsyncMotorBoard]:
+        """Get motor boards by ID."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def power_boards(self) -> Mapping[str, BaseAsyncPowerBoard]:
+        """Get power boards by ID."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def servo_assemblies(self) -> Mapping[str, BaseAsyncServoAssembly]:
+        """Get servo assemblies by ID."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release any resources held, such as worker threads."""
+        pass
@@ -1,5 +1,15 @@
 """Dummy (testing) implementations of robot backends."""
 
 from .motor import DummyMotorBoard, DummyMotorChannel
+from .power import DummyPowerBoard
+from .robot import DummyRobot, HotplugDummyRobot
+from .servo import DummyServoAssembly
 
-__all__ = ["DummyMotorBoard", "DummyMotorChannel"]
+__all__ = [
+    "DummyMotorBoard",
+    "DummyMotorChannel",
+    "DummyPowerBoard",
+    "DummyRobot",
+    "DummyServoAssembly",
+    "HotplugDummyRobot",
+]
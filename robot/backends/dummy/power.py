@@ -1,4 +1,6 @@
 """Dummy (testing) power board implementation."""
+from typing import Optional, Tuple
+
 from robot.backends.base import BasePowerBoard
 
 
@@ -6,8 +8,10 @@ class DummyPowerBoard(BasePowerBoard):
     """Testing power board."""
 
     def __init__(self) -> None:
-        """Initialise, with outputs disabled."""
+        """Initialise, with outputs disabled and a full battery."""
         self.outputs = False
+        self.voltage = 12.6
+        self.current = 0.0
 
     def enable_outputs(self) -> None:
         """Drive the outputs to high."""
@@ -20,3 +24,7 @@ class DummyPowerBoard(BasePowerBoard):
     def wait_for_start_button(self) -> None:
         """Do nothing in testing."""
         pass
+
+    def read_battery(self) -> Optional[Tuple[float, float]]:
+        """Get the preset battery voltage and current."""
+        return self.voltage, self.current
@@ -1,5 +1,6 @@
 """Dummy robot implementation."""
-from typing import Mapping
+import threading
+from typing import List, Mapping, Optional, Tuple, Union
 
 from robot.backends.base import (
     BaseMotorBoard,
@@ -15,14 +16,14 @@ class DummyRobot(BaseRobot):
     def __init__(
         self,
         *,
-        motor_boards: Mapping[str, BaseMotorBoard],
-        power_boards: Mapping[str, BasePowerBoard],
-        servo_assemblies: Mapping[str, BaseServoAssembly]
+        motor_boards: Optional[Mapping[str, BaseMotorBoard]] = None,
+        power_boards: Optional[Mapping[str, BasePowerBoard]] = None,
+        servo_assemblies: Optional[Mapping[str, BaseServoAssembly]] = None
     ) -> None:
-        """Construct given pre-set dicts of boards."""
-        self._motor_boards = dict(motor_boards)
-        self._power_boards = dict(power_boards)
-        self._servo_assemblies = dict(servo_assemblies)
+        """Construct given pre-set dicts of boards, defaulting to none."""
+        self._motor_boards = dict(motor_boards or {})
+        self._power_boards = dict(power_boards or {})
+        self._servo_assemblies = dict(servo_assemblies or {})
 
     def setup(self) -> None:
         """Null setup."""
@@ -39,3 +40,61 @@ class DummyRobot(BaseRobot):
     def servo_assemblies(self) -> Mapping[str, BaseServoAssembly]:
         """Get all servo assemblies."""
         return self._servo_assemblies
+
+
+DummyBoard = Union[BaseMotorBoard, BasePowerBoard, BaseServoAssembly]
+
+
+class HotplugDummyRobot(DummyRobot):
+    """
+    Dummy robot whose boards can be plugged in and unplugged while running.
+
+    As with real hardware, plugging and unplugging only takes effect on the next `rescan`.
+    Plugging in a new board under the serial of one already connected simulates that board
+    resetting.
+    """
+
+    def __init__(
+        self,
+        *,
+        motor_boards: Optional[Mapping[str, BaseMotorBoard]] = None,
+        power_boards: Optional[Mapping[str, BasePowerBoard]] = None,
+        servo_assemblies: Optional[Mapping[str, BaseServoAssembly]] = None
+    ) -> None:
+        """Construct given the boards connected initially, defaulting to none."""
+        super().__init__(
+            motor_boards=motor_boards,
+            power_boards=power_boards,
+            servo_assemblies=servo_assemblies,
+        )
+        self._lock = threading.Lock()
+        self._events: List[Tuple[str, Optional[DummyBoard]]] = []
+        self.rescans = 0
+
+    def plug(self, serial: str, board: DummyBoard) -> None:
+        """Connect a board with a given serial, as of the next rescan."""
+        if not isinstance(board, (BaseMotorBoard, BasePowerBoard, BaseServoAssembly)):
+            raise ValueError("Not a board: {board!r}".format(board=board))
+        with self._lock:
+            self._events.append((serial, board))
+
+    def unplug(self, serial: str) -> None:
+        """Disconnect the board with a given serial, as of the next rescan."""
+        with self._lock:
+            self._events.append((serial, None))
+
+    def rescan(self) -> None:
+        """Apply the boards plugged in and unplugged since the last scan."""
+        with self._lock:
+            events, self._events = self._events, []
+            self.rescans += 1
+        for serial, board in events:
+            self._motor_boards.pop(serial, None)
+            self._power_boards.pop(serial, None)
+            self._servo_assemblies.pop(serial, None)
+            if isinstance(board, BaseMotorBoard):
+                self._motor_boards[serial] = board
+            elif isinstance(board, BasePowerBoard):
+                self._power_boards[serial] = board
+            elif isinstance(board, BaseServoAssembly):
+                self._servo_assemblies[serial] = board
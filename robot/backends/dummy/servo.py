@@ -0,0 +1,81 @@
+"""Dummy (testing) servo assembly implementation."""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from robot.backends.base import BaseServoAssembly, CommandResponse, ServoPosition
+
+
+class DummyServoAssembly(BaseServoAssembly):
+    """Testing servo assembly."""
+
+    bulk_digital_reads = True
+
+    def __init__(
+        self,
+        *,
+        num_servos: int = 16,
+        num_pins: int = 18,
+        command_handler: Optional[Callable[[List[bytes]], CommandResponse]] = None
+    ) -> None:
+        """Construct with every servo undriven and every pin an input."""
+        self.servos: List[Optional[ServoPosition]] = [None] * num_servos
+        self.pin_modes = ["input"] * num_pins
+        self.digital_values = [False] * num_pins
+        self.analogue_values = [0.0] * num_pins
+        self.ultrasound_times: Dict[int, float] = {}
+        self.commands: List[List[bytes]] = []
+        self._command_handler = command_handler
+
+    def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Record the command, and pass it to the handler if there is one."""
+        arguments = list(args)
+        self.commands.append(arguments)
+        if self._command_handler is None:
+            return CommandResponse(message=b"", error=False)
+        return self._command_handler(arguments)
+
+    def num_servos(self) -> int:
+        """Get the number of servos we were constructed with."""
+        return len(self.servos)
+
+    def set_servo(self, servo: int, position: Optional[ServoPosition]) -> None:
+        """Record the new servo position."""
+        self.servos[servo] = position
+
+    def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Get the preset echo time for the input pin, defaulting to zero."""
+        return self.ultrasound_times.get(in_pin, 0.0)
+
+    def gpio_output_high(self, pin: int) -> None:
+        """Record that the pin is driven high."""
+        self.pin_modes[pin] = "output_high"
+        self.digital_values[pin] = True
+
+    def gpio_output_low(self, pin: int) -> None:
+        """Record that the pin is driven low."""
+        self.pin_modes[pin] = "output_low"
+        self.digital_values[pin] = False
+
+    def gpio_set_input(self, pin: int) -> None:
+        """Record that the pin is an input."""
+        self.pin_modes[pin] = "input"
+
+    def gpio_set_input_pullup(self, pin: int) -> None:
+        """Record that the pin is a pulled-up input."""
+        self.pin_modes[pin] = "input_pullup"
+
+    def gpio_read_digital(self, pin: int) -> bool:
+        """Get the preset digital value of the pin."""
+        return self.digital_values[pin]
+
+    def gpio_read_all_digital(self) -> Sequence[bool]:
+        """Get the preset digital values of all pins."""
+        return list(self.digital_values)
+
+    def gpio_read_analogue(self, pin: int) -> float:
+        """Get the preset analogue value of the pin."""
+        return self.analogue_values[pin]
+
+    def gpio_num_pins(self) -> int:
+        """Get the number of pins we were constructed with."""
+        return len(self.pin_modes)
@@ -0,0 +1,192 @@
+"""Adapters running synchronous backends asynchronously, on executor threads."""
+
+import asyncio
+import concurrent.futures
+import functools
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, TypeVar
+
+from robot.backends.base import (
+    BaseAsyncMotorBoard,
+    BaseAsyncPowerBoard,
+    BaseAsyncRobot,
+    BaseAsyncServoAssembly,
+    BaseMotorBoard,
+    BasePowerBoard,
+    BaseRobot,
+    BaseServoAssembly,
+    CommandResponse,
+    MotorCommand,
+    ServoPosition,
+)
+
+Result = TypeVar("Result")
+
+
+class _ExecutorAdapter:
+    """Common machinery for running backend calls on an executor."""
+
+    def __init__(self, executor: concurrent.futures.Executor) -> None:
+        self._executor = executor
+
+    async def _call(self, fn: Callable[..., Result], *args: Any) -> Result:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+
+class ExecutorMotorBoard(_ExecutorAdapter, BaseAsyncMotorBoard):
+    """Asynchronous adapter for a synchronous motor board."""
+
+    def __init__(
+        self, backend: BaseMotorBoard, executor: concurrent.futures.Executor
+    ) -> None:
+        """Wrap a synchronous backend, running its calls on the given executor."""
+        super().__init__(executor)
+        self._backend = backend
+
+    async def num_channels(self) -> int:
+        """Get the number of channels on this motor board."""
+        return len(await self._call(self._backend.channels))
+
+    async def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """Perform commands on one or more channels, keyed by channel index."""
+        await self._call(self._backend.apply_commands, dict(commands))
+
+
+class ExecutorPowerBoard(_ExecutorAdapter, BaseAsyncPowerBoard):
+    """Asynchronous adapter for a synchronous power board."""
+
+    def __init__(
+        self, backend: BasePowerBoard, executor: concurrent.futures.Executor
+    ) -> None:
+        """Wrap a synchronous backend, running its calls on the given executor."""
+        super().__init__(executor)
+        self._backend = backend
+
+    async def enable_outputs(self) -> None:
+        """Drive the main outputs to the battery voltage."""
+        await self._call(self._backend.enable_outputs)
+
+    async def disable_outputs(self) -> None:
+        """Drop the main outputs back to high-impedance."""
+        await self._call(self._backend.disable_outputs)
+
+    async def wait_for_start_button(self) -> None:
+        """Await the start button being pressed."""
+        await self._call(self._backend.wait_for_start_button)
+
+
+class ExecutorServoAssembly(_ExecutorAdapter, BaseAsyncServoAssembly):
+    """Asynchronous adapter for a synchronous servo assembly."""
+
+    def __init__(
+        self, backend: BaseServoAssembly, executor: concurrent.futures.Executor
+    ) -> None:
+        """Wrap a synchronous backend, running its calls on the given executor."""
+        super().__init__(executor)
+        self._backend = backend
+
+    async def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Issue a direct, raw command."""
+        return await self._call(self._backend.direct_command, list(args))
+
+    async def num_servos(self) -> int:
+        """Get the number of available servos."""
+        return await self._call(self._backend.num_servos)
+
+    async def set_servos(
+        self, positions: Mapping[int, Optional[ServoPosition]]
+    ) -> None:
+        """Set one or more servos, keyed by index, to specified positions."""
+        await self._call(self._backend.set_servos, dict(positions))
+
+    async def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Trigger an ultrasound detection with a given input and output pin pair."""
+        return await self._call(self._backend.ultrasound_pulse, out_pin, in_pin)
+
+    async def gpio_output_high(self, pin: int) -> None:
+        """Drive a given GPIO pin to high output."""
+        await self._call(self._backend.gpio_output_high, pin)
+
+    async def gpio_output_low(self, pin: int) -> None:
+        """Drive a given GPIO pin to low output."""
+        await self._call(self._backend.gpio_output_low, pin)
+
+    async def gpio_set_input(self, pin: int) -> None:
+        """Set a given GPIO into high-impedance input mode."""
+        await self._call(self._backend.gpio_set_input, pin)
+
+    async def gpio_set_input_pullup(self, pin: int) -> None:
+        """Set a given GPIO into pulled-up input mode."""
+        await self._call(self._backend.gpio_set_input_pullup, pin)
+
+    async def gpio_read_digital(self, pin: int) -> bool:
+        """Read a digital value from a GPIO pin."""
+        return await self._call(self._backend.gpio_read_digital, pin)
+
+    async def gpio_read_analogue(self, pin: int) -> float:
+        """Read an analogue value, in volts, from a given GPIO pin."""
+        return await self._call(self._backend.gpio_read_analogue, pin)
+
+    async def gpio_num_pins(self) -> int:
+        """Get the number of available GPIO pins."""
+        return await self._call(self._backend.gpio_num_pins)
+
+
+class ExecutorRobot(BaseAsyncRobot):
+    """
+    Asynchronous adapter for a synchronous robot backend.
+
+    Each board is given its own single worker thread, so calls to any one board are serialised
+    while calls to different boards proceed concurrently.
+    """
+
+    def __init__(self, backend: BaseRobot) -> None:
+        """Wrap a synchronous robot backend."""
+        self._backend = backend
+        self._executors: Dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+        self._motor_boards: Dict[str, BaseAsyncMotorBoard] = {}
+        self._power_boards: Dict[str, BaseAsyncPowerBoard] = {}
+        self._servo_assemblies: Dict[str, BaseAsyncServoAssembly] = {}
+
+    def _executor_for(self, serial: str) -> concurrent.futures.ThreadPoolExecutor:
+        if serial not in self._executors:
+            self._executors[serial] = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="board-{serial}".format(serial=serial)
+            )
+        return self._executors[serial]
+
+    async def setup(self) -> None:
+        """Set up the wrapped backend, and wrap each of its boards."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._backend.setup)
+
+        self._motor_boards = {
+            serial: ExecutorMotorBoard(backend, self._executor_for(serial))
+            for serial, backend in self._backend.motor_boards().items()
+        }
+        self._power_boards = {
+            serial: ExecutorPowerBoard(backend, self._executor_for(serial))
+            for serial, backend in self._backend.power_boards().items()
+        }
+        self._servo_assemblies = {
+            serial: ExecutorServoAssembly(backend, self._executor_for(serial))
+            for serial, backend in self._backend.servo_assemblies().items()
+        }
+
+    def motor_boards(self) -> Mapping[str, BaseAsyncMotorBoard]:
+        """Get motor boards by ID."""
+        return self._motor_boards
+
+    def power_boards(self) -> Mapping[str, BaseAsyncPowerBoard]:
+        """Get power boards by ID."""
+        return self._power_boards
+
+    def servo_assemblies(self) -> Mapping[str, BaseAsyncServoAssembly]:
+        """Get servo assemblies by ID."""
+        return self._servo_assemblies
+
+    async def close(self) -> None:
+        """Shut down the worker threads."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+        self._executors.clear()
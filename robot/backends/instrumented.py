@@ -0,0 +1,457 @@
+"""Instrumenting wrappers observing, and recording metrics about, every backend call."""
+
+import abc
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from robot.backends.base import (
+    BaseMotorBoard,
+    BaseMotorChannel,
+    BasePowerBoard,
+    BaseRobot,
+    BaseServoAssembly,
+    CommandResponse,
+    MotorCommand,
+    MotorPower,
+    ServoPosition,
+)
+from robot.loop import LatencyHistogram
+
+Result = TypeVar("Result")
+Board = TypeVar("Board")
+Wrapper = TypeVar("Wrapper")
+
+
+class MethodMetrics:
+    """Metrics for calls to a single method of a single board."""
+
+    def __init__(self) -> None:
+        """Construct, empty."""
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+
+class CallObserver(metaclass=abc.ABCMeta):
+    """
+    Something told about each call made to an instrumented backend.
+
+    Instrumented backends call straight through, without observing, while `enabled` is false.
+    """
+
+    enabled = True
+
+    @abc.abstractmethod
+    def observe(
+        self,
+        serial: str,
+        method: str,
+        args: Tuple[Any, ...],
+        result: Any,
+        error: Optional[BaseException],
+        start: float,
+        duration: float,
+    ) -> None:
+        """
+        Observe a completed call.
+
+        `start` is the `time.perf_counter` time at which the call was made, and `duration`
+        its length in seconds. If the call raised, `error` is the exception and `result` is
+        None.
+        """
+        raise NotImplementedError
+
+
+class BackendMetrics(CallObserver):
+    """
+    Call counts, error counts and latency histograms for backend calls.
+
+    Metrics are kept per board serial and per method. Recording can be paused by setting
+    `enabled` to false, in which case instrumented backends call straight through.
+    """
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        """Construct, empty."""
+        self.enabled = enabled
+        self._methods: Dict[Tuple[str, str], MethodMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, serial: str, method: str, duration: float, *, error: bool = False
+    ) -> None:
+        """Record a single call."""
+        key = (serial, method)
+        with self._lock:
+            metrics = self._methods.get(key)
+            if metrics is None:
+                metrics = self._methods[key] = MethodMetrics()
+            metrics.calls += 1
+            if error:
+                metrics.errors += 1
+            metrics.latency.record(duration)
+
+    def observe(
+        self,
+        serial: str,
+        method: str,
+        args: Tuple[Any, ...],
+        result: Any,
+        error: Optional[BaseException],
+        start: float,
+        duration: float,
+    ) -> None:
+        """Record a completed call."""
+        self.record(serial, method, duration, error=error is not None)
+
+    def reset(self) -> None:
+        """Discard all recorded metrics."""
+        with self._lock:
+            self._methods.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get a copy of the metrics, keyed by board serial and then by method.
+
+        Each method has its `calls` and `errors` counts, the `total_seconds` spent in calls,
+        and `buckets`, a list of (upper bound in seconds, count) for non-empty buckets of the
+        latency histogram.
+        """
+        with self._lock:
+            snapshot: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (serial, method), metrics in sorted(self._methods.items()):
+                snapshot.setdefault(serial, {})[method] = {
+                    "calls": metrics.calls,
+                    "errors": metrics.errors,
+                    "total_seconds": metrics.latency.sum,
+                    "buckets": metrics.latency.buckets(),
+                }
+            return snapshot
+
+    def prometheus_text(self, prefix: str = "robot_backend") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            # Copied so that they can be rendered outside the lock
+            items = [
+                (serial, method, _copy_metrics(metrics))
+                for (serial, method), metrics in sorted(self._methods.items())
+            ]
+
+        lines: List[str] = []
+
+        def header(name: str, kind: str, description: str) -> None:
+            lines.append(
+                "# HELP {prefix}_{name} {description}".format(
+                    prefix=prefix, name=name, description=description
+                )
+            )
+            lines.append(
+                "# TYPE {prefix}_{name} {kind}".format(
+                    prefix=prefix, name=name, kind=kind
+                )
+            )
+
+        def sample(
+            name: str, serial: str, method: str, value: Any, le: str = ""
+        ) -> None:
+            labels = 'board="{board}",method="{method}"'.format(
+                board=_escape_label(serial), method=_escape_label(method)
+            )
+            if le:
+                labels += ',le="{le}"'.format(le=le)
+            lines.append(
+                "{prefix}_{name}{{{labels}}} {value}".format(
+                    prefix=prefix, name=name, labels=labels, value=value
+                )
+            )
+
+        header("calls_total", "counter", "Number of backend calls.")
+        for serial, method, metrics in items:
+            sample("calls_total", serial, method, metrics.calls)
+
+        header("errors_total", "counter", "Number of backend calls which raised.")
+        for serial, method, metrics in items:
+            sample("errors_total", serial, method, metrics.errors)
+
+        header("call_duration_seconds", "histogram", "Duration of backend calls.")
+        bounds = LatencyHistogram.bounds()
+        for serial, method, metrics in items:
+            calls, latency = metrics.calls, metrics.latency
+            cumulative = 0
+            # The final bucket also holds anything longer, so is only reported as +Inf
+            for bound, count in zip(bounds[:-1], latency.counts[:-1]):
+                cumulative += count
+                sample(
+                    "call_duration_seconds_bucket",
+                    serial,
+                    method,
+                    cumulative,
+                    repr(bound),
+                )
+            sample("call_duration_seconds_bucket", serial, method, calls, "+Inf")
+            sample("call_duration_seconds_sum", serial, method, repr(latency.sum))
+            sample("call_duration_seconds_count", serial, method, calls)
+
+        return "\n".join(lines) + "\n"
+
+
+def _copy_metrics(metrics: MethodMetrics) -> MethodMetrics:
+    copy = MethodMetrics()
+    copy.calls = metrics.calls
+    copy.errors = metrics.errors
+    copy.latency.counts = list(metrics.latency.counts)
+    copy.latency.total = metrics.latency.total
+    copy.latency.sum = metrics.latency.sum
+    return copy
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Instrumented:
+    """Common machinery for timing calls to a wrapped backend."""
+
+    def __init__(self, serial: str, observer: CallObserver) -> None:
+        self._serial = serial
+        self._observer = observer
+
+    def _call(self, method: str, fn: Callable[..., Result], *args: Any) -> Result:
+        observer = self._observer
+        if not observer.enabled:
+            return fn(*args)
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            observer.observe(
+                self._serial, method, args, None, e, start, time.perf_counter() - start
+            )
+            raise
+        observer.observe(
+            self._serial, method, args, result, None, start, time.perf_counter() - start
+        )
+        return result
+
+
+class InstrumentedMotorChannel(_Instrumented, BaseMotorChannel):
+    """Motor channel wrapper observing each call."""
+
+    def __init__(
+        self,
+        backend: BaseMotorChannel,
+        serial: str,
+        index: int,
+        observer: CallObserver,
+    ) -> None:
+        """Wrap a channel, given the serial of its board and its index."""
+        super().__init__(serial, observer)
+        self._backend = backend
+        self._prefix = "channel{index}.".format(index=index)
+
+    def forwards(self, power: MotorPower) -> None:
+        """Drive the channel forwards with a given power."""
+        self._call(self._prefix + "forwards", self._backend.forwards, power)
+
+    def backwards(self, power: MotorPower) -> None:
+        """Drive the channel backwards with a given power."""
+        self._call(self._prefix + "backwards", self._backend.backwards, power)
+
+    def brake(self) -> None:
+        """Short the motor channels together."""
+        self._call(self._prefix + "brake", self._backend.brake)
+
+    def apply(self, command: MotorCommand) -> None:
+        """Perform a primitive motor command on this channel."""
+        self._call(self._prefix + command[0].value, self._backend.apply, command)
+
+
+class InstrumentedMotorBoard(_Instrumented, BaseMotorBoard):
+    """Motor board wrapper observing each call."""
+
+    def __init__(
+        self, backend: BaseMotorBoard, serial: str, observer: CallObserver
+    ) -> None:
+        """Wrap a motor board, given its serial."""
+        super().__init__(serial, observer)
+        self._backend = backend
+        self._channels: Optional[List[BaseMotorChannel]] = None
+
+    def channels(self) -> Sequence[BaseMotorChannel]:
+        """Get all channels of this motor board."""
+        channels = self._call("channels", self._backend.channels)
+        if self._channels is None or len(self._channels) != len(channels):
+            self._channels = [
+                InstrumentedMotorChannel(channel, self._serial, index, self._observer)
+                for index, channel in enumerate(channels)
+            ]
+        return self._channels
+
+    def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """Perform commands on several channels at once."""
+        self._call("apply_commands", self._backend.apply_commands, commands)
+
+
+class InstrumentedPowerBoard(_Instrumented, BasePowerBoard):
+    """Power board wrapper observing each call."""
+
+    def __init__(
+        self, backend: BasePowerBoard, serial: str, observer: CallObserver
+    ) -> None:
+        """Wrap a power board, given its serial."""
+        super().__init__(serial, observer)
+        self._backend = backend
+
+    def enable_outputs(self) -> None:
+        """Drive the main outputs to the battery voltage."""
+        self._call("enable_outputs", self._backend.enable_outputs)
+
+    def disable_outputs(self) -> None:
+        """Drop the main outputs back to high-impedance."""
+        self._call("disable_outputs", self._backend.disable_outputs)
+
+    def wait_for_start_button(self) -> None:
+        """Await the start button being pressed."""
+        self._call("wait_for_start_button", self._backend.wait_for_start_button)
+
+    def read_battery(self) -> Optional[Tuple[float, float]]:
+        """Read the battery's voltage and current, if the board can measure them."""
+        return self._call("read_battery", self._backend.read_battery)
+
+
+class InstrumentedServoAssembly(_Instrumented, BaseServoAssembly):
+    """Servo assembly wrapper observing each call."""
+
+    def __init__(
+        self, backend: BaseServoAssembly, serial: str, observer: CallObserver
+    ) -> None:
+        """Wrap a servo assembly, given its serial."""
+        super().__init__(serial, observer)
+        self._backend = backend
+        self.bulk_digital_reads = backend.bulk_digital_reads
+
+    def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Issue a direct, raw command."""
+        return self._call("direct_command", self._backend.direct_command, args)
+
+    def num_servos(self) -> int:
+        """Get the number of available servos."""
+        return self._call("num_servos", self._backend.num_servos)
+
+    def set_servo(self, servo: int, position: Optional[ServoPosition]) -> None:
+        """Set a given servo to some specified position, including undriven."""
+        self._call("set_servo", self._backend.set_servo, servo, position)
+
+    def set_servos(self, positions: Mapping[int, Optional[ServoPosition]]) -> None:
+        """Set several servos at once."""
+        self._call("set_servos", self._backend.set_servos, positions)
+
+    def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Trigger an ultrasound detection with a given input and output pin pair."""
+        return self._call(
+            "ultrasound_pulse", self._backend.ultrasound_pulse, out_pin, in_pin
+        )
+
+    def gpio_output_high(self, pin: int) -> None:
+        """Drive a given GPIO pin to high output."""
+        self._call("gpio_output_high", self._backend.gpio_output_high, pin)
+
+    def gpio_output_low(self, pin: int) -> None:
+        """Drive a given GPIO pin to low output."""
+        self._call("gpio_output_low", self._backend.gpio_output_low, pin)
+
+    def gpio_set_input(self, pin: int) -> None:
+        """Set a given GPIO into high-impedance input mode."""
+        self._call("gpio_set_input", self._backend.gpio_set_input, pin)
+
+    def gpio_set_input_pullup(self, pin: int) -> None:
+        """Set a given GPIO into pulled-up input mode."""
+        self._call("gpio_set_input_pullup", self._backend.gpio_set_input_pullup, pin)
+
+    def gpio_read_digital(self, pin: int) -> bool:
+        """Read a digital value from a GPIO pin."""
+        return self._call("gpio_read_digital", self._backend.gpio_read_digital, pin)
+
+    def gpio_read_all_digital(self) -> Sequence[bool]:
+        """Read the digital values of every GPIO pin."""
+        return self._call("gpio_read_all_digital", self._backend.gpio_read_all_digital)
+
+    def gpio_read_analogue(self, pin: int) -> float:
+        """Read an analogue value, in volts, from a given GPIO pin."""
+        return self._call("gpio_read_analogue", self._backend.gpio_read_analogue, pin)
+
+    def gpio_num_pins(self) -> int:
+        """Get the number of available GPIO pins."""
+        return self._call("gpio_num_pins", self._backend.gpio_num_pins)
+
+
+class InstrumentedRobot(BaseRobot):
+    """
+    Robot wrapper observing every call to every board.
+
+    Boards are wrapped as they are returned, keeping the same wrapper for each serial.
+    """
+
+    def __init__(self, backend: BaseRobot, observer: CallObserver) -> None:
+        """Wrap a robot backend, telling the given observer about each call."""
+        self._backend = backend
+        self.observer = observer
+        self._motor_boards: Dict[str, InstrumentedMotorBoard] = {}
+        self._power_boards: Dict[str, InstrumentedPowerBoard] = {}
+        self._servo_assemblies: Dict[str, InstrumentedServoAssembly] = {}
+
+    def setup(self) -> None:
+        """Make all connections and start running."""
+        self._backend.setup()
+
+    def rescan(self) -> None:
+        """Look for boards connected, disconnected or reset since the last scan."""
+        self._backend.rescan()
+
+    def motor_boards(self) -> Mapping[str, BaseMotorBoard]:
+        """Get motor boards by ID."""
+        return self._wrap(
+            self._backend.motor_boards(), self._motor_boards, InstrumentedMotorBoard
+        )
+
+    def power_boards(self) -> Mapping[str, BasePowerBoard]:
+        """Get power boards by ID."""
+        return self._wrap(
+            self._backend.power_boards(), self._power_boards, InstrumentedPowerBoard
+        )
+
+    def servo_assemblies(self) -> Mapping[str, BaseServoAssembly]:
+        """Get servo assemblies by ID."""
+        return self._wrap(
+            self._backend.servo_assemblies(),
+            self._servo_assemblies,
+            InstrumentedServoAssembly,
+        )
+
+    def _wrap(
+        self,
+        boards: Mapping[str, Board],
+        wrappers: Dict[str, Wrapper],
+        wrapper_type: Callable[[Board, str, CallObserver], Wrapper],
+    ) -> Dict[str, Wrapper]:
+        for serial in list(wrappers):
+            if (
+                serial not in boards
+                or getattr(wrappers[serial], "_backend") is not boards[serial]
+            ):
+                del wrappers[serial]
+        for serial, board in boards.items():
+            if serial not in wrappers:
+                wrappers[serial] = wrapper_type(board, serial, self.observer)
+        return dict(wrappers)
@@ -0,0 +1 @@
+"""Backends for the real hardware, connected over serial."""
@@ -0,0 +1,255 @@
+"""Emulations of the boards, on pseudo-terminals, for testing the live backends."""
+
+import abc
+import heapq
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from robot.backends.base import CommandResponse, MotorAction, MotorCommand, MotorPower
+from robot.backends.live.motor import decode_frames
+
+_PIN_MODES = {b"input", b"input_pullup", b"output_high", b"output_low"}
+
+Device = TypeVar("Device", bound="PtyDevice")
+
+
+class PtyDevice(metaclass=abc.ABCMeta):
+    """
+    A device served on one end of a pseudo-terminal, on a background thread.
+
+    Connect to the other end at `port`. Subclasses handle the data received.
+    """
+
+    def __init__(self) -> None:
+        """Open the pseudo-terminal."""
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._interrupt_read, self._interrupt_write = os.pipe()
+        self._threads = [
+            threading.Thread(
+                target=self._serve,
+                name="{cls}-server".format(cls=type(self).__name__),
+                daemon=True,
+            )
+        ]
+
+    def start(self) -> None:
+        """Start serving."""
+        for thread in self._threads:
+            thread.start()
+
+    def close(self) -> None:
+        """Stop serving, disconnecting the other end."""
+        os.write(self._interrupt_write, b"\0")
+        for thread in self._threads:
+            thread.join()
+        for fd in (
+            self._master,
+            self._slave,
+            self._interrupt_read,
+            self._interrupt_write,
+        ):
+            os.close(fd)
+
+    def __enter__(self: "Device") -> "Device":
+        """Start serving on entering a `with` block."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop serving on leaving a `with` block."""
+        self.close()
+
+    def _serve(self) -> None:
+        while True:
+            readable, _, _ = select.select([self._master, self._interrupt_read], [], [])
+            if self._interrupt_read in readable:
+                return
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            self._received(data, time.monotonic())
+
+    @abc.abstractmethod
+    def _received(self, data: bytes, arrived: float) -> None:
+        raise NotImplementedError
+
+    def _write(self, data: bytes) -> None:
+        os.write(self._master, data)
+
+
+class ArduinoEmulator(PtyDevice):
+    """
+    Emulated servo board Arduino, speaking the live servo assembly protocol.
+
+    Each response is sent `latency` seconds after its command arrives,
+    to model the round trip over a real serial link, but later commands are still processed
+    in the meantime.
+
+    State is held in the same attributes as `DummyServoAssembly`, and commands the emulator
+    doesn't recognise are passed to `command_handler` if one is given.
+    """
+
+    def __init__(
+        self,
+        *,
+        num_servos: int = 16,
+        num_pins: int = 18,
+        latency: float = 0.0,
+        command_handler: Optional[Callable[[List[bytes]], CommandResponse]] = None
+    ) -> None:
+        """Construct with every servo undriven and every pin an input."""
+        self.servos: List[Optional[int]] = [None] * num_servos
+        self.pin_modes = ["input"] * num_pins
+        self.digital_values = [False] * num_pins
+        self.analogue_values = [0.0] * num_pins
+        self.ultrasound_times: Dict[int, float] = {}
+        self.commands: List[List[bytes]] = []
+        self.latency = latency
+        self._command_handler = command_handler
+        self._buffer = bytearray()
+        self._outbox: List[Tuple[float, int, bytes]] = []
+        self._outbox_ready = threading.Condition()
+        self._sent = 0
+        self._stopping = False
+        super().__init__()
+        self._threads.append(
+            threading.Thread(
+                target=self._send, name="arduino-emulator-writer", daemon=True
+            )
+        )
+
+    def close(self) -> None:
+        """Stop serving, disconnecting the other end."""
+        with self._outbox_ready:
+            self._stopping = True
+            self._outbox_ready.notify()
+        super().close()
+
+    def _received(self, data: bytes, arrived: float) -> None:
+        buffer = self._buffer
+        buffer += data
+        end = buffer.find(b"\n")
+        while end >= 0:
+            line = bytes(buffer[:end])
+            next_line = end + 1
+            del buffer[:next_line]
+            response = self._handle_line(line)
+            if response is not None:
+                self._queue(arrived + self.latency, response)
+            end = buffer.find(b"\n")
+
+    def _queue(self, due: float, response: bytes) -> None:
+        with self._outbox_ready:
+            # The counter keeps responses due at the same time in order
+            heapq.heappush(self._outbox, (due, self._sent, response))
+            self._sent += 1
+            self._outbox_ready.notify()
+
+    def _send(self) -> None:
+        while True:
+            with self._outbox_ready:
+                while not self._stopping and not self._outbox:
+                    self._outbox_ready.wait()
+                if self._stopping:
+                    return
+                due, _, response = self._outbox[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._outbox_ready.wait(delay)
+                    continue
+                heapq.heappop(self._outbox)
+            try:
+                self._write(response)
+            except OSError:
+                return
+
+    def _handle_line(self, line: bytes) -> Optional[bytes]:
+        tag, *args = line.rstrip(b"\r").split(b" ")
+        self.commands.append(args)
+        try:
+            response = self._execute(args)
+        except (IndexError, ValueError) as e:
+            response = CommandResponse(message=str(e).encode("utf-8"), error=True)
+        if tag == b"*" and not response.error:
+            return None
+        return b"%s %s %s\n" % (tag, b"-" if response.error else b"+", response.message)
+
+    def _execute(self, args: List[bytes]) -> CommandResponse:
+        command = args[0]
+        if command == b"info":
+            message = b"%d %d" % (len(self.servos), len(self.pin_modes))
+        elif command == b"servo":
+            servo = int(args[1])
+            self.servos[servo] = None if args[2] == b"off" else int(args[2])
+            message = b""
+        elif command == b"mode":
+            pin, mode = int(args[1]), args[2]
+            if mode not in _PIN_MODES:
+                raise ValueError("Unknown pin mode")
+            self.pin_modes[pin] = mode.decode("ascii")
+            if mode in (b"output_high", b"output_low"):
+                self.digital_values[pin] = mode == b"output_high"
+            message = b""
+        elif command == b"read":
+            message = b"1" if self.digital_values[int(args[1])] else b"0"
+        elif command == b"readall":
+            message = b"".join(b"1" if value else b"0" for value in self.digital_values)
+        elif command == b"analogue":
+            message = repr(self.analogue_values[int(args[1])]).encode("ascii")
+        elif command == b"ultrasound":
+            echo_time = self.ultrasound_times.get(int(args[2]), 0.0)
+            message = repr(echo_time).encode("ascii")
+        elif self._command_handler is not None:
+            return self._command_handler(args)
+        else:
+            raise ValueError("Unknown command")
+        return CommandResponse(message=message, error=False)
+
+
+class MotorBoardEmulator(PtyDevice):
+    """
+    Emulated motor board, receiving the live motor board's frames.
+
+    Every valid frame received is kept in `frames`, and applied to `outputs`, which holds the
+    latest command for each channel. Frames with bad checksums are counted in
+    `corrupt_frames`.
+    """
+
+    def __init__(self, *, num_channels: int = 2) -> None:
+        """Construct with every channel stopped."""
+        self.outputs: List[MotorCommand] = [
+            (MotorAction.FORWARDS, MotorPower(0.0))
+        ] * num_channels
+        self.frames: List[Dict[int, MotorCommand]] = []
+        self.corrupt_frames = 0
+        self._buffer = bytearray()
+        self._received_frame = threading.Condition()
+        super().__init__()
+
+    def wait_for_frames(self, count: int, timeout: Optional[float] = None) -> bool:
+        """Wait until at least a given number of frames have arrived."""
+        with self._received_frame:
+            return self._received_frame.wait_for(
+                lambda: len(self.frames) >= count, timeout
+            )
+
+    def _received(self, data: bytes, arrived: float) -> None:
+        self._buffer += data
+        frames, corrupt = decode_frames(self._buffer)
+        with self._received_frame:
+            for frame in frames:
+                for channel, command in frame.items():
+                    self.outputs[channel] = command
+            self.frames.extend(frames)
+            self.corrupt_frames += len(corrupt)
+            self._received_frame.notify_all()
@@ -0,0 +1,236 @@
+"""
+Live motor board backend.
+
+Commands are sent to the board in binary frames, each holding the latest command for any
+number of channels:
+
+* the start byte, `FRAME_START`,
+* the number of commands,
+* for each command, packed as `COMMAND`: the channel, the action, and the power in
+  thousandths,
+* a checksum: the XOR of every byte of the commands.
+"""
+
+import functools
+import struct
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from robot.backends.base import (
+    BaseMotorBoard,
+    BaseMotorChannel,
+    MotorAction,
+    MotorCommand,
+    MotorPower,
+)
+from robot.backends.live.serial import SerialPort
+from robot.loop import LatencyHistogram
+
+FRAME_START = 0xA5
+COMMAND = struct.Struct("<BBH")
+
+_ACTION_CODES = {
+    MotorAction.FORWARDS: 0,
+    MotorAction.BACKWARDS: 1,
+    MotorAction.BRAKE: 2,
+}
+_ACTIONS = {code: action for action, code in _ACTION_CODES.items()}
+
+
+def _checksum(data: bytes) -> int:
+    return functools.reduce(int.__xor__, data, 0)
+
+
+def encode_frame(commands: Mapping[int, MotorCommand]) -> bytes:
+    """Encode commands for several channels into a single frame."""
+    body = b"".join(
+        COMMAND.pack(
+            channel, _ACTION_CODES[action], int(round(min(abs(power), 1.0) * 1000))
+        )
+        for channel, (action, power) in commands.items()
+    )
+    return bytes((FRAME_START, len(commands))) + body + bytes((_checksum(body),))
+
+
+def decode_frames(
+    data: bytearray,
+) -> Tuple[List[Dict[int, MotorCommand]], List[bytes]]:
+    """
+    Decode, and remove, every complete frame at the start of a buffer.
+
+    Returns the commands in each valid frame, and the raw bytes of any frames with bad
+    checksums or unknown actions. Bytes before a start byte are discarded.
+    """
+    frames: List[Dict[int, MotorCommand]] = []
+    corrupt: List[bytes] = []
+    while data:
+        start = data.find(FRAME_START)
+        if start < 0:
+            data.clear()
+            break
+        del data[:start]
+        if len(data) < 2:
+            break
+        body_end = 2 + data[1] * COMMAND.size
+        if len(data) <= body_end:
+            break
+        body = bytes(data[2:body_end])
+        frame_end = body_end + 1
+        commands = list(COMMAND.iter_unpack(body))
+        if _checksum(body) != data[body_end] or any(
+            code not in _ACTIONS for _, code, _ in commands
+        ):
+            corrupt.append(bytes(data[:frame_end]))
+        else:
+            frames.append(
+                {
+                    channel: (_ACTIONS[code], MotorPower(power / 1000))
+                    for channel, code, power in commands
+                }
+            )
+        del data[:frame_end]
+    return frames, corrupt
+
+
+class _Batch:
+    """Commands to be sent together in one frame."""
+
+    def __init__(self, queued: float) -> None:
+        self.commands: Dict[int, MotorCommand] = {}
+        self.queued = queued
+        self.sealed = False
+
+
+class LiveMotorChannel(BaseMotorChannel):
+    """A channel of a live motor board."""
+
+    def __init__(self, board: "LiveMotorBoard", index: int) -> None:
+        """Construct for internal use."""
+        self._board = board
+        self._index = index
+
+    def forwards(self, power: MotorPower) -> None:
+        """Drive the channel forwards with a given power."""
+        self._board.apply_commands({self._index: (MotorAction.FORWARDS, power)})
+
+    def backwards(self, power: MotorPower) -> None:
+        """Drive the channel backwards with a given power."""
+        self._board.apply_commands({self._index: (MotorAction.BACKWARDS, power)})
+
+    def brake(self) -> None:
+        """Short the motor channels together."""
+        self._board.apply_commands({self._index: (MotorAction.BRAKE, MotorPower(0.0))})
+
+    def apply(self, command: MotorCommand) -> None:
+        """Perform a primitive motor command on this channel."""
+        self._board.apply_commands({self._index: command})
+
+
+class LiveMotorBoard(BaseMotorBoard):
+    """
+    Motor board connected over serial, written to from a dedicated I/O thread.
+
+    Commands only update the desired state of each channel and return immediately. The I/O
+    thread sends the latest state of every changed channel in a single frame, so commands
+    made while a frame is being written are coalesced into the next.
+
+    A brake is never coalesced away: commands made after a brake are sent in a later frame
+    than the brake itself.
+
+    The time from each command being made to its frame being written is recorded in
+    `latency`.
+    """
+
+    def __init__(
+        self, port: str, *, num_channels: int = 2, baudrate: int = 115200
+    ) -> None:
+        """Connect to the board on a given serial port."""
+        self._port = SerialPort(port, baudrate=baudrate)
+        self._channels = [LiveMotorChannel(self, n) for n in range(num_channels)]
+        self._batches: List[_Batch] = []
+        self._changed = threading.Condition()
+        self._stopping = False
+        self._writing = False
+        self.error: Optional[BaseException] = None
+        self.latency = LatencyHistogram()
+        self.last_latency: Optional[float] = None
+        self.frames_sent = 0
+        self.commands_coalesced = 0
+
+        self._writer = threading.Thread(
+            target=self._write_frames, name="motor-board-writer", daemon=True
+        )
+        self._writer.start()
+
+    def channels(self) -> Sequence[BaseMotorChannel]:
+        """Get all channels of this motor board."""
+        return self._channels
+
+    def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """Queue commands on several channels, to be sent in the same frame."""
+        for channel in commands:
+            if not 0 <= channel < len(self._channels):
+                raise ValueError(
+                    "No such motor channel: {channel}".format(channel=channel)
+                )
+        with self._changed:
+            if self.error is not None:
+                raise RuntimeError("Motor board writer failed") from self.error
+            if self._stopping:
+                raise RuntimeError("Motor board is closed")
+            if not self._batches or self._batches[-1].sealed:
+                self._batches.append(_Batch(time.perf_counter()))
+            batch = self._batches[-1]
+            for channel, command in commands.items():
+                if channel in batch.commands:
+                    self.commands_coalesced += 1
+                batch.commands[channel] = command
+                if command[0] is MotorAction.BRAKE:
+                    batch.sealed = True
+            self._changed.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every queued command to be written, returning whether they were."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: not (self._batches or self._writing) or self.error is not None,
+                timeout,
+            )
+            return not (self._batches or self._writing) and self.error is None
+
+    def close(self) -> None:
+        """Write any queued commands, then disconnect from the board."""
+        with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+        self._writer.join()
+        self._port.close()
+
+    def _write_frames(self) -> None:
+        while True:
+            with self._changed:
+                while not self._batches and not self._stopping:
+                    self._changed.wait()
+                if not self._batches:
+                    return
+                batch = self._batches.pop(0)
+                self._writing = True
+
+            try:
+                self._port.write(encode_frame(batch.commands))
+            except OSError as e:
+                with self._changed:
+                    self.error = e
+                    self._batches.clear()
+                    self._writing = False
+                    self._changed.notify_all()
+                return
+
+            latency = time.perf_counter() - batch.queued
+            with self._changed:
+                self.latency.record(latency)
+                self.last_latency = latency
+                self.frames_sent += 1
+                self._writing = False
+                self._changed.notify_all()
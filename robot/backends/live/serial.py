@@ -0,0 +1,64 @@
+"""Raw serial port access."""
+
+import os
+import select
+import termios
+import threading
+import tty
+
+
+class SerialPort:
+    """
+    A serial port, opened in raw mode.
+
+    Reads block until data arrives or `interrupt` is called, so that a reader thread can be
+    stopped before the port is closed.
+    """
+
+    def __init__(self, path: str, *, baudrate: int = 115200) -> None:
+        """Open the serial device at a given path."""
+        speed = getattr(termios, "B{baudrate}".format(baudrate=baudrate), None)
+        if speed is None:
+            raise ValueError(
+                "Unsupported baud rate: {baudrate}".format(baudrate=baudrate)
+            )
+        self._fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        try:
+            tty.setraw(self._fd)
+            attributes = termios.tcgetattr(self._fd)
+            attributes[4] = attributes[5] = speed
+            termios.tcsetattr(self._fd, termios.TCSANOW, attributes)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._interrupt_read, self._interrupt_write = os.pipe()
+        self._write_lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        """Write all of some data."""
+        view = memoryview(data)
+        with self._write_lock:
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+
+    def read(self) -> bytes:
+        """Read whatever data is available, returning b"" if interrupted or disconnected."""
+        readable, _, _ = select.select([self._fd, self._interrupt_read], [], [])
+        if self._interrupt_read in readable:
+            return b""
+        try:
+            return os.read(self._fd, 4096)
+        except OSError:
+            # Disconnection shows up as EIO
+            return b""
+
+    def interrupt(self) -> None:
+        """Make current and future reads return immediately."""
+        os.write(self._interrupt_write, b"\0")
+
+    def close(self) -> None:
+        """Close the port, once nothing is reading from it."""
+        os.close(self._fd)
+        os.close(self._interrupt_read)
+        os.close(self._interrupt_write)
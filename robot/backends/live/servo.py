@@ -0,0 +1,275 @@
+"""
+Live servo assembly backend, for the Arduino-based servo board.
+
+Commands are lines of space-separated arguments, each prefixed with a sequence number. The
+board answers each with a line starting with the same sequence number, then "+" for success
+or "-" for failure, then the response message:
+
+    > 17 read 3
+    < 17 + 1
+
+Responses are matched to requests by their sequence numbers, so any number of commands can be
+in flight at once. Commands prefixed with "*" rather than a sequence number aren't answered,
+unless they fail, in which case the board sends a "*" response reporting the error.
+"""
+
+import concurrent.futures
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from robot.backends.base import BaseServoAssembly, CommandResponse, ServoPosition
+from robot.backends.live.serial import SerialPort
+
+UNACKNOWLEDGED = b"*"
+
+
+def _encode_servo_position(position: Optional[ServoPosition]) -> bytes:
+    return b"off" if position is None else str(position).encode("ascii")
+
+
+class LiveServoAssembly(BaseServoAssembly):
+    """
+    Servo assembly connected over serial, with pipelined commands.
+
+    Calls from different threads are written back to back without waiting for each other's
+    responses, and `send_command` allows a single thread to have several commands in flight.
+    Servo positions are set without waiting for acknowledgement; any errors they cause are
+    counted in `unacknowledged_errors`.
+
+    With `pipelined` false, every command instead waits for its response before the next is
+    sent, including servo sets.
+    """
+
+    bulk_digital_reads = True
+
+    def __init__(
+        self,
+        port: str,
+        *,
+        baudrate: int = 115200,
+        timeout: float = 1.0,
+        pipelined: bool = True
+    ) -> None:
+        """Connect to the board on a given serial port."""
+        self._port = SerialPort(port, baudrate=baudrate)
+        self._timeout = timeout
+        self._pipelined = pipelined
+        self._lock = threading.Lock()
+        self._blocking_lock = threading.Lock()
+        self._sequence = 0
+        self._pending: Dict[int, "concurrent.futures.Future[CommandResponse]"] = {}
+        self._disconnected = False
+        self.unacknowledged_errors = 0
+        self.last_unacknowledged_error: Optional[bytes] = None
+
+        self._reader = threading.Thread(
+            target=self._read_responses, name="servo-assembly-reader", daemon=True
+        )
+        self._reader.start()
+
+        num_servos, num_pins = self._call(b"info").split()
+        self._num_servos = int(num_servos)
+        self._num_pins = int(num_pins)
+
+    @property
+    def pipelined(self) -> bool:
+        """Get whether commands are pipelined, rather than each waiting for a response."""
+        return self._pipelined
+
+    def close(self) -> None:
+        """Disconnect from the board, failing any commands still awaiting responses."""
+        self._port.interrupt()
+        self._reader.join()
+        self._port.close()
+
+    def send_command(
+        self, args: Iterable[bytes], *, acknowledge: bool = True
+    ) -> "Optional[concurrent.futures.Future[CommandResponse]]":
+        """
+        Send a command without waiting for its response.
+
+        Returns a future for the response, or None if `acknowledge` is false, in which case
+        the board won't respond at all unless the command fails.
+        """
+        command = b" ".join(self._validate_argument(arg) for arg in args)
+        if not command:
+            raise ValueError("Commands must have at least one argument")
+
+        if not acknowledge:
+            self._port.write(UNACKNOWLEDGED + b" " + command + b"\n")
+            return None
+
+        future: "concurrent.futures.Future[CommandResponse]" = (
+            concurrent.futures.Future()
+        )
+        with self._lock:
+            if self._disconnected:
+                raise RuntimeError("Servo assembly is disconnected")
+            # Sequence numbers wrap, skipping 0
+            self._sequence = self._sequence % 0xFFFF + 1
+            sequence = self._sequence
+            self._pending[sequence] = future
+            self._port.write(str(sequence).encode("ascii") + b" " + command + b"\n")
+        return future
+
+    @staticmethod
+    def _validate_argument(arg: bytes) -> bytes:
+        if not arg or any(char in arg for char in b" \r\n"):
+            raise ValueError(
+                "Command arguments must be non-empty and without whitespace "
+                "(was given {arg!r})".format(arg=arg)
+            )
+        return arg
+
+    def _wait(
+        self, future: "concurrent.futures.Future[CommandResponse]"
+    ) -> CommandResponse:
+        try:
+            return future.result(self._timeout)
+        except concurrent.futures.TimeoutError:
+            with self._lock:
+                for sequence, pending in list(self._pending.items()):
+                    if pending is future:
+                        del self._pending[sequence]
+            raise RuntimeError(
+                "No response from servo assembly within {timeout} seconds".format(
+                    timeout=self._timeout
+                )
+            )
+
+    def _request(self, args: Sequence[bytes]) -> CommandResponse:
+        if self._pipelined:
+            future = self.send_command(args)
+            assert future is not None
+            return self._wait(future)
+        with self._blocking_lock:
+            future = self.send_command(args)
+            assert future is not None
+            return self._wait(future)
+
+    def _call(self, *args: bytes) -> bytes:
+        response = self._request(args)
+        if response.error:
+            raise RuntimeError(
+                "Servo assembly error: {message}".format(
+                    message=response.message.decode("utf-8", "replace")
+                )
+            )
+        return response.message
+
+    def _send_unacknowledged(self, *args: bytes) -> None:
+        if self._pipelined:
+            self.send_command(args, acknowledge=False)
+        else:
+            self._call(*args)
+
+    def _read_responses(self) -> None:
+        buffer = bytearray()
+        while True:
+            data = self._port.read()
+            if not data:
+                break
+            buffer += data
+            end = buffer.find(b"\n")
+            while end >= 0:
+                self._handle_response(bytes(buffer[:end]).rstrip(b"\r"))
+                next_line = end + 1
+                del buffer[:next_line]
+                end = buffer.find(b"\n")
+
+        with self._lock:
+            self._disconnected = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(RuntimeError("Servo assembly disconnected"))
+
+    def _handle_response(self, line: bytes) -> None:
+        parts = line.split(b" ", 2)
+        if len(parts) < 2:
+            return
+        tag, status = parts[0], parts[1]
+        message = parts[2] if len(parts) == 3 else b""
+        if tag == UNACKNOWLEDGED:
+            if status == b"-":
+                self.unacknowledged_errors += 1
+                self.last_unacknowledged_error = message
+            return
+        try:
+            sequence = int(tag)
+        except ValueError:
+            return
+        with self._lock:
+            # Responses to commands which have timed out are dropped
+            future = self._pending.pop(sequence, None)
+        if future is not None:
+            future.set_result(CommandResponse(message=message, error=status == b"-"))
+
+    def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Issue a direct, raw command."""
+        return self._request(list(args))
+
+    def num_servos(self) -> int:
+        """Get the number of available servos."""
+        return self._num_servos
+
+    def set_servo(self, servo: int, position: Optional[ServoPosition]) -> None:
+        """Set a given servo to some specified position, including undriven."""
+        self._send_unacknowledged(
+            b"servo", str(servo).encode("ascii"), _encode_servo_position(position)
+        )
+
+    def set_servos(self, positions: Mapping[int, Optional[ServoPosition]]) -> None:
+        """Set several servos at once, in a single write."""
+        if not self._pipelined:
+            super().set_servos(positions)
+            return
+        lines: List[bytes] = [
+            UNACKNOWLEDGED
+            + b" servo %d %s\n" % (servo, _encode_servo_position(position))
+            for servo, position in positions.items()
+        ]
+        self._port.write(b"".join(lines))
+
+    def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Trigger an ultrasound detection with a given input and output pin pair."""
+        return float(
+            self._call(
+                b"ultrasound", str(out_pin).encode("ascii"), str(in_pin).encode("ascii")
+            )
+        )
+
+    def _set_pin_mode(self, pin: int, mode: bytes) -> None:
+        self._call(b"mode", str(pin).encode("ascii"), mode)
+
+    def gpio_output_high(self, pin: int) -> None:
+        """Drive a given GPIO pin to high output."""
+        self._set_pin_mode(pin, b"output_high")
+
+    def gpio_output_low(self, pin: int) -> None:
+        """Drive a given GPIO pin to low output."""
+        self._set_pin_mode(pin, b"output_low")
+
+    def gpio_set_input(self, pin: int) -> None:
+        """Set a given GPIO into high-impedance input mode."""
+        self._set_pin_mode(pin, b"input")
+
+    def gpio_set_input_pullup(self, pin: int) -> None:
+        """Set a given GPIO into pulled-up input mode."""
+        self._set_pin_mode(pin, b"input_pullup")
+
+    def gpio_read_digital(self, pin: int) -> bool:
+        """Read a digital value from a GPIO pin."""
+        return self._call(b"read", str(pin).encode("ascii")) == b"1"
+
+    def gpio_read_all_digital(self) -> Sequence[bool]:
+        """Read the digital values of every GPIO pin, in a single command."""
+        return [value == ord("1") for value in self._call(b"readall")]
+
+    def gpio_read_analogue(self, pin: int) -> float:
+        """Read an analogue value, in volts, from a given GPIO pin."""
+        return float(self._call(b"analogue", str(pin).encode("ascii")))
+
+    def gpio_num_pins(self) -> int:
+        """Get the number of available GPIO pins."""
+        return self._num_pins
@@ -0,0 +1,747 @@
+"""
+Recording of every backend call to a binary file, and replay of such recordings.
+
+A recording starts with an 8-byte magic number, followed by a sequence of records. Each
+record has a fixed header, packed as `RECORD_HEADER`, of:
+
+* the record type: a method definition, a completed call, a call which raised, or a call
+  which could not be recorded,
+* the method ID, assigned by the definition records,
+* the start time of the call in seconds since the recording began, and its duration,
+* the length of the payload which follows.
+
+Definition records' payloads are the board serial and method name, UTF-8 encoded and
+separated by a NUL. Call records' payloads are the encoded arguments followed by the encoded
+result; for calls which raised, the result is the exception's type name and message. Calls
+whose arguments or result are of a type which can't be encoded are recorded with just the
+reason, so that the recording still holds every call in order.
+
+Robot-level calls, such as `setup` and board discovery, are recorded against the board
+serial "". Discovering servo assemblies records whether each does bulk digital reads, so
+that replays poll the same way.
+
+Records are flushed to the file regularly, so a recording cut short by a crash keeps all
+but its last few calls, and is read up to its last complete record.
+"""
+
+import mmap
+import struct
+import threading
+import time
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from robot.backends.base import (
+    BaseMotorBoard,
+    BaseMotorChannel,
+    BasePowerBoard,
+    BaseRobot,
+    BaseServoAssembly,
+    CommandResponse,
+    MotorAction,
+    MotorCommand,
+    MotorPower,
+    ServoPosition,
+)
+from robot.backends.instrumented import CallObserver, InstrumentedRobot
+
+MAGIC = b"RBTREC01"
+RECORD_HEADER = struct.Struct("<BHdfI")
+
+RECORD_DEFINE = 0
+RECORD_CALL = 1
+RECORD_ERROR = 2
+RECORD_UNRECORDABLE = 3
+
+FLUSH_INTERVAL = 0.5
+FLUSH_SIZE = 1 << 16
+
+ROBOT_SERIAL = ""
+
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+_MOTOR_ACTIONS = list(MotorAction)
+_HEADER_PLACEHOLDER = bytes(RECORD_HEADER.size)
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    """Append the encoding of a value to a buffer."""
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        out += b"i"
+        out += _INT.pack(value)
+    elif isinstance(value, float):
+        out += b"d"
+        out += _FLOAT.pack(value)
+    elif isinstance(value, bytes):
+        out += b"b"
+        out += _LENGTH.pack(len(value))
+        out += value
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        out += b"s"
+        out += _LENGTH.pack(len(encoded))
+        out += encoded
+    elif isinstance(value, MotorAction):
+        out += b"a"
+        out.append(_MOTOR_ACTIONS.index(value))
+    elif isinstance(value, CommandResponse):
+        out += b"c"
+        _encode(value.message, out)
+        _encode(value.error, out)
+    elif isinstance(value, tuple):
+        out += b"t"
+        out += _LENGTH.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, Mapping):
+        out += b"m"
+        out += _LENGTH.pack(len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, Iterable):
+        items = list(value)
+        out += b"l"
+        out += _LENGTH.pack(len(items))
+        for item in items:
+            _encode(item, out)
+    else:
+        raise TypeError(
+            "Cannot record values of type {type}".format(type=type(value).__name__)
+        )
+
+
+def _decode(data: Any, offset: int) -> Tuple[Any, int]:
+    """Decode a value from a buffer at an offset, returning it and the following offset."""
+    tag = chr(data[offset])
+    offset += 1
+    if tag == "N":
+        return None, offset
+    elif tag == "T":
+        return True, offset
+    elif tag == "F":
+        return False, offset
+    elif tag == "i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    elif tag == "d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    elif tag in ("b", "s"):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        end = offset + length
+        raw = bytes(data[offset:end])
+        return (raw if tag == "b" else raw.decode("utf-8")), end
+    elif tag == "a":
+        return _MOTOR_ACTIONS[data[offset]], offset + 1
+    elif tag == "c":
+        message, offset = _decode(data, offset)
+        error, offset = _decode(data, offset)
+        return CommandResponse(message=message, error=error), offset
+    elif tag in ("t", "l", "m"):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        items = []
+        for _ in range(length * 2 if tag == "m" else length):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        if tag == "t":
+            return tuple(items), offset
+        elif tag == "m":
+            return dict(zip(items[::2], items[1::2])), offset
+        return items, offset
+    raise ValueError("Corrupt recording: unknown tag {tag!r}".format(tag=tag))
+
+
+class Recorder(CallObserver):
+    """Observer appending every call to a recording file."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        flush_interval: float = FLUSH_INTERVAL,
+        flush_size: int = FLUSH_SIZE
+    ) -> None:
+        """
+        Start a new recording at the given path, replacing any existing file.
+
+        Records are flushed to the file once the given interval, in seconds, has passed since
+        the last flush, or once the given number of bytes are waiting.
+        """
+        self._file: IO[bytes] = open(path, "wb")
+        self._file.write(MAGIC)
+        self._methods: Dict[Tuple[str, str], int] = {}
+        self._buffer = bytearray()
+        self._epoch = time.perf_counter()
+        self._lock = threading.Lock()
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+        self._unflushed = 0
+        self._last_flush = self._epoch
+
+    def observe(
+        self,
+        serial: str,
+        method: str,
+        args: Tuple[Any, ...],
+        result: Any,
+        error: Optional[BaseException],
+        start: float,
+        duration: float,
+    ) -> None:
+        """Append a completed call to the recording."""
+        if method == "channels":
+            # Channel objects can't be recorded, but their number is what matters
+            result = len(result)
+        with self._lock:
+            method_id = self._methods.get((serial, method))
+            if method_id is None:
+                method_id = self._define(serial, method)
+
+            buffer = self._buffer
+            del buffer[:]
+            buffer += _HEADER_PLACEHOLDER
+            try:
+                _encode(args, buffer)
+                if error is None:
+                    record_type = RECORD_CALL
+                    _encode(result, buffer)
+                else:
+                    record_type = RECORD_ERROR
+                    _encode((type(error).__name__, str(error)), buffer)
+            except TypeError as e:
+                # The call has already happened, so record that it can't be replayed
+                # rather than failing it
+                buffer[:] = _HEADER_PLACEHOLDER
+                record_type = RECORD_UNRECORDABLE
+                _encode(str(e), buffer)
+            RECORD_HEADER.pack_into(
+                buffer,
+                0,
+                record_type,
+                method_id,
+                start - self._epoch,
+                duration,
+                len(buffer) - RECORD_HEADER.size,
+            )
+            self._file.write(buffer)
+            self._unflushed += len(buffer)
+            end = start + duration
+            if (
+                self._unflushed >= self._flush_size
+                or end - self._last_flush >= self._flush_interval
+            ):
+                self._flush(end)
+
+    def _define(self, serial: str, method: str) -> int:
+        method_id = len(self._methods)
+        self._methods[serial, method] = method_id
+        payload = "{serial}\0{method}".format(serial=serial, method=method).encode(
+            "utf-8"
+        )
+        self._file.write(
+            RECORD_HEADER.pack(RECORD_DEFINE, method_id, 0.0, 0.0, len(payload))
+        )
+        self._file.write(payload)
+        self._unflushed += RECORD_HEADER.size + len(payload)
+        return method_id
+
+    def _flush(self, now: float) -> None:
+        self._file.flush()
+        self._unflushed = 0
+        self._last_flush = now
+
+    def flush(self) -> None:
+        """Flush buffered records to the file."""
+        with self._lock:
+            self._flush(time.perf_counter())
+
+    def close(self) -> None:
+        """Finish the recording."""
+        with self._lock:
+            self._file.close()
+
+
+class RecordingRobot(InstrumentedRobot):
+    """Robot wrapper recording every call to the robot and its boards to a file."""
+
+    def __init__(self, backend: BaseRobot, path: str) -> None:
+        """Wrap a robot backend, recording to the given path."""
+        self.recorder = Recorder(path)
+        super().__init__(backend, self.recorder)
+
+    def _record_robot_call(
+        self,
+        method: str,
+        fn: Callable[[], Any],
+        summarise: Callable[[Any], Any] = list,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.recorder.observe(
+                ROBOT_SERIAL, method, (), None, e, start, time.perf_counter() - start
+            )
+            raise
+        self.recorder.observe(
+            ROBOT_SERIAL,
+            method,
+            (),
+            None if result is None else summarise(result),
+            None,
+            start,
+            time.perf_counter() - start,
+        )
+        return result
+
+    def setup(self) -> None:
+        """Make all connections and start running."""
+        self._record_robot_call("setup", super().setup)
+
+    def rescan(self) -> None:
+        """Look for boards connected, disconnected or reset since the last scan."""
+        self._record_robot_call("rescan", super().rescan)
+
+    def motor_boards(self) -> Mapping[str, BaseMotorBoard]:
+        """Get motor boards by ID."""
+        boards: Mapping[str, BaseMotorBoard] = self._record_robot_call(
+            "motor_boards", super().motor_boards
+        )
+        return boards
+
+    def power_boards(self) -> Mapping[str, BasePowerBoard]:
+        """Get power boards by ID."""
+        boards: Mapping[str, BasePowerBoard] = self._record_robot_call(
+            "power_boards", super().power_boards
+        )
+        return boards
+
+    def servo_assemblies(self) -> Mapping[str, BaseServoAssembly]:
+        """Get servo assemblies by ID."""
+        boards: Mapping[str, BaseServoAssembly] = self._record_robot_call(
+            "servo_assemblies",
+            super().servo_assemblies,
+            lambda boards: {
+                serial: board.bulk_digital_reads for serial, board in boards.items()
+            },
+        )
+        return boards
+
+    def close(self) -> None:
+        """Finish the recording."""
+        self.recorder.close()
+
+
+class RecordedCall:
+    """A single call read back from a recording."""
+
+    def __init__(
+        self,
+        serial: str,
+        method: str,
+        args: Tuple[Any, ...],
+        result: Any,
+        error: Optional[Tuple[str, str]],
+        start: float,
+        duration: float,
+        unrecordable: Optional[str] = None,
+    ) -> None:
+        """
+        Construct from the recorded details.
+
+        `unrecordable` is the reason a call's arguments and result could not be recorded.
+        """
+        self.serial = serial
+        self.method = method
+        self.args = args
+        self.result = result
+        self.error = error
+        self.start = start
+        self.duration = duration
+        self.unrecordable = unrecordable
+
+    def __repr__(self) -> str:
+        """Reproducible representation."""
+        return (
+            "{cls}(serial={serial!r}, method={method!r}, args={args!r}, result={result!r}, "
+            "error={error!r}, start={start!r}, duration={duration!r}, "
+            "unrecordable={unrecordable!r})".format(
+                cls=type(self).__name__,
+                serial=self.serial,
+                method=self.method,
+                args=self.args,
+                result=self.result,
+                error=self.error,
+                start=self.start,
+                duration=self.duration,
+                unrecordable=self.unrecordable,
+            )
+        )
+
+
+class Recording:
+    """
+    A recording file, memory-mapped for reading.
+
+    Records are indexed by board serial on opening, but only decoded when read. A trailing
+    incomplete record, left by a recording cut short, is ignored.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open a recording."""
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a recording: {path}".format(path=path))
+
+        self._methods: Dict[int, Tuple[str, str]] = {}
+        self._offsets: Dict[str, List[int]] = {}
+        offset = len(MAGIC)
+        while offset + RECORD_HEADER.size <= len(self._data):
+            record_type, method_id, _, _, length = RECORD_HEADER.unpack_from(
+                self._data, offset
+            )
+            payload_start = offset + RECORD_HEADER.size
+            payload_end = payload_start + length
+            if payload_end > len(self._data):
+                break
+            if record_type == RECORD_DEFINE:
+                serial, method = (
+                    self._data[payload_start:payload_end].decode("utf-8").split("\0")
+                )
+                self._methods[method_id] = (serial, method)
+            else:
+                serial, _ = self._methods[method_id]
+                self._offsets.setdefault(serial, []).append(offset)
+            offset = payload_end
+
+    @property
+    def serials(self) -> List[str]:
+        """Get the serials of every board with recorded calls."""
+        return [serial for serial in self._offsets if serial != ROBOT_SERIAL]
+
+    def calls(self, serial: str) -> List[int]:
+        """Get the offsets of the recorded calls for a board, in order."""
+        return self._offsets.get(serial, [])
+
+    def read(self, offset: int) -> RecordedCall:
+        """Decode the call recorded at an offset."""
+        record_type, method_id, start, duration, _ = RECORD_HEADER.unpack_from(
+            self._data, offset
+        )
+        serial, method = self._methods[method_id]
+        if record_type == RECORD_UNRECORDABLE:
+            reason, _ = _decode(self._data, offset + RECORD_HEADER.size)
+            return RecordedCall(
+                serial, method, (), None, None, start, duration, unrecordable=reason
+            )
+        args, position = _decode(self._data, offset + RECORD_HEADER.size)
+        payload, _ = _decode(self._data, position)
+        if record_type == RECORD_ERROR:
+            return RecordedCall(serial, method, args, None, payload, start, duration)
+        return RecordedCall(serial, method, args, payload, None, start, duration)
+
+    def close(self) -> None:
+        """Close the recording."""
+        self._data.close()
+
+
+class ReplayDivergence(RuntimeError):
+    """Error raised when calls made during replay differ from those recorded."""
+
+    pass
+
+
+class RecordedError(RuntimeError):
+    """Error replayed from a call which raised when it was recorded."""
+
+    def __init__(self, type_name: str, message: str) -> None:
+        """Construct from the original exception's type name and message."""
+        super().__init__(
+            "{type_name}: {message}".format(type_name=type_name, message=message)
+        )
+        self.type_name = type_name
+
+
+class _ReplayCursor:
+    """Serves the recorded calls for a single board, in order."""
+
+    def __init__(self, replay: "ReplayRobot", serial: str) -> None:
+        self._replay = replay
+        self._serial = serial
+        self._offsets = replay.recording.calls(serial)
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def call(self, method: str, *args: Any) -> Any:
+        with self._lock:
+            if self._position >= len(self._offsets):
+                raise ReplayDivergence(
+                    "Unexpected call to {method} on board {serial!r}: recording exhausted".format(
+                        method=method, serial=self._serial
+                    )
+                )
+            recorded = self._replay.recording.read(self._offsets[self._position])
+            if recorded.method != method:
+                raise ReplayDivergence(
+                    "Call to {method} on board {serial!r}, but {recorded} was recorded".format(
+                        method=method, serial=self._serial, recorded=recorded.method
+                    )
+                )
+            self._position += 1
+
+        if recorded.unrecordable is not None:
+            raise ReplayDivergence(
+                "Call to {method} on board {serial!r} can't be replayed: {reason}".format(
+                    method=method, serial=self._serial, reason=recorded.unrecordable
+                )
+            )
+        if _normalise(args) != recorded.args:
+            self._replay._diverged(
+                "Call to {method} on board {serial!r} with {args!r}, but {recorded!r} was "
+                "recorded".format(
+                    method=method,
+                    serial=self._serial,
+                    args=args,
+                    recorded=recorded.args,
+                )
+            )
+        if recorded.error is not None:
+            raise RecordedError(*recorded.error)
+        return recorded.result
+
+
+def _normalise(value: Any) -> Any:
+    """Put a value into the form it would have once recorded and read back."""
+    encoded = bytearray()
+    _encode(value, encoded)
+    return _decode(encoded, 0)[0]
+
+
+class ReplayMotorChannel(BaseMotorChannel):
+    """Motor channel replaying recorded calls."""
+
+    def __init__(self, cursor: _ReplayCursor, index: int) -> None:
+        """Construct for internal use."""
+        self._cursor = cursor
+        self._prefix = "channel{index}.".format(index=index)
+
+    def forwards(self, power: MotorPower) -> None:
+        """Replay driving the channel forwards."""
+        self._cursor.call(self._prefix + "forwards", power)
+
+    def backwards(self, power: MotorPower) -> None:
+        """Replay driving the channel backwards."""
+        self._cursor.call(self._prefix + "backwards", power)
+
+    def brake(self) -> None:
+        """Replay braking the channel."""
+        self._cursor.call(self._prefix + "brake")
+
+    def apply(self, command: MotorCommand) -> None:
+        """Replay a primitive motor command."""
+        self._cursor.call(self._prefix + command[0].value, command)
+
+
+class ReplayMotorBoard(BaseMotorBoard):
+    """Motor board replaying recorded calls."""
+
+    def __init__(self, cursor: _ReplayCursor) -> None:
+        """Construct for internal use."""
+        self._cursor = cursor
+        self._channels: Optional[List[BaseMotorChannel]] = None
+
+    def channels(self) -> Sequence[BaseMotorChannel]:
+        """Replay getting the channels."""
+        num_channels = self._cursor.call("channels")
+        if self._channels is None:
+            self._channels = [
+                ReplayMotorChannel(self._cursor, index) for index in range(num_channels)
+            ]
+        return self._channels
+
+    def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """Replay a batch of motor commands."""
+        self._cursor.call("apply_commands", commands)
+
+
+class ReplayPowerBoard(BasePowerBoard):
+    """Power board replaying recorded calls."""
+
+    def __init__(self, cursor: _ReplayCursor) -> None:
+        """Construct for internal use."""
+        self._cursor = cursor
+
+    def enable_outputs(self) -> None:
+        """Replay enabling the outputs."""
+        self._cursor.call("enable_outputs")
+
+    def disable_outputs(self) -> None:
+        """Replay disabling the outputs."""
+        self._cursor.call("disable_outputs")
+
+    def wait_for_start_button(self) -> None:
+        """Replay waiting for the start button."""
+        self._cursor.call("wait_for_start_button")
+
+    def read_battery(self) -> Optional[Tuple[float, float]]:
+        """Replay reading the battery."""
+        reading: Optional[Tuple[float, float]] = self._cursor.call("read_battery")
+        return reading
+
+
+class ReplayServoAssembly(BaseServoAssembly):
+    """Servo assembly replaying recorded calls."""
+
+    def __init__(self, cursor: _ReplayCursor) -> None:
+        """Construct for internal use."""
+        self._cursor = cursor
+
+    def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Replay a direct command."""
+        response: CommandResponse = self._cursor.call("direct_command", list(args))
+        return response
+
+    def num_servos(self) -> int:
+        """Replay getting the number of servos."""
+        num_servos: int = self._cursor.call("num_servos")
+        return num_servos
+
+    def set_servo(self, servo: int, position: Optional[ServoPosition]) -> None:
+        """Replay setting a servo."""
+        self._cursor.call("set_servo", servo, position)
+
+    def set_servos(self, positions: Mapping[int, Optional[ServoPosition]]) -> None:
+        """Replay setting several servos."""
+        self._cursor.call("set_servos", positions)
+
+    def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Replay an ultrasound pulse."""
+        echo_time: float = self._cursor.call("ultrasound_pulse", out_pin, in_pin)
+        return echo_time
+
+    def gpio_output_high(self, pin: int) -> None:
+        """Replay driving a pin high."""
+        self._cursor.call("gpio_output_high", pin)
+
+    def gpio_output_low(self, pin: int) -> None:
+        """Replay driving a pin low."""
+        self._cursor.call("gpio_output_low", pin)
+
+    def gpio_set_input(self, pin: int) -> None:
+        """Replay setting a pin to input."""
+        self._cursor.call("gpio_set_input", pin)
+
+    def gpio_set_input_pullup(self, pin: int) -> None:
+        """Replay setting a pin to pulled-up input."""
+        self._cursor.call("gpio_set_input_pullup", pin)
+
+    def gpio_read_digital(self, pin: int) -> bool:
+        """Replay a digital read."""
+        value: bool = self._cursor.call("gpio_read_digital", pin)
+        return value
+
+    def gpio_read_all_digital(self) -> Sequence[bool]:
+        """Replay a bulk digital read."""
+        values: Sequence[bool] = self._cursor.call("gpio_read_all_digital")
+        return values
+
+    def gpio_read_analogue(self, pin: int) -> float:
+        """Replay an analogue read."""
+        value: float = self._cursor.call("gpio_read_analogue", pin)
+        return value
+
+    def gpio_num_pins(self) -> int:
+        """Replay getting the number of pins."""
+        num_pins: int = self._cursor.call("gpio_num_pins")
+        return num_pins
+
+
+class ReplayRobot(BaseRobot):
+    """
+    Robot backend serving calls from a recording.
+
+    Each board's calls must be made in the order they were recorded, although calls to
+    different boards may interleave differently. A call to a different method than was
+    recorded raises `ReplayDivergence`. A call with different arguments is noted in
+    `divergences` and answered with the recorded result, or raises `ReplayDivergence` if
+    `strict` is set.
+    """
+
+    def __init__(self, path: str, *, strict: bool = False) -> None:
+        """Open a recording for replay."""
+        self.recording = Recording(path)
+        self.strict = strict
+        self.divergences: List[str] = []
+        self._cursors: Dict[str, _ReplayCursor] = {}
+        self._boards: Dict[str, Any] = {}
+
+    def _cursor(self, serial: str) -> _ReplayCursor:
+        if serial not in self._cursors:
+            self._cursors[serial] = _ReplayCursor(self, serial)
+        return self._cursors[serial]
+
+    def _board(self, serial: str, board_type: Callable[[_ReplayCursor], Any]) -> Any:
+        # The same board is returned for a serial every time, so that rescans don't look
+        # like reconnections
+        if serial not in self._boards:
+            self._boards[serial] = board_type(self._cursor(serial))
+        return self._boards[serial]
+
+    def _diverged(self, description: str) -> None:
+        if self.strict:
+            raise ReplayDivergence(description)
+        self.divergences.append(description)
+
+    def setup(self) -> None:
+        """Replay setting up."""
+        self._cursor(ROBOT_SERIAL).call("setup")
+
+    def rescan(self) -> None:
+        """Replay looking for boards."""
+        self._cursor(ROBOT_SERIAL).call("rescan")
+
+    def motor_boards(self) -> Mapping[str, BaseMotorBoard]:
+        """Replay getting the motor boards."""
+        return {
+            serial: self._board(serial, ReplayMotorBoard)
+            for serial in self._cursor(ROBOT_SERIAL).call("motor_boards")
+        }
+
+    def power_boards(self) -> Mapping[str, BasePowerBoard]:
+        """Replay getting the power boards."""
+        return {
+            serial: self._board(serial, ReplayPowerBoard)
+            for serial in self._cursor(ROBOT_SERIAL).call("power_boards")
+        }
+
+    def servo_assemblies(self) -> Mapping[str, BaseServoAssembly]:
+        """Replay getting the servo assemblies."""
+        boards = {}
+        recorded = self._cursor(ROBOT_SERIAL).call("servo_assemblies")
+        for serial, bulk_digital_reads in recorded.items():
+            board = boards[serial] = self._board(serial, ReplayServoAssembly)
+            board.bulk_digital_reads = bulk_digital_reads
+        return boards
+
+    def close(self) -> None:
+        """Close the recording."""
+        self.recording.close()
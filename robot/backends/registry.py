@@ -0,0 +1,78 @@
+"""Registry of robot backends, loaded on first use."""
+import importlib
+from typing import Callable, Dict, List
+
+from robot.backends.base import BaseRobot
+
+ENTRY_POINT_GROUP = "robot.backends"
+
+BackendFactory = Callable[[], BaseRobot]
+
+# Backends shipped with this package, so they can be found even when it is not installed
+# (and so has no entry points).
+_BUILTIN_BACKENDS = {
+    "dummy": "robot.backends.dummy.robot:DummyRobot",
+    "remote": "robot.backends.remote.client:RemoteRobot",
+}
+
+_factories: Dict[str, BackendFactory] = {}
+_references: Dict[str, str] = dict(_BUILTIN_BACKENDS)
+_entry_points_scanned = False
+
+
+def register_backend(name: str, factory: BackendFactory) -> None:
+    """Register a backend under a given name, replacing any existing one."""
+    _factories[name] = factory
+    _references.pop(name, None)
+
+
+def available_backends() -> List[str]:
+    """Get the names of all known backends, without loading any of them."""
+    _scan_entry_points()
+    return sorted(set(_factories) | set(_references))
+
+
+def load_backend(name: str) -> BackendFactory:
+    """Get the factory for a backend by name, importing it if necessary."""
+    if name not in _factories:
+        _scan_entry_points()
+        try:
+            reference = _references[name]
+        except KeyError:
+            raise LookupError(
+                "No such backend: {name} (available: {available})".format(
+                    name=name, available=", ".join(available_backends())
+                )
+            ) from None
+        _factories[name] = _resolve(reference)
+        del _references[name]
+    return _factories[name]
+
+
+def create_backend(name: str) -> BaseRobot:
+    """Construct a backend by name."""
+    return load_backend(name)()
+
+
+def _resolve(reference: str) -> BackendFactory:
+    module_name, _, attribute = reference.partition(":")
+    factory: BackendFactory = getattr(importlib.import_module(module_name), attribute)
+    return factory
+
+
+def _scan_entry_points() -> None:
+    global _entry_points_scanned
+    if _entry_points_scanned:
+        return
+    _entry_points_scanned = True
+
+    import importlib.metadata
+
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        group = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:  # pragma: no cover
+        group = entry_points.get(ENTRY_POINT_GROUP, [])  # type: ignore
+    for entry_point in group:
+        if entry_point.name not in _factories:
+            _references[entry_point.name] = entry_point.value
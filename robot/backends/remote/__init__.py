@@ -0,0 +1 @@
+"""Sharing one robot's backends between processes, through a broker on a Unix socket."""
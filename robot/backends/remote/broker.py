@@ -0,0 +1,392 @@
+"""
+Broker which owns a robot's backends, serving them to other processes over a Unix socket.
+
+Run as a script to serve the backend chosen by the ROBOT_BACKEND environment variable until
+interrupted.
+"""
+
+import argparse
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from robot.backends.base import (
+    BaseMotorBoard,
+    BasePowerBoard,
+    BaseRobot,
+    BaseServoAssembly,
+    MotorAction,
+    MotorCommand,
+    MotorPower,
+    ServoPosition,
+)
+from robot.backends.registry import create_backend
+from robot.backends.remote import protocol
+from robot.backends.remote.client import DEFAULT_PATH
+
+Operation = Tuple[int, int, int, memoryview]
+Handler = Callable[[Any, int, memoryview], bytes]
+
+_MOTOR_ACTIONS = {
+    protocol.OP_MOTOR_FORWARDS: MotorAction.FORWARDS,
+    protocol.OP_MOTOR_BACKWARDS: MotorAction.BACKWARDS,
+    protocol.OP_MOTOR_BRAKE: MotorAction.BRAKE,
+}
+
+_NO_VALUE = b""
+
+
+def _direct_command(
+    board: BaseServoAssembly, index: int, argument: memoryview
+) -> bytes:
+    response = board.direct_command(protocol.decode_strings(protocol.Cursor(argument)))
+    return protocol.BOOL.pack(response.error) + protocol.encode_strings(
+        [response.message]
+    )
+
+
+def _read_battery(board: BasePowerBoard, index: int, argument: memoryview) -> bytes:
+    reading = board.read_battery()
+    if reading is None:
+        return _NO_VALUE
+    return protocol.BATTERY.pack(*reading)
+
+
+_HANDLERS: Dict[int, Handler] = {
+    protocol.OP_ENABLE_OUTPUTS: lambda board, index, argument: (
+        board.enable_outputs() or _NO_VALUE
+    ),
+    protocol.OP_DISABLE_OUTPUTS: lambda board, index, argument: (
+        board.disable_outputs() or _NO_VALUE
+    ),
+    protocol.OP_WAIT_START: lambda board, index, argument: (
+        board.wait_for_start_button() or _NO_VALUE
+    ),
+    protocol.OP_GPIO_HIGH: lambda board, index, argument: (
+        board.gpio_output_high(index) or _NO_VALUE
+    ),
+    protocol.OP_GPIO_LOW: lambda board, index, argument: (
+        board.gpio_output_low(index) or _NO_VALUE
+    ),
+    protocol.OP_GPIO_INPUT: lambda board, index, argument: (
+        board.gpio_set_input(index) or _NO_VALUE
+    ),
+    protocol.OP_GPIO_INPUT_PULLUP: lambda board, index, argument: (
+        board.gpio_set_input_pullup(index) or _NO_VALUE
+    ),
+    protocol.OP_READ_DIGITAL: lambda board, index, argument: protocol.BOOL.pack(
+        board.gpio_read_digital(index)
+    ),
+    protocol.OP_READ_ALL_DIGITAL: lambda board, index, argument: bytes(
+        board.gpio_read_all_digital()
+    ),
+    protocol.OP_READ_ANALOGUE: lambda board, index, argument: protocol.FLOAT.pack(
+        board.gpio_read_analogue(index)
+    ),
+    protocol.OP_ULTRASOUND: lambda board, index, argument: protocol.FLOAT.pack(
+        board.ultrasound_pulse(index, protocol.PIN.unpack(argument)[0])
+    ),
+    protocol.OP_DIRECT_COMMAND: _direct_command,
+    protocol.OP_READ_BATTERY: _read_battery,
+}
+
+_BOARD_TYPES = {
+    protocol.OP_ENABLE_OUTPUTS: BasePowerBoard,
+    protocol.OP_DISABLE_OUTPUTS: BasePowerBoard,
+    protocol.OP_WAIT_START: BasePowerBoard,
+    protocol.OP_READ_BATTERY: BasePowerBoard,
+}
+
+_POWER_STATE_OPERATIONS = (
+    protocol.OP_ENABLE_OUTPUTS,
+    protocol.OP_DISABLE_OUTPUTS,
+    protocol.OP_WAIT_START,
+)
+
+
+def _result(value: bytes, *, failed: bool = False) -> bytes:
+    return protocol.RESULT.pack(failed, len(value)) + value
+
+
+def _batch(code: int) -> Optional[str]:
+    if code in _MOTOR_ACTIONS:
+        return "motor"
+    if code == protocol.OP_SET_SERVO:
+        return "servo"
+    return None
+
+
+class RobotBroker:
+    """
+    Serves a robot's backends to any number of clients, each on its own thread.
+
+    Clients use a `RemoteRobot` backend. Consecutive motor commands, or servo positions, for
+    the same board in one request are applied together, with a single `apply_commands` or
+    `set_servos` call.
+
+    Each client's frontend caches the outputs it has written, so clients driving the same
+    outputs won't see each other's changes. Clients' calls to the same board are made one at
+    a time, as backends needn't be thread-safe.
+
+    The power board's outputs and start button belong to the owner: the first client to
+    connect, or the next to connect after it disconnects. Other clients' requests to enable
+    or disable the outputs are ignored, and their waits for the start button return once
+    the owner's has, so that connecting a second `Robot` doesn't cut the first's power.
+    """
+
+    def __init__(
+        self, backend: Optional[BaseRobot] = None, path: str = DEFAULT_PATH
+    ) -> None:
+        """Set up a backend, defaulting to the one chosen by ROBOT_BACKEND, to be served."""
+        if backend is None:
+            backend = create_backend(os.environ.get("ROBOT_BACKEND", "dummy"))
+        backend.setup()
+        self.path = path
+        self._boards: List[Any] = []
+        self._description = self._describe(backend)
+        self._board_locks = [threading.Lock() for _ in self._boards]
+
+        self._lock = threading.Lock()
+        self._connections: Dict[socket.socket, threading.Thread] = {}
+        self._owner: Optional[socket.socket] = None
+        self._power_changed = threading.Condition()
+        self._started = False
+        self._stopping = False
+        self._listener: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._interrupt_read, self._interrupt_write = os.pipe()
+
+    def _describe(self, backend: BaseRobot) -> bytes:
+        boards: List[Tuple[int, str, Any, int, int, int]] = []
+        for serial, motor_board in backend.motor_boards().items():
+            size = len(motor_board.channels())
+            boards.append((protocol.BOARD_MOTOR, serial, motor_board, size, 0, 0))
+        for serial, power_board in backend.power_boards().items():
+            boards.append((protocol.BOARD_POWER, serial, power_board, 0, 0, 0))
+        for serial, assembly in backend.servo_assemblies().items():
+            size, pins = assembly.num_servos(), assembly.gpio_num_pins()
+            flags = protocol.FLAG_BULK_READS if assembly.bulk_digital_reads else 0
+            boards.append((protocol.BOARD_SERVO, serial, assembly, size, pins, flags))
+
+        description = bytearray(protocol.LENGTH.pack(len(boards)))
+        for kind, serial, board, size, pins, flags in boards:
+            encoded = serial.encode("utf-8")
+            description += protocol.BOARD.pack(kind, size, pins, flags)
+            description += protocol.LENGTH.pack(len(encoded))
+            description += encoded
+            self._boards.append(board)
+        return bytes(description)
+
+    @property
+    def clients(self) -> int:
+        """Get the number of clients connected."""
+        with self._lock:
+            return len(self._connections)
+
+    def start(self) -> None:
+        """Start listening for clients."""
+        if self._thread is not None:
+            return
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen()
+        self._listener = listener
+        self._thread = threading.Thread(
+            target=self._accept, name="robot-broker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Disconnect every client and stop listening."""
+        if self._thread is None or self._listener is None:
+            return
+        os.write(self._interrupt_write, b"\0")
+        self._thread.join()
+        self._thread = None
+        os.read(self._interrupt_read, 1)
+        with self._power_changed:
+            self._stopping = True
+            self._power_changed.notify_all()
+        with self._lock:
+            connections = list(self._connections.items())
+        for connection, _ in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # Already disconnected
+                pass
+        for _, thread in connections:
+            thread.join()
+        self._listener.close()
+        self._listener = None
+        os.unlink(self.path)
+        with self._power_changed:
+            self._stopping = False
+
+    def __enter__(self) -> "RobotBroker":
+        """Start listening on entering a `with` block."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop on leaving a `with` block."""
+        self.stop()
+
+    def _accept(self) -> None:
+        assert self._listener is not None
+        while True:
+            readable, _, _ = select.select(
+                [self._listener.fileno(), self._interrupt_read], [], []
+            )
+            if self._interrupt_read in readable:
+                return
+            connection, _ = self._listener.accept()
+            thread = threading.Thread(
+                target=self._serve,
+                args=(connection,),
+                name="robot-broker-client",
+                daemon=True,
+            )
+            with self._lock:
+                self._connections[connection] = thread
+                if self._owner is None:
+                    self._owner = connection
+            thread.start()
+
+    def _serve(self, connection: socket.socket) -> None:
+        try:
+            while True:
+                count, body = protocol.receive_message(connection)
+                with self._lock:
+                    owner = connection is self._owner
+                results = self.execute(count, body, owner=owner)
+                connection.sendall(protocol.encode_message(count, results))
+        except (EOFError, OSError, ValueError):
+            # Disconnected, or sent something which isn't a request
+            pass
+        finally:
+            with self._lock:
+                del self._connections[connection]
+                if connection is self._owner:
+                    self._owner = None
+            connection.close()
+
+    def execute(self, count: int, body: memoryview, *, owner: bool = True) -> bytes:
+        """
+        Perform the operations in the body of a request, returning their results.
+
+        Unless the request is from the owner, power-state operations don't reach the board.
+        """
+        cursor = protocol.Cursor(body)
+        operations: List[Operation] = []
+        for _ in range(count):
+            code, handle, index, length = cursor.unpack(protocol.OPERATION)
+            operations.append((code, handle, index, cursor.take(length)))
+
+        results = bytearray()
+        start = 0
+        while start < len(operations):
+            end = start + 1
+            code, handle = operations[start][:2]
+            batch = _batch(code)
+            if batch is not None:
+                while (
+                    end < len(operations)
+                    and operations[end][1] == handle
+                    and _batch(operations[end][0]) == batch
+                ):
+                    end += 1
+            group = operations[start:end]
+            try:
+                values = self._perform(group, owner)
+            except Exception as e:
+                values = [_result(protocol.encode_error(e), failed=True)] * len(group)
+            for value in values:
+                results += value
+            start = end
+        return bytes(results)
+
+    def _perform(self, group: List[Operation], owner: bool) -> List[bytes]:
+        code, handle, index, argument = group[0]
+        if code == protocol.OP_DESCRIBE:
+            return [_result(self._description)]
+        if not 0 <= handle < len(self._boards):
+            raise ValueError("No such board: {handle}".format(handle=handle))
+        board = self._boards[handle]
+
+        if code in _MOTOR_ACTIONS:
+            self._check_board(board, BaseMotorBoard)
+            commands: Dict[int, MotorCommand] = {}
+            for code, _, index, argument in group:
+                (power,) = protocol.POWER.unpack(argument)
+                commands[index] = (_MOTOR_ACTIONS[code], MotorPower(power))
+            with self._board_locks[handle]:
+                board.apply_commands(commands)
+            return [_result(_NO_VALUE)] * len(group)
+
+        if code == protocol.OP_SET_SERVO:
+            self._check_board(board, BaseServoAssembly)
+            positions: Dict[int, Optional[ServoPosition]] = {}
+            for _, _, index, argument in group:
+                (position,) = protocol.POSITION.unpack(argument)
+                positions[index] = (
+                    None if position == protocol.POSITION_OFF else position
+                )
+            with self._board_locks[handle]:
+                board.set_servos(positions)
+            return [_result(_NO_VALUE)] * len(group)
+
+        try:
+            handler = _HANDLERS[code]
+        except KeyError:
+            raise ValueError("Unknown operation: {code}".format(code=code)) from None
+        self._check_board(board, _BOARD_TYPES.get(code, BaseServoAssembly))
+        if code in _POWER_STATE_OPERATIONS and not owner:
+            return [_result(self._follow_owner(code))]
+        with self._board_locks[handle]:
+            value = handler(board, index, argument)
+        if code in _POWER_STATE_OPERATIONS:
+            with self._power_changed:
+                self._started = code != protocol.OP_DISABLE_OUTPUTS
+                self._power_changed.notify_all()
+        return [_result(value)]
+
+    def _follow_owner(self, code: int) -> bytes:
+        if code == protocol.OP_WAIT_START:
+            with self._power_changed:
+                self._power_changed.wait_for(lambda: self._started or self._stopping)
+                if not self._started:
+                    raise RuntimeError("Broker stopped")
+        return _NO_VALUE
+
+    @staticmethod
+    def _check_board(board: Any, expected: type) -> None:
+        if not isinstance(board, expected):
+            raise ValueError(
+                "Operation not supported by {board}".format(board=type(board).__name__)
+            )
+
+
+def main(args: List[str]) -> int:
+    """Serve the backend chosen by ROBOT_BACKEND until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=os.environ.get("ROBOT_BROKER", DEFAULT_PATH))
+    options = parser.parse_args(args)
+
+    with RobotBroker(path=options.path):
+        print("Serving on {path}".format(path=options.path))
+        try:
+            signal.pause()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,344 @@
+"""Backend which forwards every call to a robot broker."""
+
+import os
+import socket
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from robot.backends.base import (
+    BaseMotorBoard,
+    BaseMotorChannel,
+    BasePowerBoard,
+    BaseRobot,
+    BaseServoAssembly,
+    CommandResponse,
+    MotorAction,
+    MotorCommand,
+    MotorPower,
+    ServoPosition,
+)
+from robot.backends.remote import protocol
+
+DEFAULT_PATH = "/tmp/robot-broker.sock"
+"""The broker's socket, unless overridden by the ROBOT_BROKER environment variable."""
+
+_MOTOR_OPERATIONS = {
+    MotorAction.FORWARDS: protocol.OP_MOTOR_FORWARDS,
+    MotorAction.BACKWARDS: protocol.OP_MOTOR_BACKWARDS,
+    MotorAction.BRAKE: protocol.OP_MOTOR_BRAKE,
+}
+
+
+def encode_operation(
+    code: int, board: int = 0, index: int = 0, argument: bytes = b""
+) -> bytes:
+    """Encode an operation on a board, given its handle."""
+    return protocol.OPERATION.pack(code, board, index, len(argument)) + argument
+
+
+class RemoteConnection:
+    """
+    Connection to a robot broker.
+
+    Requests from different threads are serialised, each waiting for its response.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Connect to the broker listening on a given socket."""
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(path)
+        except BaseException:
+            self._socket.close()
+            raise
+        self._lock = threading.Lock()
+
+    def request(self, operations: Sequence[bytes]) -> List[memoryview]:
+        """
+        Perform several operations in a single message, returning each one's result.
+
+        If any operation fails, the first failure is raised once every result has arrived.
+        """
+        message = protocol.encode_message(len(operations), b"".join(operations))
+        with self._lock:
+            self._socket.sendall(message)
+            count, body = protocol.receive_message(self._socket)
+
+        cursor = protocol.Cursor(body)
+        results = []
+        error: Optional[Exception] = None
+        for _ in range(count):
+            failed, length = cursor.unpack(protocol.RESULT)
+            value = cursor.take(length)
+            if failed and error is None:
+                error = protocol.decode_error(value)
+            results.append(value)
+        if error is not None:
+            raise error
+        return results
+
+    def call(self, operation: bytes) -> memoryview:
+        """Perform a single operation, returning its result."""
+        (result,) = self.request([operation])
+        return result
+
+    def close(self) -> None:
+        """Disconnect from the broker."""
+        self._socket.close()
+
+
+class RemoteMotorChannel(BaseMotorChannel):
+    """A channel of a remote motor board."""
+
+    def __init__(self, board: "RemoteMotorBoard", index: int) -> None:
+        """Construct for internal use."""
+        self._board = board
+        self._index = index
+
+    def forwards(self, power: MotorPower) -> None:
+        """Drive the channel forwards with a given power."""
+        self._board.apply_commands({self._index: (MotorAction.FORWARDS, power)})
+
+    def backwards(self, power: MotorPower) -> None:
+        """Drive the channel backwards with a given power."""
+        self._board.apply_commands({self._index: (MotorAction.BACKWARDS, power)})
+
+    def brake(self) -> None:
+        """Short the motor channels together."""
+        self._board.apply_commands({self._index: (MotorAction.BRAKE, MotorPower(0.0))})
+
+
+class RemoteMotorBoard(BaseMotorBoard):
+    """A motor board owned by a robot broker."""
+
+    def __init__(
+        self, connection: RemoteConnection, handle: int, num_channels: int
+    ) -> None:
+        """Construct for internal use."""
+        self._connection = connection
+        self._handle = handle
+        self._channels = [RemoteMotorChannel(self, n) for n in range(num_channels)]
+
+    def channels(self) -> Sequence[BaseMotorChannel]:
+        """Get all channels of this motor board."""
+        return self._channels
+
+    def apply_commands(self, commands: Mapping[int, MotorCommand]) -> None:
+        """Perform commands on several channels, in a single message to the broker."""
+        self._connection.request(
+            [
+                encode_operation(
+                    _MOTOR_OPERATIONS[action],
+                    self._handle,
+                    channel,
+                    protocol.POWER.pack(power),
+                )
+                for channel, (action, power) in commands.items()
+            ]
+        )
+
+
+class RemotePowerBoard(BasePowerBoard):
+    """A power board owned by a robot broker."""
+
+    def __init__(self, connection: RemoteConnection, handle: int) -> None:
+        """Construct for internal use."""
+        self._connection = connection
+        self._handle = handle
+
+    def enable_outputs(self) -> None:
+        """Drive the main outputs to the battery voltage."""
+        self._connection.call(
+            encode_operation(protocol.OP_ENABLE_OUTPUTS, self._handle)
+        )
+
+    def disable_outputs(self) -> None:
+        """Drop the main outputs back to high-impedance."""
+        self._connection.call(
+            encode_operation(protocol.OP_DISABLE_OUTPUTS, self._handle)
+        )
+
+    def wait_for_start_button(self) -> None:
+        """Await the start button being pressed."""
+        self._connection.call(encode_operation(protocol.OP_WAIT_START, self._handle))
+
+    def read_battery(self) -> Optional[Tuple[float, float]]:
+        """Read the battery's voltage and current, if the board can measure them."""
+        result = self._connection.call(
+            encode_operation(protocol.OP_READ_BATTERY, self._handle)
+        )
+        if not result:
+            return None
+        voltage, current = protocol.BATTERY.unpack(result)
+        return voltage, current
+
+
+class RemoteServoAssembly(BaseServoAssembly):
+    """A servo assembly owned by a robot broker."""
+
+    def __init__(
+        self,
+        connection: RemoteConnection,
+        handle: int,
+        num_servos: int,
+        num_pins: int,
+        *,
+        bulk_digital_reads: bool = False
+    ) -> None:
+        """Construct for internal use."""
+        self._connection = connection
+        self._handle = handle
+        self._num_servos = num_servos
+        self._num_pins = num_pins
+        self.bulk_digital_reads = bulk_digital_reads
+
+    def _call(self, code: int, index: int = 0, argument: bytes = b"") -> memoryview:
+        return self._connection.call(
+            encode_operation(code, self._handle, index, argument)
+        )
+
+    def direct_command(self, args: Iterable[bytes]) -> CommandResponse:
+        """Issue a direct, raw command."""
+        result = protocol.Cursor(
+            self._call(
+                protocol.OP_DIRECT_COMMAND, argument=protocol.encode_strings(list(args))
+            )
+        )
+        (error,) = result.unpack(protocol.BOOL)
+        (message,) = protocol.decode_strings(result)
+        return CommandResponse(message=message, error=error)
+
+    def num_servos(self) -> int:
+        """Get the number of available servos."""
+        return self._num_servos
+
+    def set_servo(self, servo: int, position: Optional[ServoPosition]) -> None:
+        """Set a given servo to some specified position, including undriven."""
+        self.set_servos({servo: position})
+
+    def set_servos(self, positions: Mapping[int, Optional[ServoPosition]]) -> None:
+        """Set several servos, in a single message to the broker."""
+        self._connection.request(
+            [
+                encode_operation(
+                    protocol.OP_SET_SERVO,
+                    self._handle,
+                    servo,
+                    protocol.POSITION.pack(
+                        protocol.POSITION_OFF if position is None else position
+                    ),
+                )
+                for servo, position in positions.items()
+            ]
+        )
+
+    def ultrasound_pulse(self, out_pin: int, in_pin: int) -> float:
+        """Trigger an ultrasound detection with a given input and output pin pair."""
+        result = self._call(protocol.OP_ULTRASOUND, out_pin, protocol.PIN.pack(in_pin))
+        (echo_time,) = protocol.FLOAT.unpack(result)
+        return float(echo_time)
+
+    def gpio_output_high(self, pin: int) -> None:
+        """Drive a given GPIO pin to high output."""
+        self._call(protocol.OP_GPIO_HIGH, pin)
+
+    def gpio_output_low(self, pin: int) -> None:
+        """Drive a given GPIO pin to low output."""
+        self._call(protocol.OP_GPIO_LOW, pin)
+
+    def gpio_set_input(self, pin: int) -> None:
+        """Set a given GPIO into high-impedance input mode."""
+        self._call(protocol.OP_GPIO_INPUT, pin)
+
+    def gpio_set_input_pullup(self, pin: int) -> None:
+        """Set a given GPIO into pulled-up input mode."""
+        self._call(protocol.OP_GPIO_INPUT_PULLUP, pin)
+
+    def gpio_read_digital(self, pin: int) -> bool:
+        """Read a digital value from a GPIO pin."""
+        (value,) = protocol.BOOL.unpack(self._call(protocol.OP_READ_DIGITAL, pin))
+        return bool(value)
+
+    def gpio_read_all_digital(self) -> Sequence[bool]:
+        """Read the digital values of every GPIO pin, in a single operation."""
+        return [bool(value) for value in self._call(protocol.OP_READ_ALL_DIGITAL)]
+
+    def gpio_read_analogue(self, pin: int) -> float:
+        """Read an analogue value, in volts, from a given GPIO pin."""
+        (value,) = protocol.FLOAT.unpack(self._call(protocol.OP_READ_ANALOGUE, pin))
+        return float(value)
+
+    def gpio_num_pins(self) -> int:
+        """Get the number of available GPIO pins."""
+        return self._num_pins
+
+
+class RemoteRobot(BaseRobot):
+    """
+    Robot whose boards are owned by a robot broker, possibly in another process.
+
+    The broker's socket is given by `path`, or else the ROBOT_BROKER environment variable,
+    or else `DEFAULT_PATH`. Calls on the boards are forwarded to the broker; those which
+    command several channels or servos at once are sent in a single message.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Construct, without connecting until `setup`."""
+        if path is None:
+            path = os.environ.get("ROBOT_BROKER", DEFAULT_PATH)
+        self._path = path
+        self._connection: Optional[RemoteConnection] = None
+        self._motor_boards: Dict[str, BaseMotorBoard] = {}
+        self._power_boards: Dict[str, BasePowerBoard] = {}
+        self._servo_assemblies: Dict[str, BaseServoAssembly] = {}
+
+    def setup(self) -> None:
+        """Connect to the broker, and find its boards."""
+        connection = RemoteConnection(self._path)
+        self._connection = connection
+        for handle, (kind, serial, size, pins, flags) in enumerate(self._describe()):
+            if kind == protocol.BOARD_MOTOR:
+                self._motor_boards[serial] = RemoteMotorBoard(connection, handle, size)
+            elif kind == protocol.BOARD_POWER:
+                self._power_boards[serial] = RemotePowerBoard(connection, handle)
+            elif kind == protocol.BOARD_SERVO:
+                self._servo_assemblies[serial] = RemoteServoAssembly(
+                    connection,
+                    handle,
+                    size,
+                    pins,
+                    bulk_digital_reads=bool(flags & protocol.FLAG_BULK_READS),
+                )
+            else:
+                raise RuntimeError("Unknown board kind: {kind}".format(kind=kind))
+
+    def _describe(self) -> List[Tuple[int, str, int, int, int]]:
+        assert self._connection is not None
+        cursor = protocol.Cursor(
+            self._connection.call(encode_operation(protocol.OP_DESCRIBE))
+        )
+        (count,) = cursor.unpack(protocol.LENGTH)
+        boards = []
+        for _ in range(count):
+            kind, size, pins, flags = cursor.unpack(protocol.BOARD)
+            (length,) = cursor.unpack(protocol.LENGTH)
+            serial = bytes(cursor.take(length)).decode("utf-8")
+            boards.append((kind, serial, size, pins, flags))
+        return boards
+
+    def motor_boards(self) -> Mapping[str, BaseMotorBoard]:
+        """Get motor boards by ID."""
+        return self._motor_boards
+
+    def power_boards(self) -> Mapping[str, BasePowerBoard]:
+        """Get power boards by ID."""
+        return self._power_boards
+
+    def servo_assemblies(self) -> Mapping[str, BaseServoAssembly]:
+        """Get servo assemblies by ID."""
+        return self._servo_assemblies
+
+    def close(self) -> None:
+        """Disconnect from the broker."""
+        if self._connection is not None:
+            self._connection.close()
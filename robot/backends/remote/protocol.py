@@ -0,0 +1,171 @@
+"""
+Binary protocol spoken between the robot broker and its clients.
+
+Each request carries any number of operations, and each response carries one result per
+operation, in the same order. Both start with a header, packed as `MESSAGE`, of the length
+of the rest of the message and the number of operations or results in it.
+
+Each operation is packed as `OPERATION`: the operation code, the board handle, the index of
+the channel, servo or pin on that board, and the length of the argument which follows. The
+arguments are:
+
+* for motor operations, the power, packed as `POWER`,
+* for servo operations, the position, packed as `POSITION`, with `POSITION_OFF` for
+  undriven,
+* for ultrasound pulses, the input pin, packed as `PIN`,
+* for direct commands, the number of arguments, then each one's length and bytes, all
+  lengths packed as `LENGTH`.
+
+Board handles are the boards' positions in the broker's description, which is the result of
+`OP_DESCRIBE`: the number of boards, then for each, packed as `BOARD`, its kind, its number
+of channels or servos, its number of pins, and its flags, such as `FLAG_BULK_READS`,
+followed by its serial's length, packed as `LENGTH`, and its serial.
+
+Each result is packed as `RESULT`: whether it failed, and the length of the value which
+follows. Failures' values are an error code and message; see `encode_error`.
+"""
+
+import socket
+import struct
+from typing import Any, List, Sequence, Tuple
+
+MESSAGE = struct.Struct("<IH")
+OPERATION = struct.Struct("<BHHH")
+RESULT = struct.Struct("<BI")
+
+POWER = struct.Struct("<f")
+POSITION = struct.Struct("<h")
+POSITION_OFF = -1
+PIN = struct.Struct("<H")
+LENGTH = struct.Struct("<H")
+BOOL = struct.Struct("<?")
+FLOAT = struct.Struct("<d")
+BATTERY = struct.Struct("<dd")
+BOARD = struct.Struct("<BHHB")
+ERROR = struct.Struct("<B")
+
+OP_DESCRIBE = 0
+OP_MOTOR_FORWARDS = 1
+OP_MOTOR_BACKWARDS = 2
+OP_MOTOR_BRAKE = 3
+OP_ENABLE_OUTPUTS = 4
+OP_DISABLE_OUTPUTS = 5
+OP_WAIT_START = 6
+OP_SET_SERVO = 7
+OP_GPIO_HIGH = 8
+OP_GPIO_LOW = 9
+OP_GPIO_INPUT = 10
+OP_GPIO_INPUT_PULLUP = 11
+OP_READ_DIGITAL = 12
+OP_READ_ALL_DIGITAL = 13
+OP_READ_ANALOGUE = 14
+OP_ULTRASOUND = 15
+OP_DIRECT_COMMAND = 16
+OP_READ_BATTERY = 17
+
+BOARD_MOTOR = 0
+BOARD_POWER = 1
+BOARD_SERVO = 2
+
+FLAG_BULK_READS = 1
+
+ERROR_VALUE = 0
+ERROR_RUNTIME = 1
+
+
+class Cursor:
+    """Sequential reader of the fields of a message."""
+
+    def __init__(self, data: memoryview) -> None:
+        """Construct over some data, starting at its beginning."""
+        self._data = data
+        self._offset = 0
+
+    def __bool__(self) -> bool:
+        """Get whether there is any data left."""
+        return self._offset < len(self._data)
+
+    def unpack(self, packing: struct.Struct) -> Tuple[Any, ...]:
+        """Read the fields of a struct."""
+        fields = packing.unpack_from(self._data, self._offset)
+        self._offset += packing.size
+        return fields
+
+    def take(self, length: int) -> memoryview:
+        """Read a number of bytes, without copying them."""
+        start = self._offset
+        end = start + length
+        if end > len(self._data):
+            raise ValueError("Truncated message")
+        self._offset = end
+        return self._data[start:end]
+
+
+def encode_message(count: int, body: bytes) -> bytes:
+    """Frame the body of a message with a given number of operations or results."""
+    return MESSAGE.pack(len(body), count) + body
+
+
+def encode_strings(values: Sequence[bytes]) -> bytes:
+    """Encode a sequence of byte strings, as the arguments of a direct command."""
+    out = bytearray(LENGTH.pack(len(values)))
+    for value in values:
+        out += LENGTH.pack(len(value))
+        out += value
+    return bytes(out)
+
+
+def decode_strings(cursor: Cursor) -> List[bytes]:
+    """Decode a sequence of byte strings encoded with `encode_strings`."""
+    (count,) = cursor.unpack(LENGTH)
+    values = []
+    for _ in range(count):
+        (length,) = cursor.unpack(LENGTH)
+        values.append(bytes(cursor.take(length)))
+    return values
+
+
+def encode_error(error: Exception) -> bytes:
+    """Encode the error which caused an operation to fail."""
+    code = ERROR_VALUE if isinstance(error, ValueError) else ERROR_RUNTIME
+    return ERROR.pack(code) + str(error).encode("utf-8")
+
+
+def decode_error(value: memoryview) -> Exception:
+    """Decode an error encoded with `encode_error`, as the exception to raise."""
+    (code,) = ERROR.unpack_from(value)
+    start = ERROR.size
+    message = bytes(value[start:]).decode("utf-8", "replace")
+    if code == ERROR_VALUE:
+        return ValueError(message)
+    return RuntimeError("Robot broker error: {message}".format(message=message))
+
+
+def receive_message(connection: socket.socket) -> Tuple[int, memoryview]:
+    """
+    Receive a whole message, returning its number of operations or results, and its body.
+
+    Raises EOFError if the connection is closed before the message begins.
+    """
+    header = _receive_exactly(connection, MESSAGE.size)
+    if not header:
+        raise EOFError("Connection closed")
+    length, count = MESSAGE.unpack(header)
+    body = _receive_exactly(connection, length)
+    if len(body) != length:
+        raise ConnectionError("Connection closed mid-message")
+    return count, memoryview(body)
+
+
+def _receive_exactly(connection: socket.socket, length: int) -> bytearray:
+    data = bytearray(length)
+    view = memoryview(data)
+    received = 0
+    while received < length:
+        count = connection.recv_into(view[received:])
+        if count == 0:
+            if received == 0:
+                return bytearray()
+            raise ConnectionError("Connection closed mid-message")
+        received += count
+    return data
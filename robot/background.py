@@ -0,0 +1,83 @@
+"""Base for work done on a background thread, which can be started and stopped."""
+
+import abc
+import threading
+import time
+from typing import Any, Iterator, Optional, TypeVar
+
+Self = TypeVar("Self", bound="BackgroundTask")
+
+
+class BackgroundTask(metaclass=abc.ABCMeta):
+    """
+    Work done on a background thread, started with `start` and stopped with `stop`.
+
+    Subclasses do their work in `_run`, returning once `_stop` is set. If it raises, the
+    thread ends and the exception is kept in `error` until the task is next started. Using
+    the task as a context manager starts it on entering the block, and stops it on leaving.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Construct, idle, given the name of the thread to run on."""
+        self._name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def running(self) -> bool:
+        """Get whether the task is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start running in the background, if not already running."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._main, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop running, waiting for the background thread to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self: Self) -> Self:
+        """Start running on entering a `with` block."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop running on leaving a `with` block."""
+        self.stop()
+
+    def _main(self) -> None:
+        try:
+            self._run()
+        except Exception as e:
+            self.error = e
+
+    @abc.abstractmethod
+    def _run(self) -> None:
+        raise NotImplementedError
+
+    def _ticks(self, period: float) -> Iterator[int]:
+        # Yield every `period` seconds until stopped, with the number of periods since the
+        # last yield: more than one after falling behind
+        deadline = time.monotonic()
+        ticks = 1
+        while not self._stop.is_set():
+            yield ticks
+            deadline += period
+            delay = deadline - time.monotonic()
+            ticks = 1
+            if delay < 0:
+                # Fell behind: skip the missed ticks rather than bursting to catch up
+                missed = int(-delay / period) + 1
+                ticks += missed
+                deadline += missed * period
+                delay = deadline - time.monotonic()
+            self._stop.wait(max(delay, 0.0))
@@ -0,0 +1,183 @@
+"""Caching and deduplication of direct commands to a servo board."""
+
+import collections
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional, OrderedDict, Sequence, Tuple
+
+from robot.backends.base import CommandResponse
+
+CommandKey = Tuple[bytes, ...]
+_Entry = Tuple[float, CommandResponse]
+
+
+class CacheStatistics:
+    """Counters describing how commands were served by a cache."""
+
+    def __init__(self) -> None:
+        """Initialise with everything zeroed."""
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def __repr__(self) -> str:
+        """Reproducible representation."""
+        return (
+            "{cls}(hits={hits}, misses={misses}, shared={shared}, "
+            "evictions={evictions})".format(
+                cls=type(self).__name__,
+                hits=self.hits,
+                misses=self.misses,
+                shared=self.shared,
+                evictions=self.evictions,
+            )
+        )
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: Optional[CommandResponse] = None
+        self.error: Optional[BaseException] = None
+
+
+class CommandCache:
+    """
+    Cache of the responses to direct commands, keyed on their encoded arguments.
+
+    Only commands given a time-to-live are cached, by the command name (their first argument)
+    in `ttls`, or otherwise by `default_ttl`; others pass straight through. Successful
+    responses are kept for their command's TTL in seconds, with the least recently used
+    evicted once more than `capacity` are held. A TTL of 0 caches nothing, but still
+    deduplicates: identical commands issued while one is in flight wait for it, and share its
+    response, rather than each going to the board. If it raises, they each raise a
+    `RuntimeError` from its exception.
+
+    `statistics` counts hits, misses, callers which shared an in-flight command, and
+    evictions.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Mapping[str, float]] = None,
+        *,
+        default_ttl: Optional[float] = None,
+        capacity: int = 128
+    ) -> None:
+        """Construct, empty, given the TTL of each command to cache."""
+        if capacity <= 0:
+            raise ValueError(
+                "Capacities must be > 0 (was given {capacity})".format(
+                    capacity=capacity
+                )
+            )
+        self._ttls: Dict[bytes, float] = {}
+        for command, ttl in (ttls or {}).items():
+            self.set_ttl(command, ttl)
+        if default_ttl is not None:
+            self._check_ttl(default_ttl)
+        self.default_ttl = default_ttl
+        self.capacity = capacity
+        self._entries: OrderedDict[CommandKey, _Entry] = collections.OrderedDict()
+        self._in_flight: Dict[CommandKey, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.statistics = CacheStatistics()
+
+    @staticmethod
+    def _check_ttl(ttl: float) -> None:
+        if ttl < 0:
+            raise ValueError("TTLs must be >= 0 (was given {ttl})".format(ttl=ttl))
+
+    def set_ttl(self, command: str, ttl: Optional[float]) -> None:
+        """Set the TTL, in seconds, of responses to a command, or None not to cache it."""
+        name = command.encode("utf-8")
+        if ttl is None:
+            self._ttls.pop(name, None)
+            return
+        self._check_ttl(ttl)
+        self._ttls[name] = ttl
+
+    def __len__(self) -> int:
+        """Get the number of responses held."""
+        with self._lock:
+            return len(self._entries)
+
+    def invalidate(self, command: Optional[str] = None) -> None:
+        """Discard the held responses to a command, or to every command."""
+        with self._lock:
+            if command is None:
+                self._entries.clear()
+                return
+            name = command.encode("utf-8")
+            for key in [key for key in self._entries if key[:1] == (name,)]:
+                del self._entries[key]
+
+    def call(
+        self,
+        key: CommandKey,
+        execute: Callable[[Sequence[bytes]], CommandResponse],
+    ) -> CommandResponse:
+        """Get the response to a command, from the cache or by calling `execute` with it."""
+        ttl = self._ttls.get(key[0], self.default_ttl) if key else self.default_ttl
+        if ttl is None:
+            return execute(key)
+
+        leader = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expiry, response = entry
+                if time.monotonic() < expiry:
+                    self._entries.move_to_end(key)
+                    self.statistics.hits += 1
+                    return response
+                del self._entries[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                self.statistics.shared += 1
+            else:
+                self.statistics.misses += 1
+                in_flight = self._in_flight[key] = _InFlight()
+                leader = True
+
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                # Each waiter gets its own exception, rather than sharing one traceback
+                raise RuntimeError(
+                    "Shared command {key!r} failed".format(key=key)
+                ) from in_flight.error
+            assert in_flight.response is not None
+            return in_flight.response
+
+        try:
+            response = execute(key)
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        else:
+            in_flight.response = response
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                # Error responses are shared with callers already waiting, but not kept
+                if in_flight.error is None and ttl > 0 and not response.error:
+                    self._store(key, time.monotonic() + ttl, response)
+            in_flight.done.set()
+        return response
+
+    def _store(self, key: CommandKey, expiry: float, response: CommandResponse) -> None:
+        self._entries[key] = (expiry, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.statistics.evictions += 1
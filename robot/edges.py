@@ -0,0 +1,209 @@
+"""Detection of edges on GPIO pins, by a shared background poller."""
+
+import enum
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from robot.backends.base import BaseServoAssembly
+
+EdgeCallback = Callable[[int, bool], None]
+
+
+@enum.unique
+class Edge(enum.Enum):
+    """Transitions of a digital input which can be waited for."""
+
+    RISING = "rising"
+    FALLING = "falling"
+    BOTH = "both"
+
+    def matches(self, level: bool) -> bool:
+        """Get whether a transition to a given level is an edge of this kind."""
+        return self is Edge.BOTH or level is (self is Edge.RISING)
+
+
+class _Watch:
+    def __init__(self, pin: int, edge: Edge, callback: Optional[EdgeCallback]) -> None:
+        self.pin = pin
+        self.edge = edge
+        self.callback = callback
+        self.added = 0
+        self.last: Optional[bool] = None
+        self.level: Optional[bool] = None
+        self.error: Optional[BaseException] = None
+        self.fired = threading.Event()
+
+
+class EdgeWatcher:
+    """
+    Polls the pins of one servo assembly for edges, on a single background thread.
+
+    Pins are only polled while something is watching them, and the thread sleeps while
+    nothing is. Backends which can read every pin at once are polled with one bulk read per
+    `interval`; for others, each watched pin is read in turn, and the interval is stretched
+    in proportion to the number of pins watched, to keep the rate of reads bounded.
+
+    Callbacks are called on the background thread, so must not block for long.
+
+    If a poll fails, the waits in progress raise, and the exception is kept in `error` until
+    polling restarts, when a pin is next waited for or given a callback.
+    """
+
+    def __init__(self, backend: BaseServoAssembly, *, interval: float = 0.002) -> None:
+        """Construct, idle, given the assembly to poll and the interval between polls."""
+        if interval <= 0:
+            raise ValueError(
+                "Poll intervals must be > 0 (was given {interval})".format(
+                    interval=interval
+                )
+            )
+        self._backend = backend
+        self.interval = interval
+        self.bulk_reads = backend.bulk_digital_reads
+        self._watches: List[_Watch] = []
+        self._changed = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.polls = 0
+        self.error: Optional[BaseException] = None
+
+    @property
+    def watched_pins(self) -> Set[int]:
+        """Get the pins currently being polled."""
+        with self._changed:
+            return {watch.pin for watch in self._watches}
+
+    @property
+    def poll_interval(self) -> float:
+        """Get the current interval, in seconds, between polls."""
+        with self._changed:
+            return self._poll_interval()
+
+    def _poll_interval(self) -> float:
+        if self.bulk_reads:
+            return self.interval
+        return self.interval * max(len({watch.pin for watch in self._watches}), 1)
+
+    def wait_for_edge(
+        self, pin: int, edge: Edge = Edge.BOTH, timeout: Optional[float] = None
+    ) -> Optional[bool]:
+        """
+        Wait for an edge on a pin, returning the pin's new level, or None on timing out.
+
+        Edges are relative to the pin's level when it is first polled after this is called.
+        """
+        watch = _Watch(pin, edge, None)
+        self._add(watch)
+        try:
+            if not watch.fired.wait(timeout):
+                return None
+        finally:
+            self._remove(watch)
+        if watch.level is None:
+            raise RuntimeError("GPIO edge polling failed") from watch.error
+        return watch.level
+
+    def add_callback(
+        self, pin: int, callback: EdgeCallback, edge: Edge = Edge.BOTH
+    ) -> Any:
+        """
+        Call a function with the pin and its new level on every edge on a pin.
+
+        Returns a handle with which to remove the callback with `remove_callback`.
+        """
+        watch = _Watch(pin, edge, callback)
+        self._add(watch)
+        return watch
+
+    def remove_callback(self, handle: Any) -> None:
+        """Stop calling a callback added with `add_callback`."""
+        self._remove(handle)
+
+    def stop(self) -> None:
+        """Stop polling, waiting for the background thread to finish."""
+        with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _rebind(self, backend: BaseServoAssembly) -> None:
+        with self._changed:
+            self._backend = backend
+            self.bulk_reads = backend.bulk_digital_reads
+
+    def _add(self, watch: _Watch) -> None:
+        with self._changed:
+            if self._stopping:
+                raise RuntimeError("GPIO edge polling has been stopped")
+            watch.added = self.polls
+            self._watches.append(watch)
+            if self._thread is None:
+                self.error = None
+                self._thread = threading.Thread(
+                    target=self._run, name="gpio-edge-watcher", daemon=True
+                )
+                self._thread.start()
+            self._changed.notify_all()
+
+    def _remove(self, watch: _Watch) -> None:
+        with self._changed:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _read(self, pins: Set[int]) -> Dict[int, bool]:
+        if self.bulk_reads:
+            values: Sequence[bool] = self._backend.gpio_read_all_digital()
+            return {pin: bool(values[pin]) for pin in pins}
+        return {pin: self._backend.gpio_read_digital(pin) for pin in pins}
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                while not self._watches and not self._stopping:
+                    self._changed.wait()
+                if self._stopping:
+                    return
+                self.polls += 1
+                poll = self.polls
+                pins = {watch.pin for watch in self._watches}
+
+            try:
+                self._poll(poll, pins)
+            except Exception as e:
+                with self._changed:
+                    self.error = e
+                    for watch in self._watches:
+                        if watch.callback is None:
+                            watch.error = e
+                            watch.fired.set()
+                    self._thread = None
+                return
+
+            with self._changed:
+                if not self._stopping:
+                    self._changed.wait(self._poll_interval())
+
+    def _poll(self, poll: int, pins: Set[int]) -> None:
+        levels = self._read(pins)
+        callbacks = []
+        with self._changed:
+            for watch in self._watches:
+                # Watches added while reading only see reads started after they were added
+                if watch.added >= poll:
+                    continue
+                level = levels[watch.pin]
+                previous, watch.last = watch.last, level
+                if previous is None or previous == level:
+                    continue
+                if not watch.edge.matches(level):
+                    continue
+                if watch.callback is not None:
+                    callbacks.append((watch.callback, watch.pin, level))
+                elif not watch.fired.is_set():
+                    watch.level = level
+                    watch.fired.set()
+
+        for callback, pin, level in callbacks:
+            callback(pin, level)
@@ -0,0 +1,58 @@
+"""Rescanning for boards connected, disconnected or reset while running."""
+
+from typing import Callable, List, NamedTuple, Optional
+
+from robot.background import BackgroundTask
+
+
+class BoardChanges(NamedTuple):
+    """The serials of the boards which changed in a rescan."""
+
+    added: List[str]
+    """Boards connected for the first time."""
+
+    removed: List[str]
+    """Boards disconnected."""
+
+    reconnected: List[str]
+    """Boards reset, or connected again after being disconnected."""
+
+    def __bool__(self) -> bool:
+        """Get whether anything changed."""
+        return bool(self.added or self.removed or self.reconnected)
+
+
+class HotplugWatcher(BackgroundTask):
+    """
+    Rescans for boards at a fixed interval, on a background thread.
+
+    If `callback` is given, it is called on the background thread with the changes from each
+    rescan which found any.
+    """
+
+    def __init__(
+        self,
+        rescan: Callable[[], BoardChanges],
+        *,
+        interval: float,
+        callback: Optional[Callable[[BoardChanges], None]] = None
+    ) -> None:
+        """Construct, given a callable to rescan, and the interval between rescans."""
+        if interval <= 0:
+            raise ValueError(
+                "Rescan intervals must be > 0 (was given {interval})".format(
+                    interval=interval
+                )
+            )
+        super().__init__("hotplug-watcher")
+        self._rescan = rescan
+        self.interval = interval
+        self._callback = callback
+        self.scans = 0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            changes = self._rescan()
+            self.scans += 1
+            if changes and self._callback is not None:
+                self._callback(changes)
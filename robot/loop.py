@@ -0,0 +1,207 @@
+"""Fixed-rate control loop runner."""
+
+import bisect
+import enum
+import math
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+@enum.unique
+class OverrunPolicy(enum.Enum):
+    """What to do when an iteration runs past the start of the next one."""
+
+    SKIP = "skip"
+    """Drop the missed iterations, and carry on from the next deadline."""
+
+    CATCH_UP = "catch_up"
+    """Run the missed iterations back-to-back until back on schedule."""
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations, in power-of-two microsecond buckets.
+
+    Bucket `n` counts durations of at most 2**n microseconds (and more than 2**(n-1)). The
+    final bucket also counts anything longer.
+    """
+
+    NUM_BUCKETS = 24
+
+    _BOUNDS = [2.0**n / 1e6 for n in range(NUM_BUCKETS)]
+
+    def __init__(self) -> None:
+        """Construct, empty."""
+        self.counts = [0] * self.NUM_BUCKETS
+        self.total = 0
+        self.sum = 0.0
+
+    def record(self, duration: float) -> None:
+        """Record a duration, in seconds."""
+        bucket = bisect.bisect_left(self._BOUNDS, duration)
+        if bucket >= self.NUM_BUCKETS:
+            bucket = self.NUM_BUCKETS - 1
+        self.counts[bucket] += 1
+        self.total += 1
+        self.sum += duration
+
+    @classmethod
+    def bounds(cls) -> List[float]:
+        """Get the upper bound of each bucket, in seconds."""
+        return list(cls._BOUNDS)
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Get (upper bound in seconds, count) for each non-empty bucket."""
+        return [
+            (bound, count) for bound, count in zip(self._BOUNDS, self.counts) if count
+        ]
+
+    def percentile(self, percentile: float) -> float:
+        """Get an upper bound, in seconds, on the given percentile of durations."""
+        if not self.total:
+            raise LookupError("No durations recorded")
+        threshold = self.total * percentile / 100
+        seen = 0
+        for bound, count in zip(self._BOUNDS, self.counts):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return self._BOUNDS[-1]
+
+
+class LoopStatistics:
+    """Live statistics about a running control loop."""
+
+    def __init__(self, period: float) -> None:
+        """Construct, empty, for a loop with a given period in seconds."""
+        self.period = period
+        self.iterations = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.latency = LatencyHistogram()
+        self.max_latency = 0.0
+        self.max_jitter = 0.0
+        self._jitter_sum = 0.0
+        self._jitter_sum_squares = 0.0
+
+    def _record(self, jitter: float, latency: float) -> None:
+        self.iterations += 1
+        self.latency.record(latency)
+        if latency > self.max_latency:
+            self.max_latency = latency
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+        self._jitter_sum += jitter
+        self._jitter_sum_squares += jitter * jitter
+
+    @property
+    def mean_jitter(self) -> float:
+        """Get the mean lateness of iteration starts against their deadlines, in seconds."""
+        if not self.iterations:
+            return 0.0
+        return self._jitter_sum / self.iterations
+
+    @property
+    def jitter_stddev(self) -> float:
+        """Get the standard deviation of iteration start lateness, in seconds."""
+        if not self.iterations:
+            return 0.0
+        mean = self.mean_jitter
+        variance = self._jitter_sum_squares / self.iterations - mean * mean
+        return math.sqrt(max(variance, 0.0))
+
+    def __repr__(self) -> str:
+        """Reproducible representation."""
+        return (
+            "<{cls} iterations={iterations} overruns={overruns} skipped={skipped} "
+            "max_latency={max_latency:.6f} mean_jitter={mean_jitter:.6f}>".format(
+                cls=type(self).__name__,
+                iterations=self.iterations,
+                overruns=self.overruns,
+                skipped=self.skipped,
+                max_latency=self.max_latency,
+                mean_jitter=self.mean_jitter,
+            )
+        )
+
+
+class ControlLoop:
+    """
+    Calls a function at a fixed rate, scheduled against monotonic deadlines.
+
+    Deadlines are fixed multiples of the period from the start of the loop, so they don't
+    drift however long each iteration takes.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[], None],
+        *,
+        hz: float,
+        policy: OverrunPolicy = OverrunPolicy.SKIP,
+        cpu: Optional[int] = None
+    ) -> None:
+        """Construct given the function to call and the rate to call it at."""
+        if hz <= 0:
+            raise ValueError("Loop rates must be > 0 (was given {hz})".format(hz=hz))
+        self._callback = callback
+        self._period = 1.0 / hz
+        self._policy = policy
+        self._cpu = cpu
+        self._stop = threading.Event()
+        self.statistics = LoopStatistics(self._period)
+
+    def stop(self) -> None:
+        """Stop the loop after the current iteration."""
+        self._stop.set()
+
+    def run(self, max_iterations: Optional[int] = None) -> LoopStatistics:
+        """Run the loop on the calling thread until stopped, or for a number of iterations."""
+        self._stop.clear()
+        previous_affinity = self._pin_to_cpu()
+        try:
+            self._run(max_iterations)
+        finally:
+            if previous_affinity is not None:
+                os.sched_setaffinity(0, previous_affinity)
+        return self.statistics
+
+    def _pin_to_cpu(self) -> Optional[List[int]]:
+        if self._cpu is None:
+            return None
+        if not hasattr(os, "sched_setaffinity"):
+            raise RuntimeError("Pinning to a CPU is not supported on this platform")
+        previous = list(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, [self._cpu])
+        return previous
+
+    def _run(self, max_iterations: Optional[int]) -> None:
+        statistics = self.statistics
+        period = self._period
+        start = time.monotonic()
+        tick = 0
+        while not self._stop.is_set():
+            if max_iterations is not None and statistics.iterations >= max_iterations:
+                return
+
+            deadline = start + tick * period
+            now = time.monotonic()
+            if deadline > now:
+                if self._stop.wait(deadline - now):
+                    return
+                now = time.monotonic()
+
+            self._callback()
+            finished = time.monotonic()
+            statistics._record(now - deadline, finished - now)
+
+            tick += 1
+            next_deadline = start + tick * period
+            if finished > next_deadline:
+                statistics.overruns += 1
+                if self._policy is OverrunPolicy.SKIP:
+                    missed = int((finished - next_deadline) / period) + 1
+                    statistics.skipped += missed
+                    tick += missed
@@ -1,8 +1,17 @@
 """Front-end motor board API."""
+
 import enum
-from typing import Union
+import math
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Union
+
+from robot.backends.base import BaseMotorBoard, MotorAction, MotorCommand, MotorPower
+from robot.output_cache import OutputCache, WriteStatistics
+from robot.state import CODE_BRAKE, CODE_COAST, CODE_VALUE, StateKind, StateStore
+from robot.tracing import UNTRACED, Tracer, traced
 
-from robot.backends.base import BaseMotorBoard, MotorPower
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
 
 
 @enum.unique
@@ -16,30 +25,73 @@ class MotorDriveSpecialState(enum.Enum):
 MotorDriveState = Union[MotorDriveSpecialState, float]
 
 
+_SPECIAL_STATE_CODES = {
+    MotorDriveSpecialState.BRAKE: CODE_BRAKE,
+    MotorDriveSpecialState.COAST: CODE_COAST,
+}
+_SPECIAL_STATES = {code: state for state, code in _SPECIAL_STATE_CODES.items()}
+
+
 class MotorBoard(object):
-    """Motor board."""
+    """
+    Motor board.
+
+    Channel states are held in a `StateStore`, shared with the rest of the robot if one is
+    given.
+    """
+
+    __slots__ = (
+        "serial",
+        "_backend",
+        "_channels",
+        "_state",
+        "_first_slot",
+        "_saved_states",
+        "_pending_commands",
+        "_writes",
+        "_tracer",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        serial: str,
+        backend: BaseMotorBoard,
+        *,
+        state: Optional[StateStore] = None,
+        tracer: Optional[Tracer] = None
+    ) -> None:
+        """
+        Construct by serial/backend.
 
-    def __init__(self, serial: str, backend: BaseMotorBoard) -> None:
-        """Construct by serial/backend."""
+        Channel changes are traced by the given tracer.
+        """
         self.serial = serial
         self._backend = backend
         self._channels = {
             n: channel for n, channel in enumerate(self._backend.channels())
         }
-        self._channel_states = {
-            n: self._initial_channel_state() for n in self._channels.keys()
-        }
-
-    @classmethod
-    def _initial_channel_state(cls) -> MotorDriveState:
-        return MotorDriveSpecialState.COAST
+        self._state = StateStore() if state is None else state
+        self._first_slot = self._state.allocate(
+            StateKind.MOTOR, serial, len(self._channels), CODE_COAST
+        )
+        self._saved_states = self._state.save(self._first_slot, len(self._channels))
+        self._pending_commands: Optional[Dict[int, MotorCommand]] = None
+        self._writes = OutputCache(self._send_commands)
+        self._tracer = UNTRACED if tracer is None else tracer
+        self._lock = threading.Lock()
 
     def _get_output(self, channel: int) -> MotorDriveState:
-        return self._channel_states[channel]
+        if channel not in self._channels:
+            raise KeyError(channel)
+        slot = self._first_slot + channel
+        code = self._state.codes[slot]
+        if code == CODE_VALUE:
+            return self._state.values[slot]
+        return _SPECIAL_STATES[code]
 
-    def _set_output(self, channel: int, state: MotorDriveState) -> None:
-        self._channel_states[channel] = state
-        backend_channel = self._channels[channel]
+    @staticmethod
+    def _command_for_state(state: MotorDriveState) -> MotorCommand:
         if isinstance(state, float):
             if state >= 0.0:
                 if state > 1.0:
@@ -48,7 +100,7 @@ class MotorBoard(object):
                             power=state
                         )
                     )
-                backend_channel.forwards(MotorPower(state))
+                return MotorAction.FORWARDS, MotorPower(state)
             else:
                 if state < -1.0:
                     raise ValueError(
@@ -56,12 +108,12 @@ class MotorBoard(object):
                             power=state
                         )
                     )
-                backend_channel.backwards(MotorPower(state))
+                return MotorAction.BACKWARDS, MotorPower(state)
         elif isinstance(state, MotorDriveSpecialState):
             if state is MotorDriveSpecialState.BRAKE:
-                backend_channel.brake()
+                return MotorAction.BRAKE, MotorPower(0.0)
             elif state is MotorDriveSpecialState.COAST:
-                backend_channel.forwards(MotorPower(0.0))
+                return MotorAction.FORWARDS, MotorPower(0.0)
             else:
                 raise AssertionError(
                     "Unknown enum value for drive state: {value}".format(value=state)
@@ -71,6 +123,201 @@ class MotorBoard(object):
                 "Didn't understand the value passed in: {value!r}".format(value=state)
             )
 
+    @traced("MotorBoard.set_output")
+    def _set_output(self, channel: int, state: MotorDriveState) -> None:
+        command = self._command_for_state(state)
+        if channel not in self._channels:
+            raise ValueError("No such motor channel: {channel}".format(channel=channel))
+        if isinstance(state, MotorDriveSpecialState):
+            self._state.write(self._first_slot + channel, _SPECIAL_STATE_CODES[state])
+        else:
+            self._state.write(self._first_slot + channel, CODE_VALUE, state)
+        if self._pending_commands is not None:
+            self._pending_commands[channel] = command
+        else:
+            self._writes.write(channel, command)
+
+    def _set_outputs(
+        self, states: Dict[int, MotorDriveState], *, direct: bool = False
+    ) -> None:
+        # Direct writes, from a motor ramp's thread, bypass any open transaction
+        commands = {
+            channel: self._command_for_state(state) for channel, state in states.items()
+        }
+        for channel in states:
+            if channel not in self._channels:
+                raise ValueError(
+                    "No such motor channel: {channel}".format(channel=channel)
+                )
+        writes = []
+        for channel, state in states.items():
+            if isinstance(state, MotorDriveSpecialState):
+                writes.append(
+                    (self._first_slot + channel, _SPECIAL_STATE_CODES[state], 0.0)
+                )
+            else:
+                writes.append((self._first_slot + channel, CODE_VALUE, state))
+        if direct:
+            with self._lock:
+                self._state.write_many(writes)
+                self._writes.write_many(commands)
+            return
+        self._state.write_many(writes)
+        if self._pending_commands is not None:
+            self._pending_commands.update(commands)
+        else:
+            self._writes.write_many(commands)
+
+    def _send_commands(self, commands: Dict[int, MotorCommand]) -> None:
+        if len(commands) == 1:
+            ((channel, command),) = commands.items()
+            self._channels[channel].apply(command)
+        else:
+            self._backend.apply_commands(commands)
+
+    def _rebind(self, backend: BaseMotorBoard) -> None:
+        channels = dict(enumerate(backend.channels()))
+        if len(channels) != len(self._channels):
+            raise RuntimeError(
+                "Motor board {serial} reconnected with a different shape".format(
+                    serial=self.serial
+                )
+            )
+        self._backend = backend
+        self._channels = channels
+        self._writes.invalidate()
+        # Restore the last commanded state
+        self._set_outputs(
+            {channel: self._get_output(channel) for channel in self._channels}
+        )
+
+    def _begin_transaction(self) -> None:
+        self._saved_states = self._state.save(self._first_slot, len(self._channels))
+        self._pending_commands = {}
+
+    def _commit_transaction(self) -> None:
+        with self._lock:
+            commands = self._pending_commands
+            if commands:
+                self._writes.write_many(commands)
+                self._writes.flush()
+            self._pending_commands = None
+
+    def _abort_transaction(self) -> None:
+        with self._lock:
+            commands, self._pending_commands = self._pending_commands, None
+            if not commands:
+                return
+            # Only restore the transaction's own channels, as others may have been written
+            # directly since it began
+            codes, values = self._saved_states
+            self._state.write_many(
+                (self._first_slot + channel, codes[channel], values[channel])
+                for channel in commands
+            )
+            # Replace any of the transaction's commands which failed to send
+            self._writes.hold(
+                {
+                    channel: self._command_for_state(self._get_output(channel))
+                    for channel in commands
+                }
+            )
+
+    @property
+    def coalesce_window(self) -> Optional[float]:
+        """
+        Get the window, in seconds, over which output changes are coalesced.
+
+        When set, only the last value written to each channel within the window is sent to the
+        board. None, the default, sends every change immediately.
+        """
+        return self._writes.coalesce_window
+
+    @coalesce_window.setter
+    def coalesce_window(self, window: Optional[float]) -> None:
+        """Set the window, in seconds, over which output changes are coalesced."""
+        self._writes.coalesce_window = window
+
+    @property
+    def write_statistics(self) -> WriteStatistics:
+        """Get counters of output writes requested, sent, suppressed and coalesced."""
+        return self._writes.statistics
+
+    def flush(self) -> None:
+        """Send any output changes held back by coalescing now."""
+        self._writes.flush()
+
+    def invalidate_cache(self) -> None:
+        """
+        Forget which outputs were last sent to the board.
+
+        Unchanged outputs are not re-sent to the board. Call this if the board has been reset,
+        so that the next write to each channel goes through regardless.
+        """
+        self._writes.invalidate()
+
+    def set_outputs(self, outputs: Sequence[float]) -> None:
+        """
+        Drive every channel at once, given a power for each, indexed by channel.
+
+        Powers are validated as a whole array, with NumPy where it is available, and only the
+        channels whose powers change are sent to the board, in a single batched write.
+        Channels given NaN are left as they are.
+        """
+        if len(outputs) != len(self._channels):
+            raise ValueError(
+                "Expected {expected} motor outputs (given: {given})".format(
+                    expected=len(self._channels), given=len(outputs)
+                )
+            )
+        start = self._first_slot
+        end = start + len(self._channels)
+        codes = self._state.codes[start:end]
+        current = self._state.values[start:end]
+
+        try:
+            import numpy
+        except ImportError:
+            states: Dict[int, MotorDriveState] = {
+                channel: float(output)
+                for channel, output in enumerate(outputs)
+                if not math.isnan(output)
+                and (codes[channel] != CODE_VALUE or current[channel] != output)
+            }
+        else:
+            requested = numpy.asarray(outputs, dtype=numpy.float64)
+            given = ~numpy.isnan(requested)
+            if numpy.any(given & ((requested < -1.0) | (requested > 1.0))):
+                raise ValueError("Cannot set motor output to >100%")
+            changed = numpy.flatnonzero(
+                given
+                & (
+                    (numpy.frombuffer(codes, dtype=numpy.uint8) != CODE_VALUE)
+                    | (numpy.frombuffer(current, dtype=numpy.float64) != requested)
+                )
+            )
+            states = dict(zip(changed.tolist(), requested[changed].tolist()))
+
+        if states:
+            self._set_outputs(states)
+
+    def get_outputs(self) -> "numpy.ndarray[Any, Any]":
+        """
+        Get the power of every channel as a NumPy array, indexed by channel.
+
+        Channels which are braking or coasting read as 0.
+        """
+        import numpy
+
+        start = self._first_slot
+        end = start + len(self._channels)
+        codes = numpy.frombuffer(self._state.codes[start:end], dtype=numpy.uint8)
+        values = numpy.frombuffer(self._state.values[start:end], dtype=numpy.float64)
+        outputs: "numpy.ndarray[Any, Any]" = numpy.where(
+            codes == CODE_VALUE, values, 0.0
+        )
+        return outputs
+
     @property
     def m0(self) -> MotorDriveState:
         """Motor channel 0 state."""
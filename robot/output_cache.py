@@ -0,0 +1,192 @@
+"""Write-through caching and coalescing of board outputs."""
+import threading
+import time
+from typing import Callable, Dict, Generic, Iterable, Mapping, Optional, TypeVar
+
+Value = TypeVar("Value")
+
+
+class WriteStatistics:
+    """Counters describing what happened to the writes made to a board."""
+
+    def __init__(self) -> None:
+        """Initialise with everything zeroed."""
+        self.requested = 0
+        self.sent = 0
+        self.suppressed = 0
+        self.coalesced = 0
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        self.requested = 0
+        self.sent = 0
+        self.suppressed = 0
+        self.coalesced = 0
+
+    def __repr__(self) -> str:
+        """Reproducible representation."""
+        return (
+            "{cls}(requested={requested}, sent={sent}, suppressed={suppressed}, "
+            "coalesced={coalesced})".format(
+                cls=type(self).__name__,
+                requested=self.requested,
+                sent=self.sent,
+                suppressed=self.suppressed,
+                coalesced=self.coalesced,
+            )
+        )
+
+
+class OutputCache(Generic[Value]):
+    """
+    Write-through cache of the values last sent to each channel of a board.
+
+    Writes of a value identical to the one last sent to the same channel are dropped. With a
+    coalescing window set, writes are held back so that at most one batch is sent per window,
+    containing only the last value written to each channel.
+
+    Batches are passed, keyed by channel, to the `send` callable given at construction. If
+    sending fails, the batch's values are held back again, to be retried by the next flush.
+    A failure sending held-back writes in the background is raised, as a `RuntimeError`, by
+    the next `write`, `write_many` or `flush`, once that has been carried out.
+    """
+
+    def __init__(self, send: Callable[[Dict[int, Value]], None]) -> None:
+        """Construct with the callable which sends a batch of values to the backend."""
+        self._send = send
+        self._sent: Dict[int, Value] = {}
+        self._pending: Dict[int, Value] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._last_flush = float("-inf")
+        self._coalesce_window: Optional[float] = None
+        self._error: Optional[BaseException] = None
+        self.statistics = WriteStatistics()
+
+    @property
+    def coalesce_window(self) -> Optional[float]:
+        """Get the coalescing window, in seconds, or None if writes are sent immediately."""
+        return self._coalesce_window
+
+    @coalesce_window.setter
+    def coalesce_window(self, window: Optional[float]) -> None:
+        """Set the coalescing window, in seconds, or None to send writes immediately."""
+        if window is not None and window < 0:
+            raise ValueError(
+                "Coalescing windows must be >= 0 (was given {window})".format(
+                    window=window
+                )
+            )
+        self._coalesce_window = window or None
+        if self._coalesce_window is None:
+            self.flush()
+
+    def write(self, channel: int, value: Value) -> None:
+        """Write a value to a single channel."""
+        with self._lock:
+            self.statistics.requested += 1
+            if self._coalesce_window is None and not self._pending:
+                if channel in self._sent and self._sent[channel] == value:
+                    self.statistics.suppressed += 1
+                else:
+                    self._send({channel: value})
+                    self._sent[channel] = value
+                    self.statistics.sent += 1
+            else:
+                if channel in self._pending:
+                    self.statistics.coalesced += 1
+                self._pending[channel] = value
+                self._schedule()
+            self._raise_error()
+
+    def write_many(self, values: Mapping[int, Value]) -> None:
+        """Write values to several channels."""
+        with self._lock:
+            self.statistics.requested += len(values)
+            for channel, value in values.items():
+                if channel in self._pending:
+                    self.statistics.coalesced += 1
+                self._pending[channel] = value
+            self._schedule()
+            self._raise_error()
+
+    def flush(self) -> None:
+        """Send any held-back writes now."""
+        with self._lock:
+            self._flush()
+            self._raise_error()
+
+    def _flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+            changed = {}
+            for channel, value in pending.items():
+                if channel in self._sent and self._sent[channel] == value:
+                    self.statistics.suppressed += 1
+                else:
+                    changed[channel] = value
+            if not changed:
+                return
+
+            try:
+                self._send(changed)
+            except BaseException:
+                # Hold the unsent values back again, behind any written since
+                changed.update(self._pending)
+                self._pending = changed
+                raise
+            self._sent.update(changed)
+            self.statistics.sent += len(changed)
+
+    def hold(self, values: Mapping[int, Value]) -> None:
+        """Hold values back, without sending them, to be sent with the next batch."""
+        with self._lock:
+            self._pending.update(values)
+
+    def discard(self, channels: Iterable[int]) -> None:
+        """Drop any held-back writes to some channels, without sending them."""
+        with self._lock:
+            for channel in channels:
+                self._pending.pop(channel, None)
+
+    def invalidate(self) -> None:
+        """
+        Forget the values last sent.
+
+        This should be called whenever the board may have lost its state, such as after a
+        reset, so that the next write to each channel is sent even if unchanged.
+        """
+        with self._lock:
+            self._sent.clear()
+
+    def _schedule(self) -> None:
+        if self._coalesce_window is None:
+            self.flush()
+            return
+        if self._timer is not None:
+            return
+        delay = self._last_flush + self._coalesce_window - time.monotonic()
+        if delay <= 0:
+            self.flush()
+            return
+        self._timer = threading.Timer(delay, self._flush_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_in_background(self) -> None:
+        with self._lock:
+            self._timer = None
+            try:
+                self._flush()
+            except Exception as e:
+                self._error = e
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError("Sending held-back writes failed") from error
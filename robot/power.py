@@ -1,6 +1,62 @@
 """Front-end power board API."""
+import asyncio
+import threading
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from robot.analogue import RingBuffer, Sampler
 from robot.backends.base import BasePowerBoard
 
+VOLTAGE = 0
+CURRENT = 1
+
+
+class BatteryReading(NamedTuple):
+    """A measurement of the battery."""
+
+    voltage: float
+    """The battery's voltage, in volts."""
+
+    current: float
+    """The current drawn from the battery, in amps."""
+
+
+class BatterySampler(Sampler):
+    """
+    Samples the battery's voltage and current at a fixed rate on a background thread.
+
+    The samples are held in the `voltage` and `current` buffers, alongside the buffer of
+    timestamps.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[], Optional[Tuple[float, float]]],
+        *,
+        rate: float,
+        capacity: int = 1024
+    ) -> None:
+        """Construct, given a callable to read the battery, and the rate in Hz."""
+        super().__init__(
+            (VOLTAGE, CURRENT), rate=rate, capacity=capacity, name="battery-sampler"
+        )
+        self._read_battery = read
+
+    @property
+    def voltage(self) -> RingBuffer:
+        """Get the buffer of voltages, in volts."""
+        return self._buffers[VOLTAGE]
+
+    @property
+    def current(self) -> RingBuffer:
+        """Get the buffer of currents, in amps."""
+        return self._buffers[CURRENT]
+
+    def _sample(self) -> Tuple[float, float]:
+        reading = self._read_battery()
+        if reading is None:
+            raise RuntimeError("This power board can't measure the battery.")
+        return reading
+
 
 class PowerBoard:
     """Front-end power board."""
@@ -10,8 +66,107 @@ class PowerBoard:
         self.serial = serial
         self._backend = backend
         self._backend.disable_outputs()
+        self._start_event = threading.Event()
+        self._start_lock = threading.Lock()
+        self._start_thread: Optional[threading.Thread] = None
+        self._start_callbacks: List[Callable[[], None]] = []
+        self.start_error: Optional[BaseException] = None
+
+    @property
+    def start_event(self) -> threading.Event:
+        """
+        Get an event set once the start button has been pressed and the outputs enabled.
+
+        This starts waiting for the start button in the background, if not already.
+        """
+        self._begin_waiting()
+        return self._start_event
+
+    def wait_start(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the start button to be pressed, returning whether it was.
+
+        The outputs are enabled as soon as the button is pressed. If `timeout` seconds pass
+        first, False is returned, and the button is still waited for in the background.
+        """
+        if not self.start_event.wait(timeout):
+            return False
+        self._check_start()
+        return True
+
+    async def wait_start_async(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the start button to be pressed without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        started = loop.create_future()
+
+        def set_started() -> None:
+            if not started.done():
+                started.set_result(None)
+
+        def notify() -> None:
+            loop.call_soon_threadsafe(set_started)
+
+        self._begin_waiting()
+        with self._start_lock:
+            if self._start_event.is_set():
+                started.set_result(None)
+            else:
+                self._start_callbacks.append(notify)
+        try:
+            await asyncio.wait_for(started, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._start_lock:
+                if notify in self._start_callbacks:
+                    self._start_callbacks.remove(notify)
+        self._check_start()
+        return True
+
+    def _begin_waiting(self) -> None:
+        with self._start_lock:
+            if self._start_thread is None:
+                self._start_thread = threading.Thread(
+                    target=self._wait_for_start, name="start-button", daemon=True
+                )
+                self._start_thread.start()
+
+    def _wait_for_start(self) -> None:
+        try:
+            self._backend.wait_for_start_button()
+            self._backend.enable_outputs()
+        except Exception as e:
+            self.start_error = e
+        with self._start_lock:
+            self._start_event.set()
+            callbacks, self._start_callbacks = self._start_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _check_start(self) -> None:
+        if self.start_error is not None:
+            raise RuntimeError(
+                "Failed waiting for the start button"
+            ) from self.start_error
+
+    def read_battery(self) -> BatteryReading:
+        """Measure the battery's voltage and current."""
+        reading = self._backend.read_battery()
+        if reading is None:
+            raise RuntimeError("This power board can't measure the battery.")
+        return BatteryReading(*reading)
+
+    def sample_battery(self, *, rate: float, capacity: int = 1024) -> BatterySampler:
+        """
+        Start sampling the battery's voltage and current in the background.
 
-    def wait_start(self) -> None:
-        """Wait for the start button to be pressed."""
-        self._backend.wait_for_start_button()
-        self._backend.enable_outputs()
+        The battery is sampled `rate` times per second, and the most recent `capacity`
+        samples are kept. Call `stop` on the returned sampler, or use it as a context manager,
+        to stop sampling.
+        """
+        self.read_battery()
+        sampler = BatterySampler(
+            self._backend.read_battery, rate=rate, capacity=capacity
+        )
+        sampler.start()
+        return sampler
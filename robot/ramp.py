@@ -0,0 +1,233 @@
+"""Slew-rate limiting of motor outputs, on a background thread."""
+
+import math
+import threading
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+from robot.background import BackgroundTask
+from robot.motor import (
+    _SPECIAL_STATE_CODES,
+    MotorBoard,
+    MotorDriveSpecialState,
+    MotorDriveState,
+)
+from robot.state import CODE_VALUE
+
+
+class MotorRamp(BackgroundTask):
+    """
+    Ramps the outputs of every channel of a set of motor boards towards their targets.
+
+    The target and current output of every channel are held in flat arrays, and stepped
+    together `rate` times per second. Each step moves an output towards its target by at most
+    `acceleration` per second, or `deceleration` per second when moving towards zero. Each
+    board's changed channels are sent with a single batched write per step.
+
+    BRAKE and COAST are applied immediately, and a channel ramps up from zero afterwards.
+    Channels driven by the ramp should only be set through it: a value set on the board
+    directly is overwritten by the ramp's next step of that channel. The ramp's writes are
+    sent straight away even while a transaction is open, and aren't part of it.
+    """
+
+    def __init__(
+        self,
+        boards: Iterable[MotorBoard],
+        *,
+        rate: float = 100.0,
+        acceleration: float = 4.0,
+        deceleration: Optional[float] = None
+    ) -> None:
+        """
+        Construct, idle, for some boards.
+
+        Accelerations are in fractions of full power per second. `deceleration` defaults to
+        the same as `acceleration`.
+        """
+        if rate <= 0:
+            raise ValueError(
+                "Ramp rates must be > 0 (was given {rate})".format(rate=rate)
+            )
+        if deceleration is None:
+            deceleration = acceleration
+        self._check_limits(acceleration, deceleration)
+        super().__init__("motor-ramp")
+        self.rate = rate
+
+        self._boards: Dict[str, Tuple[MotorBoard, int, int]] = {}
+        self._targets = array("d")
+        self._outputs = array("d")
+        self._overrides = array("B")
+        for board in boards:
+            first, count = len(self._targets), len(board._channels)
+            self._boards[board.serial] = (board, first, count)
+            for channel in range(count):
+                output = board._get_output(channel)
+                if isinstance(output, MotorDriveSpecialState):
+                    self._overrides.append(_SPECIAL_STATE_CODES[output])
+                    output = 0.0
+                else:
+                    self._overrides.append(CODE_VALUE)
+                self._targets.append(output)
+                self._outputs.append(output)
+        self._accelerations = array("d", [acceleration] * len(self._targets))
+        self._decelerations = array("d", [deceleration] * len(self._targets))
+
+        self._changed = threading.Condition()
+        self.ticks = 0
+        self.ticks_skipped = 0
+
+    @staticmethod
+    def _check_limits(acceleration: float, deceleration: float) -> None:
+        if acceleration <= 0 or deceleration <= 0:
+            raise ValueError(
+                "Accelerations must be > 0 (was given {acceleration} and "
+                "{deceleration})".format(
+                    acceleration=acceleration, deceleration=deceleration
+                )
+            )
+
+    def _index(self, serial: str, channel: int) -> Tuple[MotorBoard, int]:
+        try:
+            board, first, count = self._boards[serial]
+        except KeyError:
+            raise ValueError(
+                "No such motor board: {serial}".format(serial=serial)
+            ) from None
+        if not 0 <= channel < count:
+            raise ValueError("No such motor channel: {channel}".format(channel=channel))
+        return board, first + channel
+
+    def set_target(self, serial: str, channel: int, target: MotorDriveState) -> None:
+        """Set the state for a channel to ramp towards, applying BRAKE and COAST at once."""
+        board, index = self._index(serial, channel)
+        MotorBoard._command_for_state(target)
+        with self._changed:
+            if self.error is not None:
+                raise RuntimeError("Motor ramping failed") from self.error
+            if isinstance(target, MotorDriveSpecialState):
+                self._overrides[index] = _SPECIAL_STATE_CODES[target]
+                self._targets[index] = 0.0
+                self._outputs[index] = 0.0
+                board._set_outputs({channel: target}, direct=True)
+            else:
+                self._overrides[index] = CODE_VALUE
+                self._targets[index] = target
+            self._changed.notify_all()
+
+    def target(self, serial: str, channel: int) -> MotorDriveState:
+        """Get the state a channel is ramping towards."""
+        board, index = self._index(serial, channel)
+        with self._changed:
+            if self._overrides[index] != CODE_VALUE:
+                return board._get_output(channel)
+            return self._targets[index]
+
+    def output(self, serial: str, channel: int) -> float:
+        """Get the power a channel has been ramped to so far."""
+        _, index = self._index(serial, channel)
+        with self._changed:
+            return self._outputs[index]
+
+    def set_acceleration(
+        self,
+        serial: str,
+        channel: int,
+        acceleration: float,
+        deceleration: Optional[float] = None,
+    ) -> None:
+        """Set the acceleration limits of a single channel, per second."""
+        if deceleration is None:
+            deceleration = acceleration
+        self._check_limits(acceleration, deceleration)
+        _, index = self._index(serial, channel)
+        with self._changed:
+            self._accelerations[index] = acceleration
+            self._decelerations[index] = deceleration
+
+    @property
+    def settled(self) -> bool:
+        """Get whether every channel has reached its target."""
+        with self._changed:
+            return not self._moving()
+
+    def wait_settled(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every channel to reach its target, returning False on timing out."""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: not self._moving() or self.error is not None, timeout
+            )
+
+    def _moving(self) -> bool:
+        return any(
+            override == CODE_VALUE and output != target
+            for override, output, target in zip(
+                self._overrides, self._outputs, self._targets
+            )
+        )
+
+    def step(self, interval: Optional[float] = None) -> int:
+        """
+        Step every channel towards its target, on the calling thread.
+
+        Outputs move as far as their limits allow in `interval` seconds, by default one tick.
+        Returns the number of channels written.
+        """
+        with self._changed:
+            return self._step(1.0 / self.rate if interval is None else interval)
+
+    def _step(self, interval: float) -> int:
+        written = 0
+        for board, first, count in self._boards.values():
+            changed: Dict[int, MotorDriveState] = {}
+            for channel in range(count):
+                index = first + channel
+                output, target = self._outputs[index], self._targets[index]
+                if self._overrides[index] != CODE_VALUE or output == target:
+                    continue
+                difference = target - output
+                if output * difference < 0:
+                    limit = self._decelerations[index] * interval
+                else:
+                    limit = self._accelerations[index] * interval
+                if abs(difference) > limit:
+                    output += math.copysign(limit, difference)
+                else:
+                    output = target
+                self._outputs[index] = output
+                changed[channel] = output
+            if changed:
+                board._set_outputs(changed, direct=True)
+                written += len(changed)
+        self._changed.notify_all()
+        return written
+
+    def stop(self) -> None:
+        """Stop ramping, leaving the outputs where they are."""
+        with self._changed:
+            self._stop.set()
+            self._changed.notify_all()
+        super().stop()
+
+    def _run(self) -> None:
+        period = 1.0 / self.rate
+        while True:
+            with self._changed:
+                while not self._stop.is_set() and not self._moving():
+                    self._changed.wait()
+            # Start a fresh schedule whenever a target changes after idling
+            for ticks in self._ticks(period):
+                with self._changed:
+                    if not self._moving():
+                        break
+                    try:
+                        # Cover any ticks missed by falling behind in one larger step
+                        self._step(ticks * period)
+                    except Exception as e:
+                        self.error = e
+                        self._changed.notify_all()
+                        return
+                    self.ticks += 1
+                    self.ticks_skipped += ticks - 1
+            if self._stop.is_set():
+                return
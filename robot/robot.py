@@ -1,51 +1,341 @@
 """Central 'robot' class frontend definition."""
-from typing import Optional
+
+import concurrent.futures
+import contextlib
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Union
 
 from robot.backends.base import BaseRobot
-from robot.backends.dummy.robot import DummyRobot
+from robot.backends.instrumented import BackendMetrics, InstrumentedRobot
+from robot.backends.registry import create_backend
+from robot.hotplug import BoardChanges, HotplugWatcher
+from robot.loop import ControlLoop, LoopStatistics, OverrunPolicy
 from robot.motor import MotorBoard
 from robot.power import PowerBoard
+from robot.ramp import MotorRamp
 from robot.servo import ServoBoard
+from robot.state import StateStore
+from robot.telemetry import TelemetryPublisher
+from robot.tracing import Tracer
 
 
 class Robot:
     """Main robot."""
 
     def __init__(
-        self, *, wait_for_start_button: bool = True, backend: Optional[BaseRobot] = None
+        self,
+        *,
+        wait_for_start_button: bool = True,
+        backend: Optional[BaseRobot] = None,
+        metrics: Optional[BackendMetrics] = None,
+        telemetry: Optional[str] = None,
+        tracer: Optional[Tracer] = None
     ) -> None:
-        """Initialise."""
+        """
+        Initialise.
+
+        If `metrics` is given, every call made to the backend is counted and timed into it.
+        Every motor, servo and GPIO value is held in `state`, which can be snapshotted.
+        If `telemetry` is given, `state` is also published to the shared memory segment of
+        that name, for other processes to read with a `TelemetryClient`.
+        If `tracer` is given, board operations and every call made to the backend are traced
+        into it.
+        """
         if backend is None:
             self._backend = self._get_default_backend()
         else:
             self._backend = backend
 
-        self._backend.setup()
+        self.metrics = metrics
+        if metrics is not None:
+            self._backend = InstrumentedRobot(self._backend, metrics)
+
+        self.tracer = tracer
+        if tracer is not None:
+            self._backend = InstrumentedRobot(self._backend, tracer)
+
+        self.startup_timings: Dict[str, float] = {}
+        self.board_startup_timings: Dict[str, float] = {}
+        self.state = StateStore()
+
+        with self._time_phase("setup"):
+            self._backend.setup()
+
+        with self._time_phase("discovery"):
+            power_boards = self._backend.power_boards()
+            motor_board_backends = self._backend.motor_boards()
+            servo_assembly_backends = self._backend.servo_assemblies()
 
-        power_boards = self._backend.power_boards()
         if len(power_boards) == 0:
             raise RuntimeError("There is no power board connected.")
         elif len(power_boards) > 1:
             raise RuntimeError("There are multiple power boards connected.")
-        (power_board_serial, power_board_backend), = power_boards.items()
-        self.power_board = PowerBoard(power_board_serial, power_board_backend)
+        ((power_board_serial, power_board_backend),) = power_boards.items()
 
-        self.motor_boards = {
-            serial: MotorBoard(serial, backend)
-            for serial, backend in self._backend.motor_boards().items()
-        }
+        with self._time_phase("boards"):
+            constructors: Dict[str, Callable[[], Any]] = {
+                power_board_serial: functools.partial(
+                    PowerBoard, power_board_serial, power_board_backend
+                )
+            }
+            constructors.update(
+                (
+                    serial,
+                    functools.partial(
+                        MotorBoard, serial, backend, state=self.state, tracer=tracer
+                    ),
+                )
+                for serial, backend in motor_board_backends.items()
+            )
+            constructors.update(
+                (
+                    serial,
+                    functools.partial(
+                        ServoBoard, serial, backend, state=self.state, tracer=tracer
+                    ),
+                )
+                for serial, backend in servo_assembly_backends.items()
+            )
+            boards = self._construct_boards(constructors)
 
-        self.servo_boards = {
-            serial: ServoBoard(serial, backend)
-            for serial, backend in self._backend.servo_assemblies().items()
+        self.power_board: PowerBoard = boards[power_board_serial]
+        self.motor_boards: Dict[str, MotorBoard] = {
+            serial: boards[serial] for serial in motor_board_backends
+        }
+        self.servo_boards: Dict[str, ServoBoard] = {
+            serial: boards[serial] for serial in servo_assembly_backends
         }
 
+        self._in_transaction = False
+        self._control_loop: Optional[ControlLoop] = None
+        self._rescan_lock = threading.Lock()
+        self._detached_boards: Dict[str, Any] = {}
+
+        self.telemetry: Optional[TelemetryPublisher] = None
+        if telemetry is not None:
+            self.telemetry = TelemetryPublisher(self.state, telemetry)
+
         if wait_for_start_button:
-            self.power_board.wait_start()
+            with self._time_phase("wait_start"):
+                self.power_board.wait_start()
+
+    @contextlib.contextmanager
+    def _time_phase(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = time.perf_counter() - start
+
+    def _construct_board(self, serial: str, constructor: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        board = constructor()
+        self.board_startup_timings[serial] = time.perf_counter() - start
+        return board
+
+    def _construct_boards(
+        self, constructors: Dict[str, Callable[[], Any]]
+    ) -> Dict[str, Any]:
+        """
+        Construct each board, interrogating them concurrently.
+
+        Board constructors talk to their backends, which for real hardware means a round-trip
+        over USB for each, so they are run on a thread pool.
+        """
+        if len(constructors) <= 1:
+            return {
+                serial: self._construct_board(serial, constructor)
+                for serial, constructor in constructors.items()
+            }
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(constructors), thread_name_prefix="robot-startup"
+        ) as executor:
+            futures = {
+                serial: executor.submit(self._construct_board, serial, constructor)
+                for serial, constructor in constructors.items()
+            }
+            return {serial: future.result() for serial, future in futures.items()}
+
+    def run_loop(
+        self,
+        callback: Callable[[], None],
+        *,
+        hz: float,
+        policy: OverrunPolicy = OverrunPolicy.SKIP,
+        cpu: Optional[int] = None,
+        max_iterations: Optional[int] = None
+    ) -> LoopStatistics:
+        """
+        Call `callback` at a fixed rate, until `stop_loop` is called.
+
+        Iterations are scheduled against monotonic deadlines, so the loop doesn't drift. When
+        an iteration overruns, missed iterations are dropped or run back-to-back according to
+        `policy`. With `cpu` set, the calling thread is pinned to that CPU while looping.
+
+        Statistics about the loop, including jitter and a latency histogram, are available
+        from `loop_statistics` while it runs, and are returned once it finishes.
+        """
+        self._control_loop = ControlLoop(callback, hz=hz, policy=policy, cpu=cpu)
+        return self._control_loop.run(max_iterations)
+
+    def stop_loop(self) -> None:
+        """Stop the loop started by `run_loop`, after its current iteration."""
+        if self._control_loop is not None:
+            self._control_loop.stop()
+
+    @property
+    def loop_statistics(self) -> Optional[LoopStatistics]:
+        """Get live statistics for the loop started by `run_loop`, if there is one."""
+        if self._control_loop is None:
+            return None
+        return self._control_loop.statistics
+
+    def ramp_motors(
+        self,
+        *,
+        rate: float = 100.0,
+        acceleration: float = 4.0,
+        deceleration: Optional[float] = None
+    ) -> MotorRamp:
+        """
+        Start ramping every motor channel towards targets set on the returned `MotorRamp`.
+
+        Outputs change by at most `acceleration`, or `deceleration` towards zero, fractions of
+        full power per second, stepped `rate` times per second in the background. Call `stop`
+        on the returned ramp, or use it as a context manager, to stop ramping.
+        """
+        ramp = MotorRamp(
+            self.motor_boards.values(),
+            rate=rate,
+            acceleration=acceleration,
+            deceleration=deceleration,
+        )
+        ramp.start()
+        return ramp
+
+    def rescan(self) -> BoardChanges:
+        """
+        Look for motor and servo boards connected, disconnected or reset since the last scan.
+
+        Boards are matched by serial: only those which changed are added to, or removed
+        from, `motor_boards` and `servo_boards`. A board which is reset, or reconnected after
+        being disconnected, keeps its frontend, and the outputs last commanded on it are sent
+        to it again.
+        """
+        with self._rescan_lock:
+            self._backend.rescan()
+            changes = BoardChanges([], [], [])
+            self.motor_boards = self._rescan_boards(
+                self._backend.motor_boards(),
+                self.motor_boards,
+                lambda serial, backend: MotorBoard(
+                    serial, backend, state=self.state, tracer=self.tracer
+                ),
+                changes,
+            )
+            self.servo_boards = self._rescan_boards(
+                self._backend.servo_assemblies(),
+                self.servo_boards,
+                lambda serial, backend: ServoBoard(
+                    serial, backend, state=self.state, tracer=self.tracer
+                ),
+                changes,
+            )
+            return changes
+
+    def _rescan_boards(
+        self,
+        backends: Mapping[str, Any],
+        boards: Dict[str, Any],
+        constructor: Callable[[str, Any], Any],
+        changes: BoardChanges,
+    ) -> Dict[str, Any]:
+        # Build a new dict rather than changing the existing one, so that code iterating over
+        # it on another thread isn't disturbed
+        rescanned = {}
+        for serial, backend in backends.items():
+            board = boards.get(serial)
+            if board is None and serial in self._detached_boards:
+                board = self._detached_boards.pop(serial)
+                board._rebind(backend)
+                changes.reconnected.append(serial)
+            elif board is None:
+                board = constructor(serial, backend)
+                changes.added.append(serial)
+            elif board._backend is not backend:
+                board._rebind(backend)
+                changes.reconnected.append(serial)
+            rescanned[serial] = board
+        for serial, board in boards.items():
+            if serial not in rescanned:
+                self._detached_boards[serial] = board
+                changes.removed.append(serial)
+        return rescanned
+
+    def watch_boards(
+        self,
+        *,
+        interval: float = 1.0,
+        callback: Optional[Callable[[BoardChanges], None]] = None
+    ) -> HotplugWatcher:
+        """
+        Start calling `rescan` every `interval` seconds in the background.
+
+        If `callback` is given, it is called with the changes from each rescan which found
+        any. Call `stop` on the returned watcher, or use it as a context manager, to stop.
+        """
+        watcher = HotplugWatcher(self.rescan, interval=interval, callback=callback)
+        watcher.start()
+        return watcher
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group motor and servo output changes so they are committed together.
+
+        Changes made within the block are validated immediately, but are only sent to the
+        hardware on leaving the block, with a single batched write per board. If the block
+        raises, the buffered changes are discarded and the previous states are restored. If
+        sending to a board fails, that board and those after it keep their previous states.
+
+        Nested transactions are folded into the outermost one.
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        boards: List[Union[MotorBoard, ServoBoard]] = [
+            *self.motor_boards.values(),
+            *self.servo_boards.values(),
+        ]
+        for board in boards:
+            board._begin_transaction()
+        self._in_transaction = True
+        try:
+            yield
+        except BaseException:
+            for board in boards:
+                board._abort_transaction()
+            raise
+        else:
+            committed = 0
+            try:
+                for board in boards:
+                    board._commit_transaction()
+                    committed += 1
+            finally:
+                for board in boards[committed:]:
+                    board._abort_transaction()
+        finally:
+            self._in_transaction = False
 
     @staticmethod
     def _get_default_backend() -> BaseRobot:
-        return DummyRobot(motor_boards={}, power_boards={}, servo_assemblies={})
+        return create_backend(os.environ.get("ROBOT_BACKEND", "dummy"))
 
     @property
     def motor_board(self) -> MotorBoard:
@@ -1,9 +1,44 @@
 """Front-end servo board API."""
+
 import enum
 import functools
-from typing import Any, Callable, Iterable, Optional
-
+import math
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from robot.analogue import AnalogueSampler
 from robot.backends.base import BaseServoAssembly, ServoPosition
+from robot.command_cache import CommandCache
+from robot.edges import Edge, EdgeWatcher
+from robot.output_cache import OutputCache, WriteStatistics
+from robot.state import (
+    CODE_INPUT,
+    CODE_INPUT_PULLUP,
+    CODE_OUTPUT_HIGH,
+    CODE_OUTPUT_LOW,
+    CODE_UNSET,
+    CODE_VALUE,
+    StateKind,
+    StateStore,
+)
+from robot.tracing import UNTRACED, Tracer, traced
+from robot.ultrasound import UltrasoundFilter, UltrasoundScheduler
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+    from robot.trajectory import Trajectory, TrajectoryPlayer
 
 
 class CommandError(RuntimeError):
@@ -30,28 +65,76 @@ class PinValue(enum.Enum):
     LOW = False
 
 
+_PIN_VALUES = {False: PinValue.LOW, True: PinValue.HIGH}
+
+_PIN_MODE_CODES = {
+    PinMode.INPUT: CODE_INPUT,
+    PinMode.INPUT_PULLUP: CODE_INPUT_PULLUP,
+    PinMode.OUTPUT_HIGH: CODE_OUTPUT_HIGH,
+    PinMode.OUTPUT_LOW: CODE_OUTPUT_LOW,
+}
+_PIN_MODES = {code: mode for mode, code in _PIN_MODE_CODES.items()}
+_READABLE_PIN_MODE_CODES = (CODE_INPUT, CODE_INPUT_PULLUP)
+
+
 class GPIOPin:
     """An individual GPIO pin."""
 
-    def __init__(self, index: int, backend: BaseServoAssembly) -> None:
+    __slots__ = (
+        "_index",
+        "_backend",
+        "_state",
+        "_slot",
+        "_read_digital",
+        "_edges",
+        "_tracer",
+        "_board",
+    )
+
+    def __init__(
+        self,
+        index: int,
+        backend: BaseServoAssembly,
+        *,
+        read_digital: Optional[Callable[[], bool]] = None,
+        state: Optional[StateStore] = None,
+        slot: Optional[int] = None,
+        edges: Optional[EdgeWatcher] = None,
+        tracer: Optional[Tracer] = None,
+        board: str = ""
+    ) -> None:
         """
         Construct internally.
 
-        This takes a pin index, and a backend.
+        This takes a pin index, and a backend. Reads go straight to the backend unless a
+        callable to read the pin's digital value is given. The pin's mode is held in the given
+        slot of a state store, or in a store of its own. Edges are detected by the given
+        watcher, shared with the board's other pins, or by one of the pin's own. Reads are
+        traced by the given tracer, against the given board serial number.
         """
         self._index = index
         self._backend = backend
-        self._mode = PinMode.INPUT
+        if state is None or slot is None:
+            state = StateStore()
+            slot = state.allocate(StateKind.GPIO, "", 1, CODE_INPUT)
+        self._state = state
+        self._slot = slot
+        if read_digital is None:
+            read_digital = functools.partial(backend.gpio_read_digital, index)
+        self._read_digital = read_digital
+        self._edges = edges
+        self._tracer = UNTRACED if tracer is None else tracer
+        self._board = board
 
     @property
     def mode(self) -> PinMode:
         """Get the pin's current mode."""
-        return self._mode
+        return _PIN_MODES[self._state.codes[self._slot]]
 
     @mode.setter
     def mode(self, new_mode: PinMode) -> None:
         """Set the pin's mode."""
-        self._mode = new_mode
+        self._state.write(self._slot, _PIN_MODE_CODES[new_mode])
         {
             PinMode.INPUT: self._backend.gpio_set_input,
             PinMode.INPUT_PULLUP: self._backend.gpio_set_input_pullup,
@@ -59,39 +142,103 @@ class GPIOPin:
             PinMode.OUTPUT_LOW: self._backend.gpio_output_low,
         }[new_mode](self._index)
 
+    @traced("GPIOPin.read", board="_board")
     def read(self) -> PinValue:
         """Read the current digital value on the pin."""
-        if self._mode not in (PinMode.INPUT, PinMode.INPUT_PULLUP):
+        if self._state.codes[self._slot] not in _READABLE_PIN_MODE_CODES:
             raise ValueError("Cannot read from this pin in output mode.")
 
-        return {False: PinValue.LOW, True: PinValue.HIGH}[
-            self._backend.gpio_read_digital(self._index)
-        ]
+        value = self._read_digital()
+        if self._state.record_reads:
+            self._state.write_value(self._slot, 1.0 if value else 0.0)
+        return _PIN_VALUES[value]
+
+    def read_analogue(self) -> float:
+        """Read the current analogue value on the pin, in volts."""
+        if self._state.codes[self._slot] not in _READABLE_PIN_MODE_CODES:
+            raise ValueError("Cannot read from this pin in output mode.")
+
+        value = self._backend.gpio_read_analogue(self._index)
+        if self._state.record_reads:
+            self._state.write_value(self._slot, value)
+        return value
+
+    def _edge_watcher(self) -> EdgeWatcher:
+        if self._state.codes[self._slot] not in _READABLE_PIN_MODE_CODES:
+            raise ValueError("Cannot read from this pin in output mode.")
+        if self._edges is None:
+            self._edges = EdgeWatcher(self._backend)
+        return self._edges
+
+    def wait_for_edge(
+        self, edge: Edge = Edge.BOTH, timeout: Optional[float] = None
+    ) -> Optional[PinValue]:
+        """
+        Wait for the pin's digital value to change, returning the new value.
+
+        Returns None if `timeout` seconds pass first. The pin is polled in the background,
+        along with any other pins of the board being waited for, so waiting costs the caller
+        no CPU time.
+        """
+        level = self._edge_watcher().wait_for_edge(self._index, edge, timeout)
+        if level is None:
+            return None
+        if self._state.record_reads:
+            self._state.write_value(self._slot, 1.0 if level else 0.0)
+        return _PIN_VALUES[level]
+
+    def add_edge_callback(
+        self, callback: Callable[[PinValue], None], edge: Edge = Edge.BOTH
+    ) -> Any:
+        """
+        Call a function with the new value whenever the pin's digital value changes.
+
+        The callback is called from a background thread. Returns a handle to pass to
+        `remove_edge_callback`.
+        """
+        return self._edge_watcher().add_callback(
+            self._index, lambda pin, level: callback(_PIN_VALUES[level]), edge
+        )
+
+    def remove_edge_callback(self, handle: Any) -> None:
+        """Stop calling a callback added with `add_edge_callback`."""
+        if self._edges is not None:
+            self._edges.remove_callback(handle)
 
 
 class Servo:
     """An individual servo output on a servo board."""
 
+    __slots__ = ("_drive", "_state", "_slot")
+
     def __init__(
-        self, *, drive: Callable[[float], None], initial_position: Optional[float]
+        self, *, drive: Callable[[float], None], state: StateStore, slot: int
     ) -> None:
         """
         Construct for internal use.
 
-        Initialised from a started reporting position and a callable for setting new positions.
+        Initialised from a callable for setting new positions, and the slot of a state store
+        holding the current position.
         """
         self._drive = drive
-        self._position = initial_position
+        self._state = state
+        self._slot = slot
 
     @property
     def position(self) -> Optional[float]:
         """Get the current position to which this servo is driven."""
-        return self._position
+        if self._state.codes[self._slot] == CODE_UNSET:
+            return None
+        return self._state.values[self._slot]
 
     @position.setter
     def position(self, new_position: Optional[float]) -> None:
         """Drive this servo to a new position."""
-        self._position = new_position
+        if new_position is None:
+            self._state.write(self._slot, CODE_UNSET)
+        else:
+            ServoBoard._position_for_value(new_position)
+            self._state.write(self._slot, CODE_VALUE, new_position)
         # We don't actually support setting to `None` alas
         if new_position is not None:
             self._drive(new_position)
@@ -100,20 +247,97 @@ class Servo:
 class ServoBoard:
     """Front-end servo board."""
 
-    def __init__(self, serial: str, backend: BaseServoAssembly) -> None:
-        """Initialise with serial/backend."""
+    __slots__ = (
+        "serial",
+        "_backend",
+        "_tracer",
+        "command_cache",
+        "_num_servos",
+        "_num_pins",
+        "_state",
+        "_first_servo_slot",
+        "edge_watcher",
+        "servos",
+        "gpios",
+        "_pin_snapshot",
+        "_pin_snapshot_time",
+        "_pin_snapshot_max_age",
+        "_saved_positions",
+        "_pending_positions",
+        "_writes",
+    )
+
+    def __init__(
+        self,
+        serial: str,
+        backend: BaseServoAssembly,
+        *,
+        state: Optional[StateStore] = None,
+        tracer: Optional[Tracer] = None
+    ) -> None:
+        """
+        Initialise with serial/backend.
+
+        Servo positions and pin modes are held in a `StateStore`, shared with the rest of the
+        robot if one is given. Edges on every pin are detected by `edge_watcher`, which only
+        polls the board while something is waiting for them. Operations on the board are
+        traced by the given tracer.
+
+        Responses to direct commands are cached by `command_cache`, if it is set to a
+        `CommandCache`.
+        """
         self.serial = serial
         self._backend = backend
+        self._tracer = UNTRACED if tracer is None else tracer
+        self.command_cache: Optional[CommandCache] = None
 
         self._num_servos = self._backend.num_servos()
         self._num_pins = self._backend.gpio_num_pins()
 
+        self._state = StateStore() if state is None else state
+        self._first_servo_slot = self._state.allocate(
+            StateKind.SERVO, serial, self._num_servos, CODE_UNSET
+        )
+        first_pin_slot = self._state.allocate(
+            StateKind.GPIO, serial, self._num_pins, CODE_INPUT
+        )
+        self.edge_watcher = EdgeWatcher(self._backend)
+
         self.servos = [
-            Servo(drive=functools.partial(self._set_servo, n), initial_position=None)
-            for n in range(self._backend.num_servos())
+            Servo(
+                drive=functools.partial(self._set_servo, n),
+                state=self._state,
+                slot=self._first_servo_slot + n,
+            )
+            for n in range(self._num_servos)
         ]
-
-    def _set_servo(self, index: int, value: float) -> None:
+        self.gpios = [
+            GPIOPin(
+                n,
+                self._backend,
+                read_digital=functools.partial(self._read_digital, n),
+                state=self._state,
+                slot=first_pin_slot + n,
+                edges=self.edge_watcher,
+                tracer=tracer,
+                board=serial,
+            )
+            for n in range(self._num_pins)
+        ]
+        self._pin_snapshot: Sequence[bool] = ()
+        self._pin_snapshot_time = float("-inf")
+        self._pin_snapshot_max_age: Optional[float] = None
+
+        self._saved_positions = self._state.save(
+            self._first_servo_slot, self._num_servos
+        )
+        self._pending_positions: Optional[Dict[int, Optional[ServoPosition]]] = None
+        self._writes: OutputCache[Optional[ServoPosition]] = OutputCache(
+            self._send_positions
+        )
+
+    @staticmethod
+    def _position_for_value(value: float) -> ServoPosition:
         if value < -1.0 or value > 1.0:
             raise ValueError(
                 "Servo ranges are from -1 to 1 (given: {value})".format(value=value)
@@ -124,8 +348,277 @@ class ServoBoard:
             mapped_value = 0
         elif mapped_value >= 100:
             mapped_value = 100
-        self._backend.set_servo(index, ServoPosition(mapped_value))
+        return ServoPosition(mapped_value)
+
+    @traced("ServoBoard.set_servo")
+    def _set_servo(self, index: int, value: float) -> None:
+        position = self._position_for_value(value)
+        if self._pending_positions is not None:
+            self._pending_positions[index] = position
+        else:
+            self._writes.write(index, position)
+
+    def _set_mapped_servos(
+        self, values: Mapping[int, float], positions: Mapping[int, ServoPosition]
+    ) -> None:
+        """Set several servos at once, given both their values and mapped positions."""
+        first_slot = self._first_servo_slot
+        self._state.write_many(
+            (first_slot + index, CODE_VALUE, value) for index, value in values.items()
+        )
+        if self._pending_positions is not None:
+            self._pending_positions.update(positions)
+        else:
+            self._writes.write_many(positions)
+
+    def _send_positions(self, positions: Dict[int, Optional[ServoPosition]]) -> None:
+        if len(positions) == 1:
+            ((index, position),) = positions.items()
+            self._backend.set_servo(index, position)
+        else:
+            self._backend.set_servos(positions)
+
+    def _rebind(self, backend: BaseServoAssembly) -> None:
+        num_servos, num_pins = backend.num_servos(), backend.gpio_num_pins()
+        if num_servos != self._num_servos or num_pins != self._num_pins:
+            raise RuntimeError(
+                "Servo board {serial} reconnected with a different shape".format(
+                    serial=self.serial
+                )
+            )
+        self._backend = backend
+        for pin in self.gpios:
+            pin._backend = backend
+        self.edge_watcher._rebind(backend)
+        self._pin_snapshot_time = float("-inf")
+        self._writes.invalidate()
+
+        # Restore the last commanded state: servos which were driven, and pins which aren't
+        # in the default input mode
+        for pin in self.gpios:
+            if pin.mode is not PinMode.INPUT:
+                pin.mode = pin.mode
+        values = {}
+        positions = {}
+        for index, servo in enumerate(self.servos):
+            value = servo.position
+            if value is not None:
+                values[index] = value
+                positions[index] = self._position_for_value(value)
+        if values:
+            self._set_mapped_servos(values, positions)
+
+    def _begin_transaction(self) -> None:
+        self._saved_positions = self._state.save(
+            self._first_servo_slot, self._num_servos
+        )
+        self._pending_positions = {}
+
+    def _commit_transaction(self) -> None:
+        positions = self._pending_positions
+        if positions:
+            self._writes.write_many(positions)
+            self._writes.flush()
+        self._pending_positions = None
+
+    def _abort_transaction(self) -> None:
+        positions, self._pending_positions = self._pending_positions, None
+        self._state.restore(self._first_servo_slot, self._saved_positions)
+        if positions:
+            # Replace any of the transaction's positions which failed to send
+            self._writes.discard(positions)
+            restored = {}
+            for index in positions:
+                value = self.servos[index].position
+                if value is not None:
+                    restored[index] = self._position_for_value(value)
+            self._writes.hold(restored)
+
+    @property
+    def coalesce_window(self) -> Optional[float]:
+        """
+        Get the window, in seconds, over which servo position changes are coalesced.
+
+        When set, only the last position written to each servo within the window is sent to
+        the board. None, the default, sends every change immediately.
+        """
+        return self._writes.coalesce_window
 
+    @coalesce_window.setter
+    def coalesce_window(self, window: Optional[float]) -> None:
+        """Set the window, in seconds, over which servo position changes are coalesced."""
+        self._writes.coalesce_window = window
+
+    @property
+    def write_statistics(self) -> WriteStatistics:
+        """Get counters of servo writes requested, sent, suppressed and coalesced."""
+        return self._writes.statistics
+
+    def flush(self) -> None:
+        """Send any servo position changes held back by coalescing now."""
+        self._writes.flush()
+
+    def invalidate_cache(self) -> None:
+        """
+        Forget which servo positions were last sent to the board.
+
+        Unchanged positions are not re-sent to the board. Call this if the board has been
+        reset, so that the next write to each servo goes through regardless.
+        """
+        self._writes.invalidate()
+
+    def set_positions(self, positions: Sequence[float]) -> None:
+        """
+        Drive every servo at once, given a position for each, indexed by servo.
+
+        Positions are validated and mapped as a whole array, with NumPy where it is available,
+        and only the servos whose positions change are sent to the board, in a single batched
+        write. Servos given NaN are left as they are.
+        """
+        if len(positions) != self._num_servos:
+            raise ValueError(
+                "Expected {expected} servo positions (given: {given})".format(
+                    expected=self._num_servos, given=len(positions)
+                )
+            )
+        start = self._first_servo_slot
+        end = start + self._num_servos
+        codes = self._state.codes[start:end]
+        current = self._state.values[start:end]
+
+        try:
+            import numpy
+        except ImportError:
+            values = {}
+            mapped = {}
+            for index, value in enumerate(positions):
+                if math.isnan(value):
+                    continue
+                position = self._position_for_value(value)
+                if codes[index] != CODE_VALUE or current[index] != value:
+                    values[index] = value
+                    mapped[index] = position
+        else:
+            requested = numpy.asarray(positions, dtype=numpy.float64)
+            given = ~numpy.isnan(requested)
+            if numpy.any(given & ((requested < -1.0) | (requested > 1.0))):
+                raise ValueError("Servo ranges are from -1 to 1")
+            changed = numpy.flatnonzero(
+                given
+                & (
+                    (numpy.frombuffer(codes, dtype=numpy.uint8) != CODE_VALUE)
+                    | (numpy.frombuffer(current, dtype=numpy.float64) != requested)
+                )
+            )
+            mapped_array = numpy.clip(
+                numpy.floor(requested[changed] * 50.0 + 50.5), 0, 100
+            ).astype(numpy.int64)
+            indices = changed.tolist()
+            values = dict(zip(indices, requested[changed].tolist()))
+            mapped = {
+                index: ServoPosition(position)
+                for index, position in zip(indices, mapped_array.tolist())
+            }
+
+        if values:
+            self._set_mapped_servos(values, mapped)
+
+    def get_positions(self) -> "numpy.ndarray[Any, Any]":
+        """
+        Get the position of every servo as a NumPy array, indexed by servo.
+
+        Servos which have not been driven read as NaN.
+        """
+        import numpy
+
+        start = self._first_servo_slot
+        end = start + self._num_servos
+        codes = numpy.frombuffer(self._state.codes[start:end], dtype=numpy.uint8)
+        values = numpy.frombuffer(self._state.values[start:end], dtype=numpy.float64)
+        positions: "numpy.ndarray[Any, Any]" = numpy.where(
+            codes == CODE_UNSET, numpy.nan, values
+        )
+        return positions
+
+    @property
+    def pin_snapshot_max_age(self) -> Optional[float]:
+        """
+        Get the maximum age, in seconds, of pin snapshots used to serve pin reads.
+
+        When set, `GPIOPin.read` is served from the most recent snapshot of all pins, as taken
+        by `read_all_pins`, refreshing it once it is older than this. None, the default, reads
+        the individual pin from the board on every read.
+        """
+        return self._pin_snapshot_max_age
+
+    @pin_snapshot_max_age.setter
+    def pin_snapshot_max_age(self, max_age: Optional[float]) -> None:
+        """Set the maximum age, in seconds, of pin snapshots used to serve pin reads."""
+        if max_age is not None and max_age < 0:
+            raise ValueError(
+                "Snapshot ages must be >= 0 (was given {max_age})".format(
+                    max_age=max_age
+                )
+            )
+        self._pin_snapshot_max_age = max_age
+
+    def read_all_pins(self) -> List[PinValue]:
+        """
+        Read the digital values of every GPIO pin at once, indexed by pin.
+
+        This reads all pins in a single command where the board supports it, regardless of
+        their modes.
+        """
+        snapshot = self._backend.gpio_read_all_digital()
+        self._pin_snapshot = snapshot
+        self._pin_snapshot_time = time.monotonic()
+        return [_PIN_VALUES[value] for value in snapshot]
+
+    def _read_digital(self, index: int) -> bool:
+        if self._pin_snapshot_max_age is None:
+            return self._backend.gpio_read_digital(index)
+        if time.monotonic() - self._pin_snapshot_time > self._pin_snapshot_max_age:
+            self.read_all_pins()
+        return self._pin_snapshot[index]
+
+    def sample_analogue(
+        self, pins: Iterable[int], *, rate: float, capacity: int = 1024
+    ) -> AnalogueSampler:
+        """
+        Start sampling analogue values from several pins in the background.
+
+        The pins are sampled `rate` times per second, and the most recent `capacity` samples of
+        each are kept. Call `stop` on the returned sampler, or use it as a context manager, to
+        stop sampling.
+        """
+        pins = list(pins)
+        for pin in pins:
+            self._validate_pin(pin)
+        sampler = AnalogueSampler(
+            self._backend.gpio_read_analogue, pins, rate=rate, capacity=capacity
+        )
+        sampler.start()
+        return sampler
+
+    def play_trajectory(
+        self, trajectory: "Trajectory", *, block: bool = True
+    ) -> "TrajectoryPlayer":
+        """
+        Play a precomputed trajectory, planned with `Trajectory.plan`, on this board.
+
+        Each tick's positions are sent in a single batched write. If `block` is false, the
+        trajectory is played in the background; call `wait` or `stop` on the returned player.
+        """
+        from robot.trajectory import TrajectoryPlayer
+
+        player = TrajectoryPlayer(self, trajectory)
+        if block:
+            player.play()
+        else:
+            player.start()
+        return player
+
+    @traced("ServoBoard.direct_command")
     def direct_command(self, *args: Iterable[Any]) -> str:
         """
         Issue a command directly to the Arduino.
@@ -134,15 +627,24 @@ class ServoBoard:
         decoded as UTF-8.
 
         In the event of an error response, `CommandError` is raised.
+
+        If `command_cache` is set, the response may come from it, or be shared with other
+        threads issuing the same command at the same time.
         """
-        encoded_arguments = [str(x).encode("utf-8") for x in args]
-        response = self._backend.direct_command(encoded_arguments)
+        encoded_arguments = tuple(str(x).encode("utf-8") for x in args)
+        if self.command_cache is None:
+            response = self._backend.direct_command(encoded_arguments)
+        else:
+            response = self.command_cache.call(
+                encoded_arguments, self._backend.direct_command
+            )
 
         if response.error:
             raise CommandError(response.message.decode("utf-8"))
 
         return response.message.decode("utf-8")
 
+    @traced("ServoBoard.read_ultrasound")
     def read_ultrasound(self, output_pin: int, input_pin: int) -> float:
         """
         Send out an ultrasound ping.
@@ -154,12 +656,44 @@ class ServoBoard:
         self._validate_pin(input_pin)
         return self._backend.ultrasound_pulse(output_pin, input_pin)
 
+    def ultrasound_scheduler(
+        self,
+        sensors: Iterable[Tuple[int, int]],
+        *,
+        interval: float = 0.03,
+        filter: UltrasoundFilter = UltrasoundFilter.MEDIAN,
+        window: int = 5,
+        tolerance: float = 0.2
+    ) -> UltrasoundScheduler:
+        """
+        Start ranging with several ultrasound sensors in the background.
+
+        Sensors are given as (output pin, input pin) pairs, and are pinged in turn, at least
+        `interval` seconds apart. Latest readings are available from the returned scheduler's
+        `latest` method without blocking. Call `stop` on the scheduler, or use it as a context
+        manager, to stop ranging.
+        """
+        sensors = list(sensors)
+        for output_pin, input_pin in sensors:
+            self._validate_pin(output_pin)
+            self._validate_pin(input_pin)
+        scheduler = UltrasoundScheduler(
+            self._backend.ultrasound_pulse,
+            sensors,
+            interval=interval,
+            filter=filter,
+            window=window,
+            tolerance=tolerance,
+        )
+        scheduler.start()
+        return scheduler
+
     def _validate_pin(self, pin: int) -> None:
         if pin < 0:
             raise ValueError(
                 "Pin indices must be >= 0 (was given {pin})".format(pin=pin)
             )
-        if pin > self._num_pins:
+        if pin >= self._num_pins:
             raise ValueError(
                 "Pin indices must be < {num_pins} (was given {pin})".format(
                     num_pins=self._num_pins, pin=pin
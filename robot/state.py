@@ -0,0 +1,289 @@
+"""
+Central store of every motor output, servo position and GPIO pin mode of a robot.
+
+Each value occupies a slot in two flat arrays: a code saying what kind of value it is, and a
+float holding the value itself where it has one. Motor outputs and servo positions are
+stored as `CODE_VALUE` with their value, or as one of the special codes for BRAKE, COAST and
+undriven servos. GPIO pins are stored as their mode's code, with the last value read from
+them.
+
+The frontend boards, servos and pins are views onto their slots, so a consistent snapshot of
+the whole robot is a copy of the two arrays.
+"""
+
+import array
+import enum
+import functools
+import itertools
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+@enum.unique
+class StateKind(enum.Enum):
+    """The kinds of value held in a state store."""
+
+    MOTOR = "motor"
+    SERVO = "servo"
+    GPIO = "gpio"
+
+
+StateKey = Tuple[StateKind, str, int]
+"""A slot's identity: the kind of value, the serial of its board, and its index there."""
+
+CODE_VALUE = 0
+CODE_BRAKE = 1
+CODE_COAST = 2
+CODE_UNSET = 3
+CODE_INPUT = 4
+CODE_INPUT_PULLUP = 5
+CODE_OUTPUT_HIGH = 6
+CODE_OUTPUT_LOW = 7
+
+SNAPSHOT_HEADER = struct.Struct("<4sId")
+SNAPSHOT_MAGIC = b"RST1"
+
+
+@functools.lru_cache(maxsize=None)
+def _special_values() -> Dict[int, Any]:
+    # Imported here as the frontends themselves depend on this module
+    from robot.motor import MotorDriveSpecialState
+    from robot.servo import PinMode
+
+    return {
+        CODE_BRAKE: MotorDriveSpecialState.BRAKE,
+        CODE_COAST: MotorDriveSpecialState.COAST,
+        CODE_UNSET: None,
+        CODE_INPUT: PinMode.INPUT,
+        CODE_INPUT_PULLUP: PinMode.INPUT_PULLUP,
+        CODE_OUTPUT_HIGH: PinMode.OUTPUT_HIGH,
+        CODE_OUTPUT_LOW: PinMode.OUTPUT_LOW,
+    }
+
+
+def decode(code: int, value: float) -> Any:
+    """Get the frontend value represented by a code and value."""
+    if code == CODE_VALUE:
+        return value
+    return _special_values()[code]
+
+
+class StateSnapshot:
+    """A copy of a state store's contents at a point in time."""
+
+    def __init__(
+        self,
+        keys: Sequence[StateKey],
+        codes: "array.array[int]",
+        values: "array.array[float]",
+        timestamp: float,
+    ) -> None:
+        """Construct from the slot keys, code and value arrays, and a monotonic timestamp."""
+        if not len(keys) == len(codes) == len(values):
+            raise ValueError("Snapshot keys, codes and values must be the same length")
+        self.keys = keys
+        self.codes = codes
+        self.values = values
+        self.timestamp = timestamp
+
+    def __len__(self) -> int:
+        """Get the number of slots."""
+        return len(self.codes)
+
+    def __getitem__(self, slot: int) -> Any:
+        """Get the frontend value held in a slot."""
+        return decode(self.codes[slot], self.values[slot])
+
+    def as_dict(self) -> Dict[StateKey, Any]:
+        """Get every frontend value, keyed by slot key."""
+        return {
+            key: decode(code, value)
+            for key, code, value in zip(self.keys, self.codes, self.values)
+        }
+
+    def changed_slots(self, previous: "StateSnapshot") -> List[int]:
+        """
+        Get the slots whose contents differ from those in an earlier snapshot.
+
+        Slots which didn't exist in the earlier snapshot count as changed. The comparison is
+        vectorised with NumPy where it is available.
+        """
+        shared = min(len(self), len(previous))
+        added = list(range(shared, len(self)))
+        if self.codes[:shared] == previous.codes[:shared] and (
+            self.values[:shared] == previous.values[:shared]
+        ):
+            return added
+
+        try:
+            import numpy
+        except ImportError:
+            return [
+                slot
+                for slot, (code, value, old_code, old_value) in enumerate(
+                    zip(self.codes, self.values, previous.codes, previous.values)
+                )
+                if code != old_code or value != old_value
+            ] + added
+
+        codes = numpy.frombuffer(self.codes, dtype=numpy.uint8, count=shared)
+        values = numpy.frombuffer(self.values, dtype=numpy.float64, count=shared)
+        old_codes = numpy.frombuffer(previous.codes, dtype=numpy.uint8, count=shared)
+        old_values = numpy.frombuffer(
+            previous.values, dtype=numpy.float64, count=shared
+        )
+        changed = numpy.flatnonzero((codes != old_codes) | (values != old_values))
+        return [int(slot) for slot in changed] + added
+
+    def diff(self, previous: "StateSnapshot") -> Dict[StateKey, Tuple[Any, Any]]:
+        """Get (previous value, current value) for each slot which changed, by slot key."""
+        return {
+            self.keys[slot]: (
+                previous[slot] if slot < len(previous) else None,
+                self[slot],
+            )
+            for slot in self.changed_slots(previous)
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the codes and values, for telemetry.
+
+        The slot keys aren't included, since they don't change once boards are set up; send
+        them separately.
+        """
+        return (
+            SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(self), self.timestamp)
+            + self.values.tobytes()
+            + self.codes.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, keys: Sequence[StateKey]) -> "StateSnapshot":
+        """Deserialise a snapshot serialised with `to_bytes`, given the slot keys."""
+        magic, count, timestamp = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a serialised state snapshot")
+        values_start = SNAPSHOT_HEADER.size
+        values_end = values_start + count * 8
+        codes_end = values_end + count
+        values = array.array("d")
+        values.frombytes(data[values_start:values_end])
+        codes = array.array("B")
+        codes.frombytes(data[values_end:codes_end])
+        return cls(keys, codes, values, timestamp)
+
+
+class StateStore:
+    """
+    Every motor, servo and GPIO value of a robot, in flat arrays.
+
+    Boards allocate their slots as they are set up, extending the arrays, and slots are found
+    by key through an index. Writes and snapshots are made under a
+    lock, so snapshots are always consistent. `version` is incremented by every change.
+
+    Values read from GPIO pins are only written while `record_reads` is set, as it is by a
+    telemetry publisher, so that reads don't pay for the lock otherwise.
+    """
+
+    def __init__(self) -> None:
+        """Construct, empty."""
+        self.codes = array.array("B")
+        self.values = array.array("d")
+        self.keys: List[StateKey] = []
+        self._slots: Dict[StateKey, int] = {}
+        self.version = 0
+        self.record_reads = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of slots."""
+        return len(self.codes)
+
+    def allocate(self, kind: StateKind, serial: str, count: int, code: int) -> int:
+        """Allocate consecutive slots for a board, returning the first."""
+        with self._lock:
+            start = len(self.codes)
+            self.codes.extend(itertools.repeat(code, count))
+            self.values.extend(itertools.repeat(0.0, count))
+            for index in range(count):
+                key = (kind, serial, index)
+                self._slots[key] = len(self.keys)
+                self.keys.append(key)
+            self.version += 1
+            return start
+
+    def slot(self, kind: StateKind, serial: str, index: int) -> int:
+        """Get the slot holding a given value."""
+        try:
+            return self._slots[kind, serial, index]
+        except KeyError:
+            raise ValueError(
+                "No such slot: {kind} {serial} {index}".format(
+                    kind=kind.value, serial=serial, index=index
+                )
+            ) from None
+
+    def write(self, slot: int, code: int, value: float = 0.0) -> None:
+        """Write a single slot."""
+        with self._lock:
+            self.codes[slot] = code
+            self.values[slot] = value
+            self.version += 1
+
+    def write_value(self, slot: int, value: float) -> None:
+        """Write the value of a single slot, leaving its code unchanged."""
+        with self._lock:
+            self.values[slot] = value
+            self.version += 1
+
+    def write_many(self, writes: Iterable[Tuple[int, int, float]]) -> None:
+        """Write several slots at once, given (slot, code, value) for each."""
+        with self._lock:
+            for slot, code, value in writes:
+                self.codes[slot] = code
+                self.values[slot] = value
+            self.version += 1
+
+    def save(
+        self, start: int, count: int
+    ) -> Tuple["array.array[int]", "array.array[float]"]:
+        """Copy the contents of a range of slots, to be restored later with `restore`."""
+        end = start + count
+        with self._lock:
+            return self.codes[start:end], self.values[start:end]
+
+    def restore(
+        self, start: int, saved: Tuple["array.array[int]", "array.array[float]"]
+    ) -> None:
+        """Restore the contents of a range of slots saved with `save`."""
+        codes, values = saved
+        end = start + len(codes)
+        with self._lock:
+            self.codes[start:end] = codes
+            self.values[start:end] = values
+            self.version += 1
+
+    def snapshot(self) -> StateSnapshot:
+        """Take a consistent copy of every slot."""
+        with self._lock:
+            codes = self.codes[:]
+            values = self.values[:]
+            keys = list(self.keys)
+        return StateSnapshot(keys, codes, values, time.monotonic())
+
+    def export(self, codes: memoryview, values: memoryview) -> Tuple[int, int]:
+        """
+        Copy every slot's code and value into byte buffers, returning (slots, version).
+
+        The buffers must have room for every slot.
+        """
+        with self._lock:
+            count = len(self.codes)
+            codes[:count] = self.codes
+            size = count * self.values.itemsize
+            with memoryview(self.values) as source:
+                values[:size] = source.cast("B")
+            return count, self.version
@@ -0,0 +1,369 @@
+"""
+Publishing of a robot's state to shared memory, for other processes to read.
+
+The shared memory segment holds a header, packed as `HEADER`, followed by three regions:
+
+* the slot keys, as JSON, rewritten only when boards are added,
+* the value of each slot, as doubles,
+* the code of each slot, as bytes.
+
+The header's sequence number makes this a seqlock: the publisher makes it odd before
+changing anything and even again afterwards, so a reader which sees the same even sequence
+number before and after reading knows that what it read wasn't torn.
+
+The header's status is `STATUS_FAILED` once the publisher has stopped publishing because of
+an error, such as boards being added beyond the segment's capacity.
+"""
+
+import array
+import json
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from robot.background import BackgroundTask
+from robot.state import StateKey, StateKind, StateSnapshot, StateStore, decode
+
+HEADER = struct.Struct("<4sIQIIIIIdI")
+MAGIC = b"RTEL"
+FORMAT_VERSION = 2
+
+STATUS_OK = 0
+STATUS_FAILED = 1
+
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = 8
+
+Result = TypeVar("Result")
+
+# Segments created by publishers in this process, which share its resource tracker
+_created: Set[str] = set()
+
+
+class _Header(NamedTuple):
+    magic: bytes
+    format_version: int
+    sequence: int
+    layout: int
+    slots: int
+    capacity: int
+    keys_capacity: int
+    keys_length: int
+    timestamp: float
+    status: int
+
+
+def _regions(capacity: int, keys_capacity: int) -> Tuple[int, int, int, int]:
+    keys_start = HEADER.size
+    # Values are aligned for direct access as doubles
+    values_start = -(-(keys_start + keys_capacity) // 8) * 8
+    codes_start = values_start + capacity * 8
+    return keys_start, values_start, codes_start, codes_start + capacity
+
+
+class TelemetryPublisher(BackgroundTask):
+    """
+    Publishes a state store to a shared memory segment, from a background thread.
+
+    The store is copied into the segment at most `rate` times per second, and only when it
+    has changed. Room is made for `capacity` slots, defaulting to twice those in the store,
+    and `keys_capacity` bytes of slot keys.
+
+    If publishing in the background fails, for example because boards have been added
+    beyond the segment's capacity, publishing stops, the exception is kept in `error`, and
+    readers are told that the published state is out of date.
+
+    Values read from GPIO pins are recorded in the store while it is being published.
+    """
+
+    def __init__(
+        self,
+        state: StateStore,
+        name: Optional[str] = None,
+        *,
+        rate: float = 100.0,
+        capacity: Optional[int] = None,
+        keys_capacity: int = 65536
+    ) -> None:
+        """Create the segment, with a given name or a generated one, and start publishing."""
+        if rate <= 0:
+            raise ValueError(
+                "Publishing rates must be > 0 (was given {rate})".format(rate=rate)
+            )
+        if capacity is None:
+            capacity = max(len(state) * 2, 64)
+        super().__init__("telemetry-publisher")
+        self._state = state
+        state.record_reads = True
+        self._period = 1.0 / rate
+        self._capacity = capacity
+        self._keys_capacity = keys_capacity
+        keys_start, values_start, codes_start, end = _regions(capacity, keys_capacity)
+        self._memory = shared_memory.SharedMemory(name=name, create=True, size=end)
+        _created.add(self._memory.name)
+        self._buffer = _buffer(self._memory)
+        buffer = self._buffer
+        self._keys = buffer[keys_start:values_start]
+        self._values = buffer[values_start:codes_start]
+        self._codes = buffer[codes_start:end]
+
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._layout = 0
+        self._count = 0
+        self._keys_length = 0
+        self._published_version = -1
+        self._status = STATUS_OK
+        self.publish()
+        self.start()
+
+    @property
+    def name(self) -> str:
+        """Get the name of the shared memory segment."""
+        return self._memory.name
+
+    def publish(self) -> None:
+        """Copy the state store into the segment now, if it has changed."""
+        with self._lock:
+            if self._state.version == self._published_version:
+                return
+            if len(self._state) > self._capacity:
+                raise RuntimeError(
+                    "Telemetry segment has room for {capacity} slots, but the robot has "
+                    "{count}".format(capacity=self._capacity, count=len(self._state))
+                )
+            self._sequence += 1
+            _SEQUENCE.pack_into(self._buffer, _SEQUENCE_OFFSET, self._sequence)
+            count, self._published_version = self._state.export(
+                self._codes, self._values
+            )
+            if count != self._count:
+                keys = self._encode_keys(count)
+                self._keys[: len(keys)] = keys
+                self._keys_length = len(keys)
+                self._layout += 1
+                self._count = count
+            self._sequence += 1
+            self._write_header()
+
+    def _encode_keys(self, count: int) -> bytes:
+        keys = self._state.keys[:count]
+        encoded = json.dumps(
+            [[kind.value, serial, index] for kind, serial, index in keys]
+        ).encode("utf-8")
+        if len(encoded) > self._keys_capacity:
+            raise RuntimeError("Telemetry segment has no room for the slot keys")
+        return encoded
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(
+            self._buffer,
+            0,
+            MAGIC,
+            FORMAT_VERSION,
+            self._sequence,
+            self._layout,
+            self._count,
+            self._capacity,
+            self._keys_capacity,
+            self._keys_length,
+            time.time(),
+            self._status,
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._period):
+            try:
+                self.publish()
+            except Exception as e:
+                self.error = e
+                with self._lock:
+                    self._sequence += 1
+                    _SEQUENCE.pack_into(self._buffer, _SEQUENCE_OFFSET, self._sequence)
+                    self._status = STATUS_FAILED
+                    self._sequence += 1
+                    self._write_header()
+                return
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop publishing, and remove the segment, on leaving a `with` block."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop publishing, and remove the segment."""
+        self.stop()
+        self._state.record_reads = False
+        for view in (self._keys, self._values, self._codes, self._buffer):
+            view.release()
+        self._memory.close()
+        self._memory.unlink()
+        _created.discard(self._memory.name)
+
+
+class TelemetryClient:
+    """
+    Read-only view of a robot's state published by a `TelemetryPublisher`.
+
+    Reads come straight from shared memory, never touching the robot's hardware, and are
+    retried until they aren't torn by a concurrent publish. Once the publisher has stopped
+    because of an error, reads raise `RuntimeError`, as the state is out of date.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Attach to the segment with a given name."""
+        self._memory = _attach(name)
+        self._buffer = _buffer(self._memory)
+        header = self._header()
+        if header.magic != MAGIC or header.format_version != FORMAT_VERSION:
+            self._buffer.release()
+            self._memory.close()
+            raise ValueError("Not a telemetry segment: {name}".format(name=name))
+        keys_start, values_start, codes_start, end = _regions(
+            header.capacity, header.keys_capacity
+        )
+        buffer = self._buffer
+        self._keys_region = buffer[keys_start:values_start]
+        self._values_region = buffer[values_start:codes_start]
+        self._codes_region = buffer[codes_start:end]
+        self._values = self._values_region.cast("d")
+        self._layout = -1
+        self._keys: List[StateKey] = []
+        self._slots: Dict[StateKey, int] = {}
+
+    def _header(self) -> _Header:
+        return _Header(*HEADER.unpack_from(self._buffer))
+
+    def _sequence(self) -> int:
+        sequence: int = _SEQUENCE.unpack_from(self._buffer, _SEQUENCE_OFFSET)[0]
+        return sequence
+
+    def read(
+        self, reader: Callable[["memoryview[int]", "memoryview[float]", int], Result]
+    ) -> Result:
+        """
+        Call `reader` on the published state until it reads it untorn, returning its result.
+
+        `reader` is given zero-copy views of the codes, as bytes, and of the values, as
+        doubles, along with the number of slots. It may be called more than once, and the
+        views must not be kept beyond the call.
+        """
+        while True:
+            header = self._header()
+            if header.sequence % 2:
+                time.sleep(0)
+                continue
+            if header.status == STATUS_FAILED:
+                raise RuntimeError(
+                    "Telemetry publishing failed, so the published state is out of date"
+                )
+            if header.layout != self._layout:
+                self._load_keys(header)
+            try:
+                result = reader(self._codes_region, self._values, header.slots)
+            except (KeyError, IndexError):
+                # Torn reads can find the keys out of step with the slots
+                if self._sequence() == header.sequence:
+                    raise
+                continue
+            if self._sequence() == header.sequence:
+                return result
+
+    def _load_keys(self, header: _Header) -> None:
+        encoded = bytes(self._keys_region[: header.keys_length])
+        if self._sequence() != header.sequence:
+            # Torn: the caller retries, and reloads the keys
+            return
+        self._keys = [
+            (StateKind(kind), serial, index)
+            for kind, serial, index in (json.loads(encoded) if encoded else [])
+        ]
+        self._slots = {key: slot for slot, key in enumerate(self._keys)}
+        self._layout = header.layout
+
+    @property
+    def keys(self) -> List[StateKey]:
+        """Get the keys of the published slots."""
+        self.read(lambda codes, values, count: None)
+        return list(self._keys)
+
+    def snapshot(self) -> StateSnapshot:
+        """Take a consistent copy of the published state."""
+
+        def copy(
+            codes: "memoryview[int]", values: "memoryview[float]", count: int
+        ) -> Tuple["array.array[int]", "array.array[float]", List[StateKey]]:
+            return (
+                array.array("B", codes[:count]),
+                array.array("d", values[:count]),
+                self._keys,
+            )
+
+        codes, values, keys = self.read(copy)
+        return StateSnapshot(keys, codes, values, time.monotonic())
+
+    def get(self, kind: StateKind, serial: str, index: int) -> Any:
+        """Get a single published value, such as a motor output or a pin's mode."""
+
+        def read_value(
+            codes: "memoryview[int]", values: "memoryview[float]", count: int
+        ) -> Any:
+            slot = self._slots[kind, serial, index]
+            return decode(codes[slot], values[slot])
+
+        return self.read(read_value)
+
+    def reading(self, serial: str, pin: int) -> float:
+        """Get the last value read from a GPIO pin: 1.0 or 0.0 if digital, else volts."""
+
+        def read_value(
+            codes: "memoryview[int]", values: "memoryview[float]", count: int
+        ) -> float:
+            value: float = values[self._slots[StateKind.GPIO, serial, pin]]
+            return value
+
+        return self.read(read_value)
+
+    def close(self) -> None:
+        """Detach from the segment."""
+        for view in (
+            self._values,
+            self._keys_region,
+            self._values_region,
+            self._codes_region,
+            self._buffer,
+        ):
+            view.release()
+        self._memory.close()
+
+
+def _buffer(memory: shared_memory.SharedMemory) -> memoryview:
+    if memory.buf is None:
+        raise RuntimeError("Shared memory segment is closed")
+    return memory.buf[:]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        # Python 3.13 and later: don't remove the segment when this process exits
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore
+    except TypeError:
+        pass
+    memory = shared_memory.SharedMemory(name=name)
+    if memory.name not in _created:
+        # Earlier versions register attached segments for removal too, so undo that
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(getattr(memory, "_name"), "shared_memory")
+    return memory
@@ -0,0 +1,261 @@
+"""Timeline tracing of frontend and backend operations, for profiling control loops."""
+
+import functools
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar, cast
+
+from robot.backends.instrumented import CallObserver
+
+FRONTEND = "frontend"
+BACKEND = "backend"
+USER = "user"
+
+Method = TypeVar("Method", bound=Callable[..., Any])
+
+
+class Span(NamedTuple):
+    """A traced operation."""
+
+    name: str
+    category: str
+    board: str
+    """The serial of the board operated on, or empty if there isn't one."""
+
+    thread: int
+    """The identifier of the thread the operation ran on."""
+
+    start: float
+    """The `time.perf_counter` time at which the operation started."""
+
+    duration: float
+    """The length of the operation, in seconds."""
+
+
+class _TracedSpan:
+    __slots__ = ("_tracer", "_key", "_start")
+
+    def __init__(self, tracer: "Tracer", key: Tuple[str, str, str]) -> None:
+        self._tracer = tracer
+        self._key = key
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        start = self._start
+        self._tracer._record(self._key, start, time.perf_counter() - start)
+
+
+class _UntracedSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        pass
+
+
+_UNTRACED = _UntracedSpan()
+
+
+class Tracer(CallObserver):
+    """
+    Records spans of time spent in operations into a preallocated ring buffer.
+
+    Once `capacity` spans have been recorded, each new span overwrites the oldest. Spans are
+    timed with `time.perf_counter`, and tagged with the thread they ran on. Nothing is
+    recorded while `enabled` is false.
+
+    Passed to a `Robot`, a tracer records the frontend's board operations and, as the
+    observer of an instrumented backend, every backend call. Spans of your own can be added
+    with `span`. Export the timeline with `write_chrome_trace`, to view it in Perfetto or
+    `chrome://tracing`.
+    """
+
+    def __init__(self, capacity: int = 65536, *, enabled: bool = True) -> None:
+        """Construct, empty, holding up to `capacity` spans."""
+        if capacity <= 0:
+            raise ValueError(
+                "Capacities must be > 0 (was given {capacity})".format(
+                    capacity=capacity
+                )
+            )
+        self.enabled = enabled
+        self._capacity = capacity
+        self._keys = array("I", bytes(4 * capacity))
+        self._threads = array("Q", bytes(8 * capacity))
+        self._starts = array("d", bytes(8 * capacity))
+        self._durations = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._length = 0
+        self.dropped = 0
+        self._key_ids: Dict[Tuple[str, str, str], int] = {}
+        self._key_list: List[Tuple[str, str, str]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @property
+    def capacity(self) -> int:
+        """Get the maximum number of spans held."""
+        return self._capacity
+
+    def __len__(self) -> int:
+        """Get the number of spans held."""
+        return self._length
+
+    def span(self, name: str, category: str = USER, board: str = "") -> Any:
+        """Get a context manager which records the time spent in its block as a span."""
+        if not self.enabled:
+            return _UNTRACED
+        return _TracedSpan(self, (name, category, board))
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        *,
+        category: str = USER,
+        board: str = ""
+    ) -> None:
+        """Record a span, given its `time.perf_counter` start time and duration."""
+        if self.enabled:
+            self._record((name, category, board), start, duration)
+
+    def observe(
+        self,
+        serial: str,
+        method: str,
+        args: Tuple[Any, ...],
+        result: Any,
+        error: Optional[BaseException],
+        start: float,
+        duration: float,
+    ) -> None:
+        """Record a completed backend call."""
+        if self.enabled:
+            self._record((method, BACKEND, serial), start, duration)
+
+    def _record(self, key: Tuple[str, str, str], start: float, duration: float) -> None:
+        thread = threading.get_ident()
+        with self._lock:
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = self._key_ids[key] = len(self._key_list)
+                self._key_list.append(key)
+            if thread not in self._thread_names:
+                self._thread_names[thread] = threading.current_thread().name
+            index = self._next
+            self._keys[index] = key_id
+            self._threads[index] = thread
+            self._starts[index] = start
+            self._durations[index] = duration
+            self._next = (index + 1) % self._capacity
+            if self._length == self._capacity:
+                self.dropped += 1
+            else:
+                self._length += 1
+
+    def clear(self) -> None:
+        """Discard all recorded spans."""
+        with self._lock:
+            self._next = 0
+            self._length = 0
+            self.dropped = 0
+            self._thread_names.clear()
+
+    def spans(self) -> List[Span]:
+        """Get the recorded spans, oldest first."""
+        with self._lock:
+            first = self._next if self._length == self._capacity else 0
+            indices = [(first + n) % self._capacity for n in range(self._length)]
+            return [
+                Span(
+                    *self._key_list[self._keys[index]],
+                    self._threads[index],
+                    self._starts[index],
+                    self._durations[index],
+                )
+                for index in indices
+            ]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Get the recorded spans in the Chrome trace-event format.
+
+        Times are in microseconds since the tracer was constructed.
+        """
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        threads = set()
+        for span in self.spans():
+            threads.add(span.thread)
+            event = {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start - self._origin) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread,
+            }
+            if span.board:
+                event["args"] = {"board": span.board}
+            events.append(event)
+        with self._lock:
+            for thread in sorted(threads):
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": thread,
+                        "args": {"name": self._thread_names[thread]},
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the recorded spans to a file in the Chrome trace-event JSON format."""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+UNTRACED = Tracer(1, enabled=False)
+"""A tracer which is never enabled, used by boards constructed without one."""
+
+
+def traced(name: str, *, board: str = "serial") -> Callable[[Method], Method]:
+    """
+    Trace calls to a frontend method as spans, with the given name.
+
+    The method's object must have a `_tracer`, and the serial number of its board in the
+    given attribute. While the tracer is disabled, this costs one extra call.
+    """
+
+    def decorator(method: Method) -> Method:
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            tracer: Tracer = self._tracer
+            if not tracer.enabled:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                tracer._record(
+                    (name, FRONTEND, getattr(self, board)),
+                    start,
+                    time.perf_counter() - start,
+                )
+
+        return cast(Method, wrapper)
+
+    return decorator
@@ -0,0 +1,209 @@
+"""
+Precomputed multi-servo trajectories.
+
+This module requires NumPy, which is available as the `numpy` extra.
+"""
+
+import enum
+import time
+from typing import TYPE_CHECKING, Any, Sequence
+
+import numpy
+
+from robot.background import BackgroundTask
+
+if TYPE_CHECKING:  # pragma: no cover
+    from robot.servo import ServoBoard
+
+
+@enum.unique
+class Profile(enum.Enum):
+    """Shape of the motion between successive keyframes."""
+
+    LINEAR = "linear"
+    CUBIC = "cubic"
+    TRAPEZOIDAL = "trapezoidal"
+
+
+def _ease(
+    progress: "numpy.ndarray[Any, Any]", profile: Profile, ramp: float
+) -> "numpy.ndarray[Any, Any]":
+    """Map progress through a segment, from 0 to 1, to the fraction of distance covered."""
+    if profile is Profile.LINEAR:
+        return progress
+    elif profile is Profile.CUBIC:
+        # Hermite easing: zero velocity at each keyframe
+        eased: "numpy.ndarray[Any, Any]" = progress * progress * (3.0 - 2.0 * progress)
+        return eased
+    elif profile is Profile.TRAPEZOIDAL:
+        # Constant acceleration for the first `ramp` of the segment, constant velocity, then
+        # constant deceleration for the last `ramp`
+        peak_velocity = 1.0 / (1.0 - ramp)
+        accelerating = peak_velocity * progress * progress / (2.0 * ramp)
+        cruising = peak_velocity * (progress - ramp / 2.0)
+        remaining = 1.0 - progress
+        decelerating = 1.0 - peak_velocity * remaining * remaining / (2.0 * ramp)
+        return numpy.where(
+            progress < ramp,
+            accelerating,
+            numpy.where(progress > 1.0 - ramp, decelerating, cruising),
+        )
+    else:
+        raise AssertionError("Unknown profile: {profile}".format(profile=profile))
+
+
+class Trajectory:
+    """
+    Positions for a set of servos, precomputed at a fixed tick rate.
+
+    Construct with `Trajectory.plan`.
+    """
+
+    def __init__(
+        self,
+        servos: Sequence[int],
+        rate: float,
+        positions: "numpy.ndarray[Any, Any]",
+    ) -> None:
+        """Construct from servo indices, tick rate and a ticks-by-servos position array."""
+        if positions.ndim != 2 or positions.shape[1] != len(servos):
+            raise ValueError(
+                "Positions must have one column per servo (shape was {shape})".format(
+                    shape=positions.shape
+                )
+            )
+        if numpy.any(positions < -1.0) or numpy.any(positions > 1.0):
+            raise ValueError("Servo ranges are from -1 to 1")
+        self.servos = list(servos)
+        self.rate = rate
+        self.positions = positions
+        # The same mapping as `ServoBoard._position_for_value`, over the whole array
+        self.mapped_positions = numpy.clip(
+            numpy.floor(positions * 50.0 + 50.5), 0, 100
+        ).astype(numpy.int64)
+
+    @classmethod
+    def plan(
+        cls,
+        servos: Sequence[int],
+        times: Sequence[float],
+        keyframes: Sequence[Sequence[float]],
+        *,
+        rate: float,
+        profile: Profile = Profile.LINEAR,
+        ramp: float = 0.25
+    ) -> "Trajectory":
+        """
+        Plan a trajectory through keyframes.
+
+        `times` gives the time of each keyframe in seconds, increasing from the first, and
+        `keyframes` the position of each servo at each of those times. Positions are computed
+        `rate` times per second, with motion between keyframes following the given profile.
+        For trapezoidal profiles, `ramp` is the fraction of each segment spent accelerating
+        and likewise decelerating.
+        """
+        if rate <= 0:
+            raise ValueError(
+                "Tick rates must be > 0 (was given {rate})".format(rate=rate)
+            )
+        if not 0.0 < ramp <= 0.5:
+            raise ValueError(
+                "Ramp fractions must be in (0, 0.5] (was given {ramp})".format(
+                    ramp=ramp
+                )
+            )
+        keyframe_times = numpy.asarray(times, dtype=numpy.float64)
+        keyframe_positions = numpy.asarray(keyframes, dtype=numpy.float64)
+        if keyframe_positions.shape != (len(keyframe_times), len(servos)):
+            raise ValueError(
+                "Expected {keyframes} keyframes of {servos} positions".format(
+                    keyframes=len(keyframe_times), servos=len(servos)
+                )
+            )
+        if len(keyframe_times) < 2:
+            raise ValueError("At least two keyframes are needed")
+        if numpy.any(numpy.diff(keyframe_times) <= 0):
+            raise ValueError("Keyframe times must be strictly increasing")
+
+        start, end = keyframe_times[0], keyframe_times[-1]
+        num_ticks = int(numpy.floor((end - start) * rate + 1e-9)) + 1
+        tick_times = start + numpy.arange(num_ticks) / rate
+
+        segments = numpy.clip(
+            numpy.searchsorted(keyframe_times, tick_times, side="right") - 1,
+            0,
+            len(keyframe_times) - 2,
+        )
+        segment_start = keyframe_times[segments]
+        segment_length = keyframe_times[segments + 1] - segment_start
+        progress = numpy.clip((tick_times - segment_start) / segment_length, 0.0, 1.0)
+        eased = _ease(progress, profile, ramp)[:, numpy.newaxis]
+
+        origin = keyframe_positions[segments]
+        positions = origin + (keyframe_positions[segments + 1] - origin) * eased
+        if tick_times[-1] < end:
+            positions = numpy.vstack([positions, keyframe_positions[-1]])
+        return cls(servos, rate, positions)
+
+    def __len__(self) -> int:
+        """Get the number of ticks."""
+        return len(self.positions)
+
+    @property
+    def duration(self) -> float:
+        """Get the time from the first tick to the last, in seconds."""
+        return (len(self) - 1) / self.rate
+
+
+class TrajectoryPlayer(BackgroundTask):
+    """
+    Plays a trajectory back to a servo board.
+
+    Each tick's positions are sent with a single batched write, at the trajectory's rate.
+    Stopping leaves the servos where they are.
+    """
+
+    def __init__(self, board: "ServoBoard", trajectory: Trajectory) -> None:
+        """Construct for a given board and trajectory."""
+        for servo in trajectory.servos:
+            if not 0 <= servo < len(board.servos):
+                raise ValueError("No such servo: {servo}".format(servo=servo))
+        super().__init__("trajectory-player")
+        self._board = board
+        self._trajectory = trajectory
+        self.ticks_played = 0
+        self.ticks_skipped = 0
+
+    def play(self) -> None:
+        """Play the trajectory on the calling thread, returning once it is finished."""
+        self._stop.clear()
+        self._run()
+
+    def _run(self) -> None:
+        trajectory = self._trajectory
+        period = 1.0 / trajectory.rate
+        servos = trajectory.servos
+        values = trajectory.positions.tolist()
+        mapped = trajectory.mapped_positions.tolist()
+        last_tick = len(values) - 1
+        start = time.monotonic()
+        tick = 0
+        while not self._stop.is_set():
+            self._board._set_mapped_servos(
+                dict(zip(servos, values[tick])), dict(zip(servos, mapped[tick]))
+            )
+            self.ticks_played += 1
+            if tick == last_tick:
+                return
+            # Skip any ticks we've fallen behind on, but always finish on the last one
+            due_tick = int((time.monotonic() - start) / period)
+            next_tick = min(max(tick + 1, due_tick), last_tick)
+            self.ticks_skipped += next_tick - tick - 1
+            tick = next_tick
+            self._stop.wait(max(start + tick * period - time.monotonic(), 0.0))
+
+    def wait(self) -> None:
+        """Wait for background playback to finish."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,155 @@
+"""Background scheduling and filtering of ultrasound ranging."""
+
+import collections
+import enum
+import statistics
+import threading
+import time
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from robot.background import BackgroundTask
+
+# Speed of sound in dry air at 20C, in metres per second
+SPEED_OF_SOUND = 343.0
+
+Sensor = Tuple[int, int]
+
+
+@enum.unique
+class UltrasoundFilter(enum.Enum):
+    """Filtering applied to raw ultrasound readings."""
+
+    NONE = "none"
+    MEDIAN = "median"
+    OUTLIER = "outlier"
+
+
+class UltrasoundReading(NamedTuple):
+    """A filtered ultrasound reading."""
+
+    echo_time: float
+    """The filtered time between transmit and receive, in seconds."""
+
+    timestamp: float
+    """The monotonic time at which the reading was taken."""
+
+    @property
+    def distance(self) -> float:
+        """Get the distance to the reflecting object, in metres."""
+        return self.echo_time * SPEED_OF_SOUND / 2
+
+
+class _SensorState:
+    def __init__(self, window: int) -> None:
+        self.history: Deque[float] = collections.deque(maxlen=window)
+        self.latest: Optional[UltrasoundReading] = None
+        self.rejected = 0
+
+
+class UltrasoundScheduler(BackgroundTask):
+    """
+    Cycles through a set of ultrasound sensors on a background thread.
+
+    Sensors, identified by their (output pin, input pin) pairs, are pinged one at a time in
+    turn, with at least `interval` seconds between the start of successive pings so that the
+    echoes of one don't reach another. The latest filtered reading from each sensor is
+    available without blocking from `latest`.
+
+    With `UltrasoundFilter.MEDIAN`, readings are the median of the last `window` raw readings.
+    With `UltrasoundFilter.OUTLIER`, raw readings differing from that median by more than
+    `tolerance` (as a fraction) are discarded, and others are passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        pulse: Callable[[int, int], float],
+        sensors: Iterable[Sensor] = (),
+        *,
+        interval: float = 0.03,
+        filter: UltrasoundFilter = UltrasoundFilter.MEDIAN,
+        window: int = 5,
+        tolerance: float = 0.2
+    ) -> None:
+        """Construct given a callable to take a raw reading, and the sensors."""
+        if window < 1:
+            raise ValueError(
+                "Filter windows must be >= 1 (was given {window})".format(window=window)
+            )
+        super().__init__("ultrasound-scheduler")
+        self._pulse = pulse
+        self._interval = interval
+        self._filter = filter
+        self._window = window
+        self._tolerance = tolerance
+        self._sensors: Dict[Sensor, _SensorState] = {}
+        self._lock = threading.Lock()
+        for output_pin, input_pin in sensors:
+            self.add_sensor(output_pin, input_pin)
+
+    @property
+    def sensors(self) -> List[Sensor]:
+        """Get the sensors being scheduled, as (output pin, input pin) pairs."""
+        with self._lock:
+            return list(self._sensors)
+
+    def add_sensor(self, output_pin: int, input_pin: int) -> None:
+        """Add a sensor to the schedule."""
+        with self._lock:
+            self._sensors.setdefault(
+                (output_pin, input_pin), _SensorState(self._window)
+            )
+
+    def remove_sensor(self, output_pin: int, input_pin: int) -> None:
+        """Remove a sensor from the schedule."""
+        with self._lock:
+            del self._sensors[output_pin, input_pin]
+
+    def latest(self, output_pin: int, input_pin: int) -> Optional[UltrasoundReading]:
+        """Get the latest filtered reading from a sensor, or None if there isn't one yet."""
+        with self._lock:
+            return self._sensors[output_pin, input_pin].latest
+
+    def rejected(self, output_pin: int, input_pin: int) -> int:
+        """Get the number of raw readings from a sensor discarded as outliers."""
+        with self._lock:
+            return self._sensors[output_pin, input_pin].rejected
+
+    def range_once(self, output_pin: int, input_pin: int) -> None:
+        """Take a single reading from a sensor, on the calling thread."""
+        echo_time = self._pulse(output_pin, input_pin)
+        timestamp = time.monotonic()
+        with self._lock:
+            state = self._sensors.get((output_pin, input_pin))
+            if state is not None:
+                self._record(state, echo_time, timestamp)
+
+    def _record(self, state: _SensorState, echo_time: float, timestamp: float) -> None:
+        state.history.append(echo_time)
+        if self._filter is UltrasoundFilter.NONE:
+            filtered = echo_time
+        elif self._filter is UltrasoundFilter.MEDIAN:
+            filtered = statistics.median(state.history)
+        elif self._filter is UltrasoundFilter.OUTLIER:
+            median = statistics.median(state.history)
+            if abs(echo_time - median) > self._tolerance * abs(median):
+                state.rejected += 1
+                return
+            filtered = echo_time
+        else:
+            raise AssertionError(
+                "Unknown ultrasound filter: {filter}".format(filter=self._filter)
+            )
+        state.latest = UltrasoundReading(filtered, timestamp)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            sensors = self.sensors
+            if not sensors:
+                self._stop.wait(self._interval)
+                continue
+            for output_pin, input_pin in sensors:
+                if self._stop.is_set():
+                    return
+                started = time.monotonic()
+                self.range_once(output_pin, input_pin)
+                self._stop.wait(max(started + self._interval - time.monotonic(), 0.0))
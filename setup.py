@@ -23,6 +23,15 @@ setup(
         'Programming Language :: Python :: 3',
         'Topic :: Scientific/Engineering',
     ],
+    entry_points={
+        'robot.backends': [
+            'dummy = robot.backends.dummy.robot:DummyRobot',
+            'remote = robot.backends.remote.client:RemoteRobot',
+        ],
+    },
+    extras_require={
+        'numpy': ['numpy'],
+    },
     tests_require=[
         'pytest',
         'pytest-cov',
@@ -0,0 +1,18 @@
+import pytest
+
+from robot.backends.dummy import DummyServoAssembly
+
+
+class BatchCountingServoAssembly(DummyServoAssembly):
+    def __init__(self):
+        super().__init__(num_servos=4)
+        self.batches = []
+
+    def set_servos(self, positions):
+        self.batches.append(dict(positions))
+        super().set_servos(positions)
+
+
+@pytest.fixture
+def batch_counting_servo_assembly():
+    return BatchCountingServoAssembly()
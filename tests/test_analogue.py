@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from robot.analogue import RingBuffer
+from robot.backends.dummy import DummyServoAssembly
+from robot.servo import ServoBoard
+
+
+def test_ring_buffer_keeps_the_most_recent_values():
+    buffer = RingBuffer(4)
+    for value in range(6):
+        buffer.append(float(value))
+    assert len(buffer) == 4
+    assert buffer.last() == [2.0, 3.0, 4.0, 5.0]
+    assert buffer.last(2) == [4.0, 5.0]
+    assert buffer.latest() == 5.0
+
+
+def test_ring_buffer_aggregates():
+    buffer = RingBuffer(8)
+    for value in [1.0, 9.0, 2.0, 4.0]:
+        buffer.append(value)
+    assert buffer.mean() == 4.0
+    assert buffer.median() == 3.0
+    assert buffer.min() == 1.0
+    assert buffer.max(window=3) == 9.0
+    assert buffer.mean(window=2) == 3.0
+
+
+def test_empty_ring_buffer_has_no_aggregates():
+    with pytest.raises(LookupError):
+        RingBuffer(4).mean()
+
+
+def test_ring_buffer_numpy_view_does_not_copy():
+    numpy = pytest.importorskip('numpy')
+    buffer = RingBuffer(4)
+    buffer.append(1.0)
+    buffer.append(2.0)
+    view = buffer.as_numpy()
+    assert numpy.array_equal(view, [1.0, 2.0])
+    buffer.append(3.0)
+    buffer.append(4.0)
+    buffer.append(5.0)
+    assert view[0] == 5.0
+
+
+def test_analogue_pins_can_be_read():
+    backend = DummyServoAssembly()
+    backend.analogue_values[3] = 2.5
+    board = ServoBoard('SERIAL', backend)
+    assert board.gpios[3].read_analogue() == 2.5
+
+
+def test_sampler_collects_in_the_background():
+    backend = DummyServoAssembly()
+    backend.analogue_values[0] = 1.5
+    backend.analogue_values[1] = 3.0
+    board = ServoBoard('SERIAL', backend)
+    with board.sample_analogue([0, 1], rate=500, capacity=16) as sampler:
+        deadline = time.monotonic() + 1.0
+        while len(sampler.buffer(1)) < 5 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    assert not sampler.running
+    assert sampler.buffer(0).mean() == 1.5
+    assert sampler.buffer(1).max() == 3.0
+    assert len(sampler.timestamps) == len(sampler.buffer(0))
+
+
+def test_sampler_rejects_pins_beyond_the_board():
+    backend = DummyServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    with pytest.raises(ValueError):
+        board.sample_analogue([backend.gpio_num_pins()], rate=100)
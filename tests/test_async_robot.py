@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from robot import BRAKE
+from robot.aio import AsyncRobot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+
+
+class SlowUltrasoundServoAssembly(DummyServoAssembly):
+    def ultrasound_pulse(self, out_pin, in_pin):
+        time.sleep(0.2)
+        return 0.01
+
+
+def _get_backend():
+    return DummyRobot(
+        motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={
+            'SERVO0': SlowUltrasoundServoAssembly(),
+            'SERVO1': SlowUltrasoundServoAssembly(),
+        },
+    )
+
+
+def test_async_robot_drives_outputs():
+    backend = _get_backend()
+
+    async def run():
+        async with await AsyncRobot.create(backend=backend) as robot:
+            await robot.motor_board.set_output(0, 0.5)
+            await robot.motor_board.set_output(1, BRAKE)
+            await robot.servo_boards['SERVO0'].servos[2].set_position(1.0)
+            assert robot.motor_board.m1 == BRAKE
+
+    asyncio.run(run())
+    assert backend.power_boards()['POWER'].outputs
+    assert backend.motor_boards()['MOTOR'].channels()[0].output == 0.5
+    assert backend.motor_boards()['MOTOR'].channels()[1].output is None
+    assert backend.servo_assemblies()['SERVO0'].servos[2] == 100
+
+
+def test_async_robot_reads_boards_concurrently():
+    async def run():
+        async with await AsyncRobot.create(backend=_get_backend()) as robot:
+            start = time.monotonic()
+            readings = await asyncio.gather(
+                robot.servo_boards['SERVO0'].read_ultrasound(0, 1),
+                robot.servo_boards['SERVO1'].read_ultrasound(0, 1),
+            )
+            return readings, time.monotonic() - start
+
+    readings, elapsed = asyncio.run(run())
+    assert readings == [0.01, 0.01]
+    assert elapsed < 0.35
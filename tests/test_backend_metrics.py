@@ -0,0 +1,73 @@
+import pytest
+
+from robot import BRAKE, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.backends.instrumented import BackendMetrics
+
+
+class FailingServoAssembly(DummyServoAssembly):
+    def ultrasound_pulse(self, out_pin, in_pin):
+        raise IOError("no echo")
+
+
+def _get_robot(metrics):
+    return Robot(
+        wait_for_start_button=False,
+        metrics=metrics,
+        backend=DummyRobot(
+            motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+            power_boards={'POWER': DummyPowerBoard()},
+            servo_assemblies={'SERVO': FailingServoAssembly()},
+        ),
+    )
+
+
+def test_calls_are_counted_per_board_and_method():
+    metrics = BackendMetrics()
+    robot = _get_robot(metrics)
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.motor_boards['MOTOR'].m0 = BRAKE
+    robot.servo_boards['SERVO'].servos[0].position = 0.5
+    snapshot = metrics.snapshot()
+    assert snapshot['MOTOR']['channel0.forwards']['calls'] == 1
+    assert snapshot['MOTOR']['channel0.brake']['calls'] == 1
+    assert snapshot['SERVO']['set_servo']['calls'] == 1
+    assert snapshot['POWER']['disable_outputs']['calls'] == 1
+    assert sum(count for _, count in snapshot['SERVO']['set_servo']['buckets']) == 1
+
+
+def test_errors_are_counted():
+    metrics = BackendMetrics()
+    robot = _get_robot(metrics)
+    with pytest.raises(IOError):
+        robot.servo_boards['SERVO'].read_ultrasound(0, 1)
+    method = metrics.snapshot()['SERVO']['ultrasound_pulse']
+    assert method['calls'] == 1
+    assert method['errors'] == 1
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = BackendMetrics(enabled=False)
+    robot = _get_robot(metrics)
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    assert metrics.snapshot() == {}
+
+
+def test_prometheus_text_format():
+    metrics = BackendMetrics()
+    metrics.record('SERVO', 'set_servo', 3e-6)
+    metrics.record('SERVO', 'set_servo', 3e-6, error=True)
+    text = metrics.prometheus_text()
+    assert '# TYPE robot_backend_calls_total counter' in text
+    assert 'robot_backend_calls_total{board="SERVO",method="set_servo"} 2' in text
+    assert 'robot_backend_errors_total{board="SERVO",method="set_servo"} 1' in text
+    assert 'robot_backend_call_duration_seconds_bucket{board="SERVO",method="set_servo",le="2e-06"} 0' in text
+    assert 'robot_backend_call_duration_seconds_bucket{board="SERVO",method="set_servo",le="4e-06"} 2' in text
+    assert 'robot_backend_call_duration_seconds_bucket{board="SERVO",method="set_servo",le="+Inf"} 2' in text
+    assert 'robot_backend_call_duration_seconds_count{board="SERVO",method="set_servo"} 2' in text
@@ -0,0 +1,39 @@
+import pytest
+
+from robot import Robot
+from robot.backends.dummy import DummyPowerBoard, DummyRobot
+from robot.backends import registry
+from robot.backends.registry import (
+    available_backends,
+    create_backend,
+    load_backend,
+    register_backend,
+)
+
+
+def test_dummy_backend_is_available():
+    assert 'dummy' in available_backends()
+    assert load_backend('dummy') is DummyRobot
+
+
+def test_unknown_backends_are_rejected():
+    with pytest.raises(LookupError):
+        create_backend('no-such-backend')
+
+
+def test_backends_which_fail_to_import_stay_available(monkeypatch):
+    monkeypatch.setitem(registry._references, 'test-broken', 'robot.no_such_module:Robot')
+    for _ in range(2):
+        with pytest.raises(ImportError):
+            load_backend('test-broken')
+    assert 'test-broken' in available_backends()
+
+
+def test_default_backend_is_chosen_by_environment(monkeypatch):
+    register_backend(
+        'test-registry',
+        lambda: DummyRobot(power_boards={'POWER': DummyPowerBoard()}),
+    )
+    monkeypatch.setenv('ROBOT_BACKEND', 'test-registry')
+    robot = Robot(wait_for_start_button=False)
+    assert robot.power_board.serial == 'POWER'
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from robot.background import BackgroundTask
+
+
+class CountingTask(BackgroundTask):
+    def __init__(self, period=0.001, fail_after=None):
+        super().__init__('counting-task')
+        self.period = period
+        self.fail_after = fail_after
+        self.runs = 0
+        self.skipped = 0
+        self.ran = threading.Event()
+
+    def _run(self):
+        for ticks in self._ticks(self.period):
+            self.skipped += ticks - 1
+            if self.runs == self.fail_after:
+                raise IOError('task failed')
+            self.runs += 1
+            self.ran.set()
+
+
+def test_task_runs_until_stopped():
+    with CountingTask() as task:
+        assert task.ran.wait(5)
+        assert task.running
+    assert not task.running
+    runs = task.runs
+    time.sleep(0.01)
+    assert task.runs == runs
+    assert task.error is None
+
+
+def test_errors_end_the_task_until_restarted():
+    task = CountingTask(fail_after=0)
+    task.start()
+    task._thread.join()
+    assert not task.running
+    assert isinstance(task.error, IOError)
+
+    task.fail_after = None
+    task.start()
+    assert task.error is None
+    assert task.ran.wait(5)
+    task.stop()
+
+
+def test_ticks_missed_by_falling_behind_are_skipped():
+    task = CountingTask(period=0.01)
+    ticks = task._ticks(task.period)
+    assert next(ticks) == 1
+    time.sleep(0.035)
+    assert next(ticks) >= 3
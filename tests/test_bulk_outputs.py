@@ -0,0 +1,77 @@
+import math
+import sys
+
+import pytest
+
+from robot import BRAKE
+from robot.backends.dummy import DummyMotorBoard, DummyMotorChannel
+from robot.motor import MotorBoard
+from robot.servo import ServoBoard
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'pure'])
+def use_numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setitem(sys.modules, 'numpy', None)
+    return request.param
+
+
+def test_set_positions_sends_changed_servos_in_one_batch(
+    use_numpy, batch_counting_servo_assembly
+):
+    backend = batch_counting_servo_assembly
+    board = ServoBoard('SERVO', backend)
+    board.servos[3].position = 1.0
+
+    board.set_positions([-1.0, 0.0, 0.5, 1.0])
+    assert backend.batches == [{0: 0, 1: 50, 2: 75}]
+    assert board.servos[2].position == 0.5
+
+    board.set_positions([-1.0, float('nan'), 0.5, -1.0])
+    assert len(backend.batches) == 1
+    assert backend.servos[3] == 0
+    assert board.write_statistics.sent == 5
+    assert board.servos[1].position == 0.0
+
+
+def test_set_positions_rejects_bad_arrays(use_numpy, batch_counting_servo_assembly):
+    board = ServoBoard('SERVO', batch_counting_servo_assembly)
+    with pytest.raises(ValueError):
+        board.set_positions([0.0, 0.0, 1.5, 0.0])
+    with pytest.raises(ValueError):
+        board.set_positions([0.0, 0.0])
+    assert board.servos[0].position is None
+
+
+def test_set_outputs_sends_changed_channels(use_numpy):
+    backend = DummyMotorBoard([DummyMotorChannel() for _ in range(2)])
+    board = MotorBoard('MOTOR', backend)
+    board.m1 = 0.25
+
+    board.set_outputs([1.0, 0.25])
+    assert backend.channels()[0].output == 1.0
+    assert board.write_statistics.sent == 2
+
+    board.set_outputs([float('nan'), 0.5])
+    assert board.m0 == 1.0
+    assert board.m1 == 0.5
+
+    with pytest.raises(ValueError):
+        board.set_outputs([2.0, 0.0])
+    assert board.m0 == 1.0
+
+
+def test_bulk_getters(batch_counting_servo_assembly):
+    numpy = pytest.importorskip('numpy')
+    servo_board = ServoBoard('SERVO', batch_counting_servo_assembly)
+    servo_board.set_positions(numpy.array([0.5, math.nan, -0.5, 0.0]))
+    positions = servo_board.get_positions()
+    assert positions[0] == 0.5
+    assert numpy.isnan(positions[1])
+
+    motor_board = MotorBoard('MOTOR', DummyMotorBoard([DummyMotorChannel() for _ in range(2)]))
+    motor_board.m0 = 0.75
+    motor_board.m1 = BRAKE
+    assert motor_board.get_outputs().tolist() == [0.75, 0.0]
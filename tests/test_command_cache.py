@@ -0,0 +1,165 @@
+import threading
+import time
+
+import pytest
+
+from robot.backends.base import CommandResponse
+from robot.backends.dummy import DummyServoAssembly
+from robot.command_cache import CommandCache
+from robot.servo import CommandError, ServoBoard
+
+
+def _echo(arguments):
+    return CommandResponse(message=b' '.join(arguments[1:]), error=False)
+
+
+def _get_board(handler=_echo, **kwargs):
+    backend = DummyServoAssembly(command_handler=handler)
+    board = ServoBoard('SERIAL', backend)
+    board.command_cache = CommandCache(**kwargs)
+    return board, backend
+
+
+def test_repeated_commands_are_served_from_the_cache():
+    board, backend = _get_board(ttls={'echo': 60})
+    assert board.direct_command('echo', 'hi') == 'hi'
+    assert board.direct_command('echo', 'hi') == 'hi'
+    assert board.direct_command('echo', 'there') == 'there'
+    assert len(backend.commands) == 2
+    assert board.command_cache.statistics.hits == 1
+    assert board.command_cache.statistics.misses == 2
+
+
+def test_commands_without_a_ttl_are_not_cached():
+    board, backend = _get_board(ttls={'version': 60})
+    board.direct_command('echo', 'hi')
+    board.direct_command('echo', 'hi')
+    assert len(backend.commands) == 2
+    assert board.command_cache.statistics.misses == 0
+    assert len(board.command_cache) == 0
+
+
+def test_default_ttl_applies_to_every_command():
+    board, backend = _get_board(default_ttl=60)
+    board.direct_command('echo', 'hi')
+    board.direct_command('echo', 'hi')
+    assert len(backend.commands) == 1
+
+
+def test_responses_expire():
+    board, backend = _get_board(ttls={'echo': 0.01})
+    board.direct_command('echo', 'hi')
+    time.sleep(0.02)
+    board.direct_command('echo', 'hi')
+    assert len(backend.commands) == 2
+
+
+def test_least_recently_used_responses_are_evicted():
+    board, backend = _get_board(default_ttl=60, capacity=2)
+    board.direct_command('echo', 'a')
+    board.direct_command('echo', 'b')
+    board.direct_command('echo', 'a')
+    board.direct_command('echo', 'c')
+    assert len(board.command_cache) == 2
+    assert board.command_cache.statistics.evictions == 1
+    board.direct_command('echo', 'a')
+    assert len(backend.commands) == 3
+    board.direct_command('echo', 'b')
+    assert len(backend.commands) == 4
+
+
+def test_invalidating_a_command_discards_its_responses():
+    board, backend = _get_board(default_ttl=60)
+    board.direct_command('echo', 'hi')
+    board.direct_command('version')
+    board.command_cache.invalidate('echo')
+    assert len(board.command_cache) == 1
+    board.direct_command('echo', 'hi')
+    assert len(backend.commands) == 3
+
+
+def test_error_responses_are_not_cached():
+    board, backend = _get_board(
+        lambda arguments: CommandResponse(message=b'nope', error=True), default_ttl=60
+    )
+    for _ in range(2):
+        with pytest.raises(CommandError):
+            board.direct_command('nonsense')
+    assert len(backend.commands) == 2
+    assert len(board.command_cache) == 0
+
+
+def test_negative_ttls_are_rejected():
+    with pytest.raises(ValueError):
+        CommandCache({'echo': -1})
+    with pytest.raises(ValueError):
+        CommandCache(capacity=0)
+
+
+def test_concurrent_identical_commands_are_deduplicated():
+    release = threading.Event()
+    calls = []
+
+    def handler(arguments):
+        calls.append(arguments)
+        release.wait()
+        return _echo(arguments)
+
+    board, _ = _get_board(handler, ttls={'echo': 0})
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(board.direct_command('echo', 'hi'))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while board.command_cache.statistics.shared < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['hi'] * 4
+    assert len(calls) == 1
+    assert board.command_cache.statistics.shared == 3
+    # A TTL of 0 only deduplicates, so the next command goes to the board again
+    board.direct_command('echo', 'hi')
+    assert len(calls) == 2
+
+
+def test_waiters_get_their_own_exception_when_a_shared_command_fails():
+    release = threading.Event()
+    failure = IOError('disconnected')
+
+    def handler(arguments):
+        release.wait()
+        raise failure
+
+    board, _ = _get_board(handler, ttls={'echo': 0})
+    errors = []
+
+    def run():
+        try:
+            board.direct_command('echo', 'hi')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while board.command_cache.statistics.shared < 2 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors.count(failure) == 1
+    shared = [error for error in errors if error is not failure]
+    assert len(shared) == 2
+    assert shared[0] is not shared[1]
+    assert all(isinstance(error, RuntimeError) for error in shared)
+    assert all(error.__cause__ is failure for error in shared)
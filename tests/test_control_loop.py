@@ -0,0 +1,78 @@
+import os
+import time
+
+import pytest
+
+from robot import Robot
+from robot.backends.dummy import DummyPowerBoard, DummyRobot
+from robot.loop import ControlLoop, LatencyHistogram, OverrunPolicy
+
+
+def _get_robot():
+    return Robot(
+        wait_for_start_button=False,
+        backend=DummyRobot(power_boards={'POWER': DummyPowerBoard()}),
+    )
+
+
+def test_loop_runs_at_a_fixed_rate():
+    robot = _get_robot()
+    calls = []
+    start = time.monotonic()
+    statistics = robot.run_loop(lambda: calls.append(None), hz=200, max_iterations=10)
+    elapsed = time.monotonic() - start
+    assert len(calls) == 10
+    assert statistics.iterations == 10
+    assert 0.04 <= elapsed < 0.2
+    assert robot.loop_statistics is statistics
+
+
+def test_loop_can_be_stopped_from_the_callback():
+    robot = _get_robot()
+    calls = []
+
+    def callback():
+        calls.append(None)
+        if len(calls) == 3:
+            robot.stop_loop()
+
+    robot.run_loop(callback, hz=1000)
+    assert len(calls) == 3
+
+
+def test_skip_policy_drops_missed_iterations():
+    loop = ControlLoop(lambda: time.sleep(0.025), hz=100, policy=OverrunPolicy.SKIP)
+    statistics = loop.run(max_iterations=2)
+    assert statistics.overruns == 2
+    assert statistics.skipped >= 4
+
+
+def test_catch_up_policy_runs_missed_iterations():
+    durations = iter([0.03, 0, 0, 0])
+    loop = ControlLoop(
+        lambda: time.sleep(next(durations)), hz=100, policy=OverrunPolicy.CATCH_UP
+    )
+    start = time.monotonic()
+    statistics = loop.run(max_iterations=4)
+    assert statistics.skipped == 0
+    assert statistics.overruns >= 1
+    assert time.monotonic() - start < 0.05
+    assert statistics.max_jitter >= 0.01
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason="No CPU affinity")
+def test_loop_can_be_pinned_to_a_cpu():
+    cpu = min(os.sched_getaffinity(0))
+    before = os.sched_getaffinity(0)
+    seen = []
+    ControlLoop(lambda: seen.append(os.sched_getaffinity(0)), hz=1000, cpu=cpu).run(1)
+    assert seen == [{cpu}]
+    assert os.sched_getaffinity(0) == before
+
+
+def test_latency_histogram_buckets():
+    histogram = LatencyHistogram()
+    for duration in [0.5e-6, 3e-6, 3e-6, 1000.0]:
+        histogram.record(duration)
+    assert histogram.buckets() == [(1e-6, 1), (4e-6, 2), (histogram._BOUNDS[-1], 1)]
+    assert histogram.percentile(50) == 4e-6
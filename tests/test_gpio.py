@@ -0,0 +1,198 @@
+import threading
+import time
+
+import pytest
+
+from robot import Edge, PinMode, PinValue, Robot
+from robot.backends.base import BaseServoAssembly
+from robot.backends.dummy import DummyPowerBoard, DummyRobot, DummyServoAssembly
+from robot.backends.instrumented import BackendMetrics
+from robot.servo import ServoBoard
+
+
+class CountingServoAssembly(DummyServoAssembly):
+    def __init__(self):
+        super().__init__(num_pins=4)
+        self.single_reads = 0
+        self.bulk_reads = 0
+
+    def gpio_read_digital(self, pin):
+        self.single_reads += 1
+        return super().gpio_read_digital(pin)
+
+    def gpio_read_all_digital(self):
+        self.bulk_reads += 1
+        return super().gpio_read_all_digital()
+
+
+def test_pin_reads_go_to_the_backend_by_default():
+    backend = CountingServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    backend.digital_values[1] = True
+    assert board.gpios[1].read() == PinValue.HIGH
+    assert board.gpios[2].read() == PinValue.LOW
+    assert backend.single_reads == 2
+    assert backend.bulk_reads == 0
+
+
+def test_output_pins_cannot_be_read():
+    board = ServoBoard('SERIAL', CountingServoAssembly())
+    board.gpios[0].mode = PinMode.OUTPUT_HIGH
+    with pytest.raises(ValueError):
+        board.gpios[0].read()
+
+
+def test_read_all_pins_uses_one_backend_call():
+    backend = CountingServoAssembly()
+    backend.digital_values[3] = True
+    board = ServoBoard('SERIAL', backend)
+    assert board.read_all_pins() == [PinValue.LOW, PinValue.LOW, PinValue.LOW, PinValue.HIGH]
+    assert backend.bulk_reads == 1
+    assert backend.single_reads == 0
+
+
+def test_snapshot_mode_reuses_recent_snapshots():
+    backend = CountingServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    board.pin_snapshot_max_age = 60.0
+    values = [pin.read() for pin in board.gpios]
+    backend.digital_values[0] = True
+    assert board.gpios[0].read() == PinValue.LOW
+    assert values == [PinValue.LOW] * 4
+    assert backend.bulk_reads == 1
+    assert backend.single_reads == 0
+
+    board.pin_snapshot_max_age = 0.0
+    assert board.gpios[0].read() == PinValue.HIGH
+    assert backend.bulk_reads == 2
+
+
+def test_bulk_reads_fall_back_to_single_reads():
+    backend = CountingServoAssembly()
+    backend.digital_values[2] = True
+    values = super(DummyServoAssembly, backend).gpio_read_all_digital()
+    assert values == [False, False, True, False]
+    assert backend.single_reads == 4
+
+
+class DigitalOnlyServoAssembly(DummyServoAssembly):
+    """Backend without bulk reads, which falls back to reading each pin in turn."""
+
+    bulk_digital_reads = False
+
+    def __init__(self):
+        super().__init__(num_pins=4)
+        self.reads = []
+
+    def gpio_read_digital(self, pin):
+        self.reads.append(pin)
+        return super().gpio_read_digital(pin)
+
+    gpio_read_all_digital = BaseServoAssembly.gpio_read_all_digital
+
+
+def _set_later(values, pin, value, delay=0.02):
+    timer = threading.Timer(delay, values.__setitem__, (pin, value))
+    timer.start()
+    return timer
+
+
+def test_wait_for_edge_returns_the_new_value():
+    backend = CountingServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    _set_later(backend.digital_values, 2, True)
+    assert board.gpios[2].wait_for_edge(Edge.RISING, timeout=5) == PinValue.HIGH
+    _set_later(backend.digital_values, 2, False)
+    assert board.gpios[2].wait_for_edge(Edge.BOTH, timeout=5) == PinValue.LOW
+    assert backend.single_reads == 0
+    assert backend.bulk_reads > 0
+
+
+def test_wait_for_edge_ignores_other_edges():
+    backend = CountingServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    backend.digital_values[0] = True
+    timer = _set_later(backend.digital_values, 0, False)
+    assert board.gpios[0].wait_for_edge(Edge.RISING, timeout=0.1) is None
+    timer.join()
+
+
+def test_edge_polling_stops_when_nothing_is_waiting():
+    backend = CountingServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    assert board.gpios[0].wait_for_edge(timeout=0.02) is None
+    polls = board.edge_watcher.polls
+    time.sleep(0.05)
+    assert board.edge_watcher.polls == polls
+    assert board.edge_watcher.watched_pins == set()
+
+
+def test_edge_callbacks():
+    backend = CountingServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    values = []
+    handle = board.gpios[1].add_edge_callback(values.append, Edge.FALLING)
+    backend.digital_values[1] = True
+    for _ in range(500):
+        if board.edge_watcher.polls > 2:
+            break
+        time.sleep(0.001)
+    backend.digital_values[1] = False
+    for _ in range(500):
+        if values:
+            break
+        time.sleep(0.01)
+    board.gpios[1].remove_edge_callback(handle)
+    assert values == [PinValue.LOW]
+
+
+def test_edge_polling_without_bulk_reads_reads_only_watched_pins():
+    backend = DigitalOnlyServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    assert not board.edge_watcher.bulk_reads
+    board.gpios[0].add_edge_callback(lambda value: None)
+    board.gpios[3].add_edge_callback(lambda value: None)
+    assert board.edge_watcher.poll_interval == 2 * board.edge_watcher.interval
+    assert board.gpios[3].wait_for_edge(timeout=0.05) is None
+    assert set(backend.reads) == {0, 3}
+
+
+def test_bulk_read_support_is_passed_through_wrappers():
+    backend = DummyRobot(
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={'SERVO': DigitalOnlyServoAssembly()},
+    )
+    robot = Robot(wait_for_start_button=False, backend=backend, metrics=BackendMetrics())
+    assert not robot.servo_boards['SERVO'].edge_watcher.bulk_reads
+
+
+class FlakyServoAssembly(DummyServoAssembly):
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    def gpio_read_all_digital(self):
+        if self.failures:
+            self.failures -= 1
+            raise IOError('board went away')
+        return super().gpio_read_all_digital()
+
+
+def test_edge_polling_restarts_after_failing():
+    backend = FlakyServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    with pytest.raises(RuntimeError) as info:
+        board.gpios[0].wait_for_edge(timeout=5)
+    assert isinstance(info.value.__cause__, IOError)
+    assert isinstance(board.edge_watcher.error, IOError)
+
+    _set_later(backend.digital_values, 0, True)
+    assert board.gpios[0].wait_for_edge(timeout=5) == PinValue.HIGH
+    assert board.edge_watcher.error is None
+
+
+def test_output_pins_cannot_be_waited_for():
+    board = ServoBoard('SERIAL', CountingServoAssembly())
+    board.gpios[0].mode = PinMode.OUTPUT_LOW
+    with pytest.raises(ValueError):
+        board.gpios[0].wait_for_edge(timeout=0)
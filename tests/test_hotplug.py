@@ -0,0 +1,104 @@
+import threading
+
+from robot import PinMode, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyServoAssembly,
+    HotplugDummyRobot,
+)
+
+
+def _motor_board():
+    return DummyMotorBoard([DummyMotorChannel() for _ in range(2)])
+
+
+def _get_robot():
+    backend = HotplugDummyRobot(
+        motor_boards={'MOTOR': _motor_board()},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={'SERVO': DummyServoAssembly()},
+    )
+    return Robot(wait_for_start_button=False, backend=backend), backend
+
+
+def test_rescan_without_changes_keeps_every_board():
+    robot, _ = _get_robot()
+    motor_board = robot.motor_boards['MOTOR']
+    changes = robot.rescan()
+    assert not changes
+    assert robot.motor_boards['MOTOR'] is motor_board
+
+
+def test_boards_are_added_and_removed():
+    robot, backend = _get_robot()
+    backend.plug('MOTOR2', _motor_board())
+    backend.unplug('SERVO')
+    assert 'MOTOR2' not in robot.motor_boards
+
+    changes = robot.rescan()
+    assert changes.added == ['MOTOR2']
+    assert changes.removed == ['SERVO']
+    assert sorted(robot.motor_boards) == ['MOTOR', 'MOTOR2']
+    assert robot.servo_boards == {}
+
+    robot.motor_boards['MOTOR2'].m0 = 0.5
+    assert backend.motor_boards()['MOTOR2'].channels()[0].output == 0.5
+
+
+def test_reset_boards_are_rebound_with_their_state():
+    robot, backend = _get_robot()
+    motor_board = robot.motor_boards['MOTOR']
+    servo_board = robot.servo_boards['SERVO']
+    motor_board.m1 = 0.75
+    servo_board.servos[2].position = 1.0
+    servo_board.gpios[3].mode = PinMode.OUTPUT_HIGH
+
+    new_motor_board = _motor_board()
+    new_assembly = DummyServoAssembly()
+    backend.plug('MOTOR', new_motor_board)
+    backend.plug('SERVO', new_assembly)
+    changes = robot.rescan()
+
+    assert sorted(changes.reconnected) == ['MOTOR', 'SERVO']
+    assert robot.motor_boards['MOTOR'] is motor_board
+    assert new_motor_board.channels()[1].output == 0.75
+    assert new_assembly.servos[2] == 100
+    assert new_assembly.pin_modes[3] == 'output_high'
+
+    motor_board.m0 = 0.25
+    assert new_motor_board.channels()[0].output == 0.25
+
+
+def test_unplugged_boards_keep_their_frontend_and_state():
+    robot, backend = _get_robot()
+    motor_board = robot.motor_boards['MOTOR']
+    motor_board.m0 = 0.5
+    backend.unplug('MOTOR')
+    robot.rescan()
+    assert robot.motor_boards == {}
+
+    new_motor_board = _motor_board()
+    backend.plug('MOTOR', new_motor_board)
+    changes = robot.rescan()
+    assert changes.reconnected == ['MOTOR']
+    assert robot.motor_boards['MOTOR'] is motor_board
+    assert new_motor_board.channels()[0].output == 0.5
+
+
+def test_watcher_rescans_in_the_background():
+    robot, backend = _get_robot()
+    seen = []
+    found = threading.Event()
+
+    def on_changes(changes):
+        seen.append(changes)
+        found.set()
+
+    with robot.watch_boards(interval=0.01, callback=on_changes) as watcher:
+        backend.plug('MOTOR2', _motor_board())
+        assert found.wait(timeout=5)
+    assert watcher.error is None
+    assert seen[0].added == ['MOTOR2']
+    assert 'MOTOR2' in robot.motor_boards
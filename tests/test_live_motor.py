@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip('termios')
+
+from robot import BRAKE  # noqa: E402
+from robot.backends.base import MotorAction  # noqa: E402
+from robot.backends.live.emulator import MotorBoardEmulator  # noqa: E402
+from robot.motor import MotorBoard  # noqa: E402
+from robot.backends.live.motor import (  # noqa: E402
+    COMMAND,
+    FRAME_START,
+    LiveMotorBoard,
+    _checksum,
+    decode_frames,
+    encode_frame,
+)
+
+
+@pytest.fixture
+def connection():
+    with MotorBoardEmulator() as emulator:
+        backend = LiveMotorBoard(emulator.port)
+        yield emulator, backend
+        backend.close()
+
+
+def test_frames_round_trip():
+    commands = {0: (MotorAction.FORWARDS, 0.5), 1: (MotorAction.BACKWARDS, 1.0)}
+    data = bytearray(b'noise' + encode_frame(commands) + encode_frame({}))
+    frames, corrupt = decode_frames(data)
+    assert frames == [commands, {}]
+    assert corrupt == []
+    assert data == b''
+
+
+def test_corrupt_frames_are_skipped():
+    frame = bytearray(encode_frame({0: (MotorAction.BRAKE, 0.0)}))
+    frame[-1] ^= 0xFF
+    frames, corrupt = decode_frames(frame)
+    assert frames == []
+    assert len(corrupt) == 1
+
+
+def test_frames_with_unknown_actions_are_corrupt():
+    body = COMMAND.pack(0, 9, 500)
+    frame = bytearray(bytes((FRAME_START, 1)) + body + bytes((_checksum(body),)))
+    frames, corrupt = decode_frames(frame)
+    assert frames == []
+    assert len(corrupt) == 1
+
+
+def test_commands_reach_the_board(connection):
+    emulator, backend = connection
+    board = MotorBoard('MOTOR', backend)
+    board.m0 = 0.5
+    board.m1 = -0.25
+    assert backend.flush(1)
+    # Flushing only waits for the frames to be written, not for the board to read them
+    assert emulator.wait_for_frames(backend.frames_sent, timeout=1)
+    assert emulator.outputs == [(MotorAction.FORWARDS, 0.5), (MotorAction.BACKWARDS, 0.25)]
+    assert backend.frames_sent >= 1
+    assert backend.last_latency is not None
+    assert backend.latency.total == backend.frames_sent
+
+
+def test_commands_are_coalesced_until_a_brake(connection):
+    emulator, backend = connection
+    channel = backend.channels()[0]
+    with backend._changed:
+        # Hold the writer back so that every command is queued before any is sent
+        channel.forwards(0.1)
+        channel.forwards(0.2)
+        channel.brake()
+        channel.forwards(0.3)
+        channel.forwards(0.4)
+    assert backend.flush(1)
+    assert emulator.wait_for_frames(2, timeout=1)
+    assert emulator.frames == [
+        {0: (MotorAction.BRAKE, 0.0)},
+        {0: (MotorAction.FORWARDS, 0.4)},
+    ]
+    assert backend.commands_coalesced == 3
+
+
+def test_invalid_channels_are_rejected(connection):
+    _, backend = connection
+    with pytest.raises(ValueError):
+        backend.apply_commands({5: (MotorAction.BRAKE, 0.0)})
+
+
+def test_closing_writes_queued_commands():
+    with MotorBoardEmulator() as emulator:
+        backend = LiveMotorBoard(emulator.port)
+        board = MotorBoard('MOTOR', backend)
+        board.m0 = BRAKE
+        backend.close()
+        assert emulator.wait_for_frames(1, timeout=1)
+        with pytest.raises(RuntimeError):
+            board.m0 = 0.5
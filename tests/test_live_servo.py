@@ -0,0 +1,98 @@
+import pytest
+
+pytest.importorskip('termios')
+
+from robot import PinMode, PinValue  # noqa: E402
+from robot.backends.base import CommandResponse  # noqa: E402
+from robot.backends.live.emulator import ArduinoEmulator  # noqa: E402
+from robot.backends.live.servo import LiveServoAssembly  # noqa: E402
+from robot.servo import ServoBoard  # noqa: E402
+
+
+def _handle_command(args):
+    if args[0] == b'echo':
+        return CommandResponse(message=b' '.join(args[1:]), error=False)
+    return CommandResponse(message=b'bad command', error=True)
+
+
+@pytest.fixture(params=[True, False], ids=['pipelined', 'blocking'])
+def connection(request):
+    with ArduinoEmulator(command_handler=_handle_command) as emulator:
+        backend = LiveServoAssembly(emulator.port, pipelined=request.param)
+        yield emulator, backend
+        backend.close()
+
+
+def _get_board(backend):
+    return ServoBoard('SERVO', backend)
+
+
+def test_board_shape_is_read_from_the_board(connection):
+    _, backend = connection
+    assert backend.num_servos() == 16
+    assert backend.gpio_num_pins() == 18
+
+
+def test_servo_sets_reach_the_board(connection):
+    emulator, backend = connection
+    board = _get_board(backend)
+    board.servos[2].position = 1
+    backend.set_servos({0: 0, 1: 50})
+    # Responses come back in order, so this acknowledged command follows the servo sets
+    backend.gpio_read_digital(0)
+    assert emulator.servos[:3] == [0, 50, 100]
+
+
+def test_gpio(connection):
+    emulator, backend = connection
+    board = _get_board(backend)
+    board.gpios[3].mode = PinMode.OUTPUT_HIGH
+    emulator.digital_values[4] = True
+    emulator.analogue_values[5] = 2.5
+    emulator.ultrasound_times[7] = 0.01
+    assert emulator.pin_modes[3] == 'output_high'
+    assert board.gpios[4].read() == PinValue.HIGH
+    assert board.gpios[5].read_analogue() == 2.5
+    assert backend.gpio_read_all_digital()[3:6] == [True, True, False]
+    assert board.read_ultrasound(6, 7) == 0.01
+
+
+def test_direct_command(connection):
+    _, backend = connection
+    board = _get_board(backend)
+    assert board.direct_command('echo', 'hello', 1) == 'hello 1'
+    with pytest.raises(RuntimeError, match='bad command'):
+        board.direct_command('nonsense')
+
+
+def test_commands_can_be_pipelined():
+    with ArduinoEmulator(latency=0.05) as emulator:
+        emulator.digital_values[1] = True
+        backend = LiveServoAssembly(emulator.port)
+        futures = [backend.send_command([b'read', str(pin).encode()]) for pin in range(10)]
+        responses = [future.result(0.3) for future in futures]
+        assert [response.message for response in responses] == [b'0', b'1'] + [b'0'] * 8
+        backend.close()
+
+
+def test_unacknowledged_errors_are_counted():
+    with ArduinoEmulator() as emulator:
+        backend = LiveServoAssembly(emulator.port)
+        backend.set_servo(99, 50)
+        backend.gpio_read_digital(0)
+        assert backend.unacknowledged_errors == 1
+        backend.close()
+
+
+def test_disconnection_fails_pending_commands():
+    emulator = ArduinoEmulator()
+    emulator.start()
+    backend = LiveServoAssembly(emulator.port)
+    emulator.latency = 10
+    future = backend.send_command([b'info'])
+    emulator.close()
+    with pytest.raises(RuntimeError, match='disconnected'):
+        future.result(1)
+    with pytest.raises(RuntimeError, match='disconnected'):
+        backend.gpio_read_digital(0)
+    backend.close()
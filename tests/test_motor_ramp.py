@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from robot import BRAKE, COAST, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+)
+from robot.motor import MotorBoard
+from robot.ramp import MotorRamp
+
+
+def _get_boards():
+    backends = [DummyMotorBoard([DummyMotorChannel() for _ in range(2)]) for _ in range(2)]
+    frontends = [
+        MotorBoard(serial, backend)
+        for serial, backend in zip(['MOTOR0', 'MOTOR1'], backends)
+    ]
+    return frontends, backends
+
+
+def test_outputs_ramp_at_the_acceleration_limit():
+    (board, _), (backend, _) = _get_boards()
+    ramp = MotorRamp([board], rate=10, acceleration=2.0)
+    ramp.set_target('MOTOR0', 0, 0.5)
+    assert backend.channels()[0].output == 0.0
+
+    ramp.step()
+    assert board.m0 == pytest.approx(0.2)
+    ramp.step()
+    assert board.m0 == pytest.approx(0.4)
+    ramp.step()
+    assert board.m0 == 0.5
+    assert backend.channels()[0].output == 0.5
+    assert ramp.settled
+    assert ramp.step() == 0
+
+
+def test_deceleration_limit_applies_towards_zero():
+    (board, _), _ = _get_boards()
+    ramp = MotorRamp([board], rate=10, acceleration=10.0, deceleration=1.0)
+    ramp.set_target('MOTOR0', 0, 1.0)
+    ramp.step()
+    assert board.m0 == 1.0
+
+    ramp.set_target('MOTOR0', 0, 0.0)
+    ramp.step()
+    assert board.m0 == pytest.approx(0.9)
+    assert ramp.target('MOTOR0', 0) == 0.0
+    assert ramp.output('MOTOR0', 0) == pytest.approx(0.9)
+
+
+def test_each_step_writes_each_board_once():
+    boards, backends = _get_boards()
+    applied = []
+    for backend in backends:
+        backend.apply_commands = applied.append
+    ramp = MotorRamp(boards, rate=10, acceleration=1.0)
+    for board in boards:
+        for channel in range(2):
+            ramp.set_target(board.serial, channel, 1.0)
+
+    assert ramp.step() == 4
+    assert len(applied) == 2
+    assert all(sorted(commands) == [0, 1] for commands in applied)
+
+
+def test_brake_and_coast_apply_immediately():
+    (board, _), (backend, _) = _get_boards()
+    ramp = MotorRamp([board], rate=10, acceleration=1.0)
+    ramp.set_target('MOTOR0', 1, 1.0)
+    ramp.step()
+
+    ramp.set_target('MOTOR0', 1, BRAKE)
+    assert board.m1 == BRAKE
+    assert backend.channels()[1].output is None
+    assert ramp.target('MOTOR0', 1) == BRAKE
+    assert ramp.settled
+
+    ramp.set_target('MOTOR0', 1, 0.5)
+    ramp.step()
+    assert board.m1 == pytest.approx(0.1)
+
+    ramp.set_target('MOTOR0', 1, COAST)
+    assert board.m1 == COAST
+
+
+def test_per_channel_limits():
+    (board, _), _ = _get_boards()
+    ramp = MotorRamp([board], rate=10, acceleration=1.0)
+    ramp.set_acceleration('MOTOR0', 1, 5.0)
+    ramp.set_target('MOTOR0', 0, 1.0)
+    ramp.set_target('MOTOR0', 1, 1.0)
+    ramp.step()
+    assert board.m0 == pytest.approx(0.1)
+    assert board.m1 == pytest.approx(0.5)
+
+
+def test_invalid_targets_are_rejected():
+    (board, _), _ = _get_boards()
+    ramp = MotorRamp([board])
+    with pytest.raises(ValueError):
+        ramp.set_target('MOTOR0', 0, 1.5)
+    with pytest.raises(ValueError):
+        ramp.set_target('MOTOR0', 2, 0.5)
+    with pytest.raises(ValueError):
+        ramp.set_target('MISSING', 0, 0.5)
+    with pytest.raises(ValueError):
+        ramp.set_acceleration('MOTOR0', 0, 0.0)
+
+
+def test_robot_ramps_in_the_background():
+    backend = DummyRobot(
+        motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={},
+    )
+    robot = Robot(backend=backend)
+    with robot.ramp_motors(rate=200, acceleration=10.0) as ramp:
+        ramp.set_target('MOTOR', 0, 0.5)
+        assert ramp.wait_settled(timeout=5)
+        assert ramp.error is None
+    assert robot.motor_boards['MOTOR'].m0 == 0.5
+    assert ramp.ticks > 1
+
+
+def test_ramp_writes_are_not_part_of_transactions():
+    backend = DummyRobot(
+        motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={},
+    )
+    robot = Robot(wait_for_start_button=False, backend=backend)
+    board = robot.motor_boards['MOTOR']
+    ramp = MotorRamp([board], rate=10, acceleration=2.0)
+    ramp.set_target('MOTOR', 0, 0.5)
+    with pytest.raises(RuntimeError):
+        with robot.transaction():
+            board.m1 = 0.25
+            thread = threading.Thread(target=ramp.step)
+            thread.start()
+            thread.join()
+            assert backend.motor_boards()['MOTOR'].channels()[0].output == pytest.approx(0.2)
+            raise RuntimeError('abandon the transaction')
+    assert board.m0 == pytest.approx(0.2)
+    assert board.m1 == COAST
+    assert backend.motor_boards()['MOTOR'].channels()[1].output == 0.0
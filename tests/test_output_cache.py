@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from robot.backends.dummy import DummyMotorBoard, DummyMotorChannel, DummyServoAssembly
+from robot.motor import MotorBoard
+from robot.output_cache import OutputCache
+from robot.servo import ServoBoard
+
+
+class CountingMotorChannel(DummyMotorChannel):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def forwards(self, power):
+        self.calls += 1
+        super().forwards(power)
+
+
+def test_unchanged_motor_outputs_are_not_resent():
+    channel = CountingMotorChannel()
+    board = MotorBoard('SERIAL', DummyMotorBoard([channel, DummyMotorChannel()]))
+    for _ in range(10):
+        board.m0 = 0.5
+    assert channel.calls == 1
+    assert board.write_statistics.requested == 10
+    assert board.write_statistics.suppressed == 9
+
+
+def test_invalidating_the_cache_resends_outputs():
+    channel = CountingMotorChannel()
+    board = MotorBoard('SERIAL', DummyMotorBoard([channel, DummyMotorChannel()]))
+    board.m0 = 0.5
+    board.invalidate_cache()
+    board.m0 = 0.5
+    assert channel.calls == 2
+
+
+def test_unchanged_servo_positions_are_not_resent():
+    backend = DummyServoAssembly(num_servos=2)
+    board = ServoBoard('SERIAL', backend)
+    board.servos[0].position = 0.5
+    backend.servos[0] = None
+    board.servos[0].position = 0.5
+    assert backend.servos[0] is None
+    assert board.write_statistics.suppressed == 1
+
+
+def test_coalescing_sends_only_the_last_value():
+    batches = []
+    cache = OutputCache(batches.append)
+    cache.coalesce_window = 10.0
+    cache.write(0, 'a')
+    cache.write(0, 'b')
+    cache.write(0, 'c')
+    cache.write(1, 'd')
+    assert batches == [{0: 'a'}]
+    cache.flush()
+    assert batches == [{0: 'a'}, {0: 'c', 1: 'd'}]
+    assert cache.statistics.coalesced == 1
+    assert cache.statistics.sent == 3
+
+
+def test_coalesced_writes_are_sent_when_the_window_expires():
+    batches = []
+    cache = OutputCache(batches.append)
+    cache.coalesce_window = 0.01
+    cache.write(0, 'a')
+    cache.write(0, 'b')
+    deadline = time.monotonic() + 1.0
+    while len(batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert batches == [{0: 'a'}, {0: 'b'}]
+
+
+class FlakySend:
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    def __call__(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise IOError('board unplugged')
+        self.batches.append(batch)
+
+
+def test_writes_which_fail_to_send_are_held_back():
+    send = FlakySend(0)
+    cache = OutputCache(send)
+    cache.coalesce_window = 10.0
+    cache.write(0, 'a')
+    send.failures = 1
+    cache.write(0, 'b')
+    cache.write(1, 'c')
+    with pytest.raises(IOError):
+        cache.flush()
+    cache.write(1, 'd')
+    cache.flush()
+    assert send.batches == [{0: 'a'}, {0: 'b', 1: 'd'}]
+
+
+def test_background_send_failures_are_raised_by_the_next_flush():
+    send = FlakySend(0)
+    cache = OutputCache(send)
+    cache.coalesce_window = 0.01
+    cache.write(0, 'a')
+    send.failures = 1
+    cache.write(0, 'b')
+    deadline = time.monotonic() + 1.0
+    while send.failures and time.monotonic() < deadline:
+        time.sleep(0.005)
+    with pytest.raises(RuntimeError) as info:
+        cache.flush()
+    assert isinstance(info.value.__cause__, IOError)
+    assert send.batches == [{0: 'a'}, {0: 'b'}]
+    cache.flush()
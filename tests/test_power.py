@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from robot.backends.base import BasePowerBoard
+from robot.backends.dummy import DummyPowerBoard
+from robot.power import PowerBoard
+
+
+class ButtonPowerBoard(DummyPowerBoard):
+    def __init__(self):
+        super().__init__()
+        self.button = threading.Event()
+
+    def wait_for_start_button(self):
+        self.button.wait()
+
+
+class BrokenPowerBoard(DummyPowerBoard):
+    def wait_for_start_button(self):
+        raise OSError('disconnected')
+
+
+class BatterylessPowerBoard(DummyPowerBoard):
+    read_battery = BasePowerBoard.read_battery
+
+
+def test_wait_start_times_out_until_the_button_is_pressed():
+    backend = ButtonPowerBoard()
+    board = PowerBoard('POWER', backend)
+    assert not board.wait_start(timeout=0.01)
+    assert not board.start_event.is_set()
+    assert not backend.outputs
+    backend.button.set()
+    assert board.wait_start(timeout=5)
+    assert board.start_event.is_set()
+    assert backend.outputs
+
+
+def test_wait_start_async():
+    backend = ButtonPowerBoard()
+    board = PowerBoard('POWER', backend)
+
+    async def wait():
+        assert not await board.wait_start_async(timeout=0.01)
+        asyncio.get_running_loop().call_later(0.01, backend.button.set)
+        return await board.wait_start_async(timeout=5)
+
+    assert asyncio.run(wait())
+    assert backend.outputs
+
+
+def test_start_errors_are_raised_to_waiters():
+    board = PowerBoard('POWER', BrokenPowerBoard())
+    with pytest.raises(RuntimeError):
+        board.wait_start(timeout=5)
+    assert isinstance(board.start_error, OSError)
+
+
+def test_battery_sampling():
+    backend = DummyPowerBoard()
+    backend.voltage = 11.5
+    backend.current = 2.0
+    board = PowerBoard('POWER', backend)
+    assert board.read_battery() == (11.5, 2.0)
+    with board.sample_battery(rate=1000, capacity=8) as sampler:
+        for _ in range(500):
+            if len(sampler.voltage) == 8:
+                break
+            time.sleep(0.01)
+    assert sampler.error is None
+    assert sampler.voltage.last() == [11.5] * 8
+    assert sampler.current.last() == [2.0] * 8
+    assert len(sampler.timestamps) == 8
+
+
+def test_battery_sampling_needs_a_board_which_can_measure_it():
+    board = PowerBoard('POWER', BatterylessPowerBoard())
+    with pytest.raises(RuntimeError):
+        board.sample_battery(rate=100)
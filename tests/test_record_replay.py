@@ -0,0 +1,174 @@
+import pytest
+
+from robot import BRAKE, PinMode, Robot
+from robot.backends.base import MotorAction
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.backends.recording import (
+    RecordedError,
+    Recorder,
+    RecordingRobot,
+    Recording,
+    ReplayDivergence,
+    ReplayRobot,
+)
+
+
+class FailingServoAssembly(DummyServoAssembly):
+    def ultrasound_pulse(self, out_pin, in_pin):
+        raise IOError("no echo")
+
+
+def _record(path):
+    backend = RecordingRobot(
+        DummyRobot(
+            motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+            power_boards={'POWER': DummyPowerBoard()},
+            servo_assemblies={'SERVO': FailingServoAssembly()},
+        ),
+        str(path),
+    )
+    robot = Robot(wait_for_start_button=False, backend=backend)
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.motor_boards['MOTOR'].m1 = BRAKE
+    robot.servo_boards['SERVO'].servos[3].position = -0.5
+    robot.servo_boards['SERVO'].gpios[2].mode = PinMode.INPUT
+    with pytest.raises(IOError):
+        robot.servo_boards['SERVO'].read_ultrasound(0, 1)
+    backend.close()
+
+
+def test_recording_holds_each_call_in_order(tmp_path):
+    _record(tmp_path / 'match.rec')
+    recording = Recording(str(tmp_path / 'match.rec'))
+    assert sorted(recording.serials) == ['MOTOR', 'POWER', 'SERVO']
+    calls = [recording.read(offset) for offset in recording.calls('MOTOR')]
+    assert [call.method for call in calls][-2:] == ['channel0.forwards', 'channel1.brake']
+    assert calls[-2].args == ((MotorAction.FORWARDS, 0.5),)
+    servo_calls = [recording.read(offset) for offset in recording.calls('SERVO')]
+    assert servo_calls[-1].method == 'ultrasound_pulse'
+    assert servo_calls[-1].error == ('OSError', 'no echo')
+    assert all(call.duration >= 0 for call in servo_calls)
+    recording.close()
+
+
+def test_recordings_cut_short_are_read_up_to_the_last_complete_record(tmp_path):
+    path = tmp_path / 'match.rec'
+    _record(path)
+    complete = Recording(str(path))
+    expected = [complete.read(offset) for offset in complete.calls('SERVO')][:-1]
+    complete.close()
+    with open(str(path), 'r+b') as f:
+        f.truncate(path.stat().st_size - 1)
+
+    recording = Recording(str(path))
+    calls = [recording.read(offset) for offset in recording.calls('SERVO')]
+    assert [call.method for call in calls] == [call.method for call in expected]
+    recording.close()
+
+
+def test_records_are_flushed_without_closing(tmp_path):
+    path = tmp_path / 'match.rec'
+    recorder = Recorder(str(path), flush_size=1)
+    recorder.observe('SERVO', 'set_servo', (0, 50), None, None, 0.0, 0.001)
+    recording = Recording(str(path))
+    assert [recording.read(offset).args for offset in recording.calls('SERVO')] == [
+        (0, 50),
+    ]
+    recording.close()
+    recorder.close()
+
+
+def test_replay_reproduces_the_recorded_session(tmp_path):
+    _record(tmp_path / 'match.rec')
+    backend = ReplayRobot(str(tmp_path / 'match.rec'), strict=True)
+    robot = Robot(wait_for_start_button=False, backend=backend)
+    assert len(robot.servo_boards['SERVO'].servos) == 16
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.motor_boards['MOTOR'].m1 = BRAKE
+    robot.servo_boards['SERVO'].servos[3].position = -0.5
+    robot.servo_boards['SERVO'].gpios[2].mode = PinMode.INPUT
+    with pytest.raises(RecordedError, match='no echo'):
+        robot.servo_boards['SERVO'].read_ultrasound(0, 1)
+    assert backend.divergences == []
+    backend.close()
+
+
+def test_replay_reports_divergent_arguments(tmp_path):
+    _record(tmp_path / 'match.rec')
+    backend = ReplayRobot(str(tmp_path / 'match.rec'))
+    robot = Robot(wait_for_start_button=False, backend=backend)
+    robot.motor_boards['MOTOR'].m0 = 0.25
+    assert len(backend.divergences) == 1
+    assert 'channel0.forwards' in backend.divergences[0]
+
+
+def test_replay_rejects_divergent_calls(tmp_path):
+    _record(tmp_path / 'match.rec')
+    robot = Robot(wait_for_start_button=False, backend=ReplayRobot(str(tmp_path / 'match.rec')))
+    with pytest.raises(ReplayDivergence):
+        robot.motor_boards['MOTOR'].m0 = BRAKE
+
+
+def test_replay_rejects_other_files(tmp_path):
+    (tmp_path / 'other').write_bytes(b'not a recording')
+    with pytest.raises(ValueError):
+        ReplayRobot(str(tmp_path / 'other'))
+
+
+def test_rescans_are_recorded_and_replayed(tmp_path):
+    path = str(tmp_path / 'rescan.rec')
+    backend = RecordingRobot(
+        DummyRobot(
+            motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+            power_boards={'POWER': DummyPowerBoard()},
+        ),
+        path,
+    )
+    robot = Robot(wait_for_start_button=False, backend=backend)
+    robot.rescan()
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    backend.close()
+
+    replay = ReplayRobot(path, strict=True)
+    robot = Robot(wait_for_start_button=False, backend=replay)
+    assert not robot.rescan()
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    assert replay.divergences == []
+    replay.close()
+
+
+def test_calls_which_cant_be_encoded_are_marked_unrecordable(tmp_path):
+    path = str(tmp_path / 'unrecordable.rec')
+    backend = RecordingRobot(DummyRobot(servo_assemblies={'SERVO': DummyServoAssembly()}), path)
+    servo_assembly = backend.servo_assemblies()['SERVO']
+    # The call still reaches the board, even though its arguments can't be recorded
+    servo_assembly.set_servo(1, object())
+    servo_assembly.set_servo(2, 0.5)
+    backend.close()
+
+    recording = Recording(path)
+    unrecordable, recorded = [recording.read(offset) for offset in recording.calls('SERVO')]
+    assert unrecordable.method == 'set_servo'
+    assert 'object' in unrecordable.unrecordable
+    assert recorded.args == (2, 0.5)
+    assert recorded.unrecordable is None
+    recording.close()
+
+
+def test_replays_poll_pins_the_same_way_as_recorded(tmp_path):
+    path = str(tmp_path / 'bulk.rec')
+    servo_assembly = DummyServoAssembly()
+    servo_assembly.bulk_digital_reads = False
+    backend = RecordingRobot(DummyRobot(servo_assemblies={'SERVO': servo_assembly}), path)
+    assert not backend.servo_assemblies()['SERVO'].bulk_digital_reads
+    backend.close()
+    assert not ReplayRobot(path).servo_assemblies()['SERVO'].bulk_digital_reads
+
+    with pytest.raises(ReplayDivergence):
+        ReplayRobot(path).servo_assemblies()['SERVO'].set_servo(1, 0.0)
@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pytest
+
+from robot import BRAKE, PinMode, PinValue, Robot
+from robot.backends.base import CommandResponse, MotorAction
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.backends.remote.broker import RobotBroker
+from robot.backends.remote.client import RemoteRobot
+
+
+class CountingMotorBoard(DummyMotorBoard):
+    def __init__(self, channels):
+        super().__init__(channels)
+        self.batches = []
+
+    def apply_commands(self, commands):
+        self.batches.append(dict(commands))
+        super().apply_commands(commands)
+
+
+class ExclusiveServoAssembly(DummyServoAssembly):
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.most_active = 0
+
+    def gpio_read_analogue(self, pin):
+        self.active += 1
+        self.most_active = max(self.most_active, self.active)
+        time.sleep(0.001)
+        self.active -= 1
+        return super().gpio_read_analogue(pin)
+
+
+def _handle_command(args):
+    if args[0] == b'echo':
+        return CommandResponse(message=b' '.join(args[1:]), error=False)
+    return CommandResponse(message=b'bad command', error=True)
+
+
+@pytest.fixture
+def backend():
+    return DummyRobot(
+        motor_boards={'MOTOR': CountingMotorBoard([DummyMotorChannel() for _ in range(2)])},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={
+            'SERVO': DummyServoAssembly(
+                num_servos=4, num_pins=4, command_handler=_handle_command,
+            ),
+        },
+    )
+
+
+@pytest.fixture
+def broker(backend, tmp_path):
+    with RobotBroker(backend, str(tmp_path / 'robot.sock')) as broker:
+        yield broker
+
+
+def _get_robot(broker):
+    remote = RemoteRobot(broker.path)
+    return Robot(wait_for_start_button=False, backend=remote), remote
+
+
+def test_boards_are_described(broker):
+    robot, remote = _get_robot(broker)
+    assert list(robot.motor_boards) == ['MOTOR']
+    assert list(robot.servo_boards) == ['SERVO']
+    assert len(robot.servo_boards['SERVO'].servos) == 4
+    assert len(robot.servo_boards['SERVO'].gpios) == 4
+    assert robot.servo_boards['SERVO'].edge_watcher.bulk_reads
+    remote.close()
+
+
+def test_outputs_reach_the_backend(backend, broker):
+    robot, remote = _get_robot(broker)
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.motor_boards['MOTOR'].m1 = BRAKE
+    robot.servo_boards['SERVO'].servos[1].position = 1
+    robot.servo_boards['SERVO'].gpios[2].mode = PinMode.OUTPUT_HIGH
+    motor_board = backend.motor_boards()['MOTOR']
+    assert [channel.output for channel in motor_board.channels()] == [0.5, None]
+    assert backend.servo_assemblies()['SERVO'].servos[1] == 100
+    assert backend.servo_assemblies()['SERVO'].pin_modes[2] == 'output_high'
+    remote.close()
+
+
+def test_inputs_are_read_from_the_backend(backend, broker):
+    servo_assembly = backend.servo_assemblies()['SERVO']
+    servo_assembly.digital_values[3] = True
+    servo_assembly.analogue_values[0] = 2.5
+    servo_assembly.ultrasound_times[1] = 0.01
+    robot, remote = _get_robot(broker)
+    assert robot.servo_boards['SERVO'].gpios[3].read() == PinValue.HIGH
+    assert robot.servo_boards['SERVO'].read_all_pins()[3] == PinValue.HIGH
+    assert robot.servo_boards['SERVO'].gpios[0].read_analogue() == 2.5
+    assert robot.servo_boards['SERVO'].read_ultrasound(0, 1) == 0.01
+    assert robot.servo_boards['SERVO'].direct_command('echo', 'hi') == 'hi'
+    assert robot.power_board.read_battery() == (12.6, 0.0)
+    with pytest.raises(RuntimeError):
+        robot.servo_boards['SERVO'].direct_command('nonsense')
+    remote.close()
+
+
+def test_transactions_are_sent_in_one_batch(backend, broker):
+    robot, remote = _get_robot(broker)
+    with robot.transaction():
+        robot.motor_boards['MOTOR'].m0 = 0.25
+        robot.motor_boards['MOTOR'].m1 = 0.75
+    assert backend.motor_boards()['MOTOR'].batches == [
+        {0: (MotorAction.FORWARDS, 0.25), 1: (MotorAction.FORWARDS, 0.75)},
+    ]
+    remote.close()
+
+
+def test_errors_are_raised_in_the_client(broker):
+    _, remote = _get_robot(broker)
+    with pytest.raises(RuntimeError):
+        remote.servo_assemblies()['SERVO'].gpio_read_digital(10)
+    remote.close()
+
+
+def test_several_clients_share_the_backend(backend, broker):
+    first, first_remote = _get_robot(broker)
+    second, second_remote = _get_robot(broker)
+    assert broker.clients == 2
+    first.servo_boards['SERVO'].servos[0].position = -1
+    second.servo_boards['SERVO'].servos[3].position = 1
+    assert backend.servo_assemblies()['SERVO'].servos == [0, None, None, 100]
+    first_remote.close()
+    second_remote.close()
+
+
+def test_second_client_leaves_the_power_on(backend, broker):
+    first_remote = RemoteRobot(broker.path)
+    first = Robot(backend=first_remote)
+    first.motor_boards['MOTOR'].m0 = 0.5
+    power_board = backend.power_boards()['POWER']
+    assert power_board.outputs
+
+    second_remote = RemoteRobot(broker.path)
+    second = Robot(backend=second_remote)
+    assert second.power_board.wait_start(timeout=1)
+    assert power_board.outputs
+    motor_board = backend.motor_boards()['MOTOR']
+    assert motor_board.channels()[0].output == 0.5
+
+    second_remote.power_boards()['POWER'].disable_outputs()
+    assert power_board.outputs
+    first_remote.close()
+    second_remote.close()
+
+
+def test_concurrent_clients_call_each_board_in_turn(tmp_path):
+    servo_assembly = ExclusiveServoAssembly()
+    backend = DummyRobot(
+        motor_boards={},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={'SERVO': servo_assembly},
+    )
+    with RobotBroker(backend, str(tmp_path / 'robot.sock')) as broker:
+        remotes = [RemoteRobot(broker.path) for _ in range(2)]
+        reads = []
+
+        def read(remote):
+            remote.setup()
+            for _ in range(20):
+                reads.append(remote.servo_assemblies()['SERVO'].gpio_read_analogue(0))
+
+        threads = [threading.Thread(target=read, args=(remote,)) for remote in remotes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for remote in remotes:
+            remote.close()
+    assert len(reads) == 40
+    assert servo_assembly.most_active == 1
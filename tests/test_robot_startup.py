@@ -0,0 +1,53 @@
+import time
+
+from robot import Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+
+
+class SlowServoAssembly(DummyServoAssembly):
+    def __init__(self):
+        super().__init__()
+        self.num_servos_calls = 0
+
+    def num_servos(self):
+        self.num_servos_calls += 1
+        time.sleep(0.1)
+        return super().num_servos()
+
+
+def _get_backend(num_servo_boards):
+    return DummyRobot(
+        motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={
+            'SERVO{}'.format(n): SlowServoAssembly() for n in range(num_servo_boards)
+        },
+    )
+
+
+def test_boards_are_constructed_concurrently():
+    start = time.monotonic()
+    robot = Robot(wait_for_start_button=False, backend=_get_backend(4))
+    assert time.monotonic() - start < 0.3
+    assert sorted(robot.servo_boards) == ['SERVO0', 'SERVO1', 'SERVO2', 'SERVO3']
+    assert list(robot.motor_boards) == ['MOTOR']
+    assert robot.power_board.serial == 'POWER'
+
+
+def test_servo_count_is_only_queried_once():
+    backend = _get_backend(1)
+    Robot(wait_for_start_button=False, backend=backend)
+    assert backend.servo_assemblies()['SERVO0'].num_servos_calls == 1
+
+
+def test_startup_timings_are_recorded():
+    robot = Robot(backend=_get_backend(2))
+    assert set(robot.startup_timings) == {'setup', 'discovery', 'boards', 'wait_start'}
+    assert set(robot.board_startup_timings) == {'POWER', 'MOTOR', 'SERVO0', 'SERVO1'}
+    assert robot.board_startup_timings['SERVO0'] >= 0.1
@@ -1,3 +1,28 @@
+import subprocess
+import sys
+
+
 def test_base_import():
     import robot
 
+
+def test_base_import_is_lazy():
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            '-c',
+            'import sys, robot; print(sorted(m for m in sys.modules if m.startswith("robot")))',
+        ],
+        universal_newlines=True,
+    )
+    assert output.strip() == "['robot']"
+
+
+def test_lazy_names_resolve():
+    import robot
+    from robot.motor import MotorDriveSpecialState
+    from robot.robot import Robot
+
+    assert robot.BRAKE is MotorDriveSpecialState.BRAKE
+    assert robot.Robot is Robot
+    assert 'PinMode' in dir(robot)
@@ -0,0 +1,108 @@
+import sys
+
+import pytest
+
+from robot import BRAKE, COAST, PinMode, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.state import StateKind, StateSnapshot
+
+
+def _get_robot():
+    return Robot(
+        wait_for_start_button=False,
+        backend=DummyRobot(
+            motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+            power_boards={'POWER': DummyPowerBoard()},
+            servo_assemblies={'SERVO': DummyServoAssembly(num_servos=4, num_pins=4)},
+        ),
+    )
+
+
+def test_every_value_is_in_the_store():
+    robot = _get_robot()
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.servo_boards['SERVO'].servos[1].position = -1
+    robot.servo_boards['SERVO'].gpios[2].mode = PinMode.OUTPUT_HIGH
+    values = robot.state.snapshot().as_dict()
+    assert len(values) == 10
+    assert values[StateKind.MOTOR, 'MOTOR', 0] == 0.5
+    assert values[StateKind.MOTOR, 'MOTOR', 1] == COAST
+    assert values[StateKind.SERVO, 'SERVO', 0] is None
+    assert values[StateKind.SERVO, 'SERVO', 1] == -1
+    assert values[StateKind.GPIO, 'SERVO', 2] == PinMode.OUTPUT_HIGH
+    assert values[StateKind.GPIO, 'SERVO', 3] == PinMode.INPUT
+
+
+def test_slots_are_found_by_key():
+    robot = _get_robot()
+    slot = robot.state.slot(StateKind.GPIO, 'SERVO', 3)
+    assert robot.state.keys[slot] == (StateKind.GPIO, 'SERVO', 3)
+    with pytest.raises(ValueError):
+        robot.state.slot(StateKind.GPIO, 'SERVO', 4)
+
+
+def test_invalid_servo_positions_are_not_stored():
+    robot = _get_robot()
+    servo = robot.servo_boards['SERVO'].servos[1]
+    servo.position = 0.5
+    with pytest.raises(ValueError):
+        servo.position = 2
+    assert servo.position == 0.5
+
+
+def test_boards_are_slotted():
+    robot = _get_robot()
+    with pytest.raises(AttributeError):
+        robot.servo_boards['SERVO'].unknown = 1
+
+
+def test_snapshots_are_copies():
+    robot = _get_robot()
+    before = robot.state.snapshot()
+    robot.motor_boards['MOTOR'].m1 = BRAKE
+    assert before.as_dict()[StateKind.MOTOR, 'MOTOR', 1] == COAST
+
+
+@pytest.mark.parametrize('numpy', [True, False], ids=['numpy', 'fallback'])
+def test_diff(numpy, monkeypatch):
+    if numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setitem(sys.modules, 'numpy', None)
+    robot = _get_robot()
+    before = robot.state.snapshot()
+    assert robot.state.snapshot().diff(before) == {}
+    robot.motor_boards['MOTOR'].m1 = BRAKE
+    robot.servo_boards['SERVO'].servos[3].position = 0.25
+    robot.servo_boards['SERVO'].gpios[0].mode = PinMode.INPUT
+    assert robot.state.snapshot().diff(before) == {
+        (StateKind.MOTOR, 'MOTOR', 1): (COAST, BRAKE),
+        (StateKind.SERVO, 'SERVO', 3): (None, 0.25),
+    }
+
+
+def test_serialisation_round_trips():
+    robot = _get_robot()
+    robot.servo_boards['SERVO'].servos[0].position = 0.75
+    snapshot = robot.state.snapshot()
+    restored = StateSnapshot.from_bytes(snapshot.to_bytes(), snapshot.keys)
+    assert restored.as_dict() == snapshot.as_dict()
+    assert restored.timestamp == snapshot.timestamp
+
+
+def test_aborted_transactions_restore_the_store():
+    robot = _get_robot()
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    before = robot.state.snapshot()
+    with pytest.raises(ZeroDivisionError):
+        with robot.transaction():
+            robot.motor_boards['MOTOR'].m0 = -0.5
+            robot.servo_boards['SERVO'].servos[0].position = 1
+            1 / 0
+    assert robot.state.snapshot().diff(before) == {}
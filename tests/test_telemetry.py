@@ -0,0 +1,156 @@
+import os
+import threading
+
+import pytest
+
+from robot import BRAKE, PinMode, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.state import StateKind, StateStore
+from robot.telemetry import TelemetryClient, TelemetryPublisher
+
+
+@pytest.fixture
+def robot():
+    servo_assembly = DummyServoAssembly(num_servos=4, num_pins=4)
+    robot = Robot(
+        wait_for_start_button=False,
+        backend=DummyRobot(
+            motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+            power_boards={'POWER': DummyPowerBoard()},
+            servo_assemblies={'SERVO': servo_assembly},
+        ),
+        telemetry='robot-test-{pid}'.format(pid=os.getpid()),
+    )
+    robot.servo_assembly = servo_assembly
+    yield robot
+    robot.telemetry.close()
+
+
+def test_client_reads_published_state(robot):
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.motor_boards['MOTOR'].m1 = BRAKE
+    robot.servo_boards['SERVO'].gpios[2].mode = PinMode.OUTPUT_HIGH
+    robot.telemetry.publish()
+    client = TelemetryClient(robot.telemetry.name)
+    try:
+        assert client.keys == robot.state.keys
+        assert client.get(StateKind.MOTOR, 'MOTOR', 0) == 0.5
+        assert client.get(StateKind.MOTOR, 'MOTOR', 1) == BRAKE
+        assert client.get(StateKind.GPIO, 'SERVO', 2) == PinMode.OUTPUT_HIGH
+        assert client.snapshot().as_dict() == robot.state.snapshot().as_dict()
+    finally:
+        client.close()
+
+
+def test_gpio_readings_are_published(robot):
+    robot.servo_assembly.analogue_values[1] = 3.5
+    robot.servo_boards['SERVO'].gpios[1].read_analogue()
+    robot.telemetry.publish()
+    client = TelemetryClient(robot.telemetry.name)
+    try:
+        assert client.reading('SERVO', 1) == 3.5
+        assert client.get(StateKind.GPIO, 'SERVO', 1) == PinMode.INPUT
+    finally:
+        client.close()
+
+
+def test_gpio_readings_are_only_recorded_while_published(robot):
+    robot.servo_assembly.analogue_values[1] = 3.5
+    robot.telemetry.close()
+    robot.servo_boards['SERVO'].gpios[1].read_analogue()
+    assert robot.state.values[robot.state.slot(StateKind.GPIO, 'SERVO', 1)] == 0.0
+    robot.telemetry = TelemetryPublisher(robot.state)
+
+
+def test_publishes_in_the_background(robot):
+    client = TelemetryClient(robot.telemetry.name)
+    try:
+        robot.motor_boards['MOTOR'].m0 = 0.25
+        for _ in range(200):
+            if client.get(StateKind.MOTOR, 'MOTOR', 0) == 0.25:
+                break
+            threading.Event().wait(0.01)
+        assert client.get(StateKind.MOTOR, 'MOTOR', 0) == 0.25
+    finally:
+        client.close()
+
+
+def test_reads_wait_for_publishing_to_finish(robot):
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.telemetry.publish()
+    client = TelemetryClient(robot.telemetry.name)
+    publisher = robot.telemetry
+    try:
+        with publisher._lock:
+            # Mid-publish, as far as the client can tell
+            publisher._sequence += 1
+            publisher._write_header()
+            finished = []
+            reader = threading.Thread(
+                target=lambda: finished.append(client.get(StateKind.MOTOR, 'MOTOR', 0)),
+            )
+            reader.start()
+            reader.join(0.1)
+            assert not finished
+            publisher._sequence += 1
+            publisher._write_header()
+        reader.join()
+        assert finished == [0.5]
+    finally:
+        client.close()
+
+
+def test_close_removes_the_segment():
+    publisher = TelemetryPublisher(StateStore())
+    name = publisher.name
+    publisher.close()
+    with pytest.raises(FileNotFoundError):
+        TelemetryClient(name)
+
+
+def test_readers_are_told_when_publishing_fails():
+    state = StateStore()
+    state.allocate(StateKind.MOTOR, 'MOTOR', 2, 0)
+    publisher = TelemetryPublisher(state, rate=1000, capacity=2)
+    client = TelemetryClient(publisher.name)
+    try:
+        state.allocate(StateKind.MOTOR, 'HOTPLUGGED', 2, 0)
+        for _ in range(200):
+            if publisher.error is not None:
+                break
+            threading.Event().wait(0.01)
+        assert isinstance(publisher.error, RuntimeError)
+        with pytest.raises(RuntimeError):
+            client.snapshot()
+    finally:
+        client.close()
+        publisher.close()
+
+
+def test_torn_reads_which_miss_a_key_are_retried(robot):
+    robot.telemetry.publish()
+    client = TelemetryClient(robot.telemetry.name)
+    publisher = robot.telemetry
+    attempts = []
+
+    def reader(codes, values, count):
+        attempts.append(count)
+        if len(attempts) == 1:
+            # A publish completing mid-read
+            with publisher._lock:
+                publisher._sequence += 2
+                publisher._write_header()
+            raise KeyError('MOTOR')
+        return count
+
+    try:
+        assert client.read(reader) == len(robot.state)
+        assert len(attempts) == 2
+    finally:
+        client.close()
@@ -0,0 +1,120 @@
+import json
+import threading
+
+import pytest
+
+from robot import PinMode, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+from robot.tracing import Tracer
+
+
+def _get_robot(tracer):
+    backend = DummyRobot(
+        motor_boards={'MOTOR': DummyMotorBoard([DummyMotorChannel() for _ in range(2)])},
+        power_boards={'POWER': DummyPowerBoard()},
+        servo_assemblies={'SERVO': DummyServoAssembly()},
+    )
+    return Robot(wait_for_start_button=False, backend=backend, tracer=tracer)
+
+
+def test_frontend_and_backend_operations_are_traced():
+    tracer = Tracer()
+    robot = _get_robot(tracer)
+    tracer.clear()
+
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    robot.servo_boards['SERVO'].servos[1].position = 0.25
+    robot.servo_boards['SERVO'].gpios[2].mode = PinMode.INPUT
+    robot.servo_boards['SERVO'].gpios[2].read()
+    robot.servo_boards['SERVO'].read_ultrasound(0, 1)
+
+    spans = [(span.category, span.name, span.board) for span in tracer.spans()]
+    assert spans == [
+        ('backend', 'channel0.forwards', 'MOTOR'),
+        ('frontend', 'MotorBoard.set_output', 'MOTOR'),
+        ('backend', 'set_servo', 'SERVO'),
+        ('frontend', 'ServoBoard.set_servo', 'SERVO'),
+        ('backend', 'gpio_set_input', 'SERVO'),
+        ('backend', 'gpio_read_digital', 'SERVO'),
+        ('frontend', 'GPIOPin.read', 'SERVO'),
+        ('backend', 'ultrasound_pulse', 'SERVO'),
+        ('frontend', 'ServoBoard.read_ultrasound', 'SERVO'),
+    ]
+    frontend, backend = tracer.spans()[1], tracer.spans()[0]
+    assert frontend.start <= backend.start
+    assert backend.start + backend.duration <= frontend.start + frontend.duration
+
+
+def test_keyword_arguments_reach_traced_methods():
+    for tracer in [Tracer(), Tracer(enabled=False)]:
+        robot = _get_robot(tracer)
+        robot.servo_boards['SERVO'].read_ultrasound(output_pin=0, input_pin=1)
+
+
+def test_ring_buffer_keeps_the_newest_spans():
+    tracer = Tracer(3)
+    for n in range(5):
+        with tracer.span('span{}'.format(n)):
+            pass
+    assert len(tracer) == 3
+    assert tracer.dropped == 2
+    assert [span.name for span in tracer.spans()] == ['span2', 'span3', 'span4']
+
+
+def test_nothing_is_recorded_while_disabled():
+    tracer = Tracer(enabled=False)
+    robot = _get_robot(tracer)
+    robot.motor_boards['MOTOR'].m0 = 0.5
+    with tracer.span('user'):
+        pass
+    tracer.observe('MOTOR', 'channel0.forwards', (0.5,), None, None, 0.0, 0.001)
+    assert len(tracer) == 0
+
+
+def test_clearing_forgets_threads():
+    tracer = Tracer()
+    with tracer.span('user'):
+        pass
+    tracer.clear()
+    assert tracer.chrome_trace()['traceEvents'] == []
+    assert tracer._thread_names == {}
+
+
+def test_chrome_trace_export(tmp_path):
+    tracer = Tracer()
+
+    def work():
+        with tracer.span('worker', board='SERVO'):
+            pass
+
+    thread = threading.Thread(target=work, name='worker-thread')
+    thread.start()
+    thread.join()
+    with tracer.span('main'):
+        pass
+
+    path = str(tmp_path / 'trace.json')
+    tracer.write_chrome_trace(path)
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+
+    spans = [event for event in events if event['ph'] == 'X']
+    assert [event['name'] for event in spans] == ['worker', 'main']
+    assert spans[0]['args'] == {'board': 'SERVO'}
+    assert spans[0]['tid'] != spans[1]['tid']
+    assert spans[0]['ts'] <= spans[1]['ts']
+    names = {
+        event['tid']: event['args']['name'] for event in events if event['ph'] == 'M'
+    }
+    assert names[spans[0]['tid']] == 'worker-thread'
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        Tracer(0)
@@ -0,0 +1,51 @@
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from robot.servo import ServoBoard  # noqa: E402
+from robot.trajectory import Profile, Trajectory  # noqa: E402
+
+
+def test_linear_trajectory_interpolates_between_keyframes():
+    trajectory = Trajectory.plan([0, 1], [0.0, 1.0], [[-1.0, 0.0], [1.0, 0.5]], rate=4)
+    assert len(trajectory) == 5
+    assert numpy.allclose(trajectory.positions[:, 0], [-1.0, -0.5, 0.0, 0.5, 1.0])
+    assert numpy.allclose(trajectory.positions[:, 1], [0.0, 0.125, 0.25, 0.375, 0.5])
+    assert trajectory.mapped_positions[:, 0].tolist() == [0, 25, 50, 75, 100]
+
+
+def test_mapping_matches_single_servo_mapping():
+    values = numpy.linspace(-1.0, 1.0, 201)
+    trajectory = Trajectory(list(range(201)), 1.0, values[numpy.newaxis, :])
+    expected = [ServoBoard._position_for_value(value) for value in values.tolist()]
+    assert trajectory.mapped_positions[0].tolist() == expected
+
+
+@pytest.mark.parametrize('profile', [Profile.CUBIC, Profile.TRAPEZOIDAL])
+def test_eased_profiles_start_slowly_and_hit_keyframes(profile):
+    trajectory = Trajectory.plan(
+        [0], [0.0, 1.0, 2.0], [[0.0], [1.0], [0.0]], rate=10, profile=profile
+    )
+    positions = trajectory.positions[:, 0]
+    assert positions[0] == 0.0
+    assert positions[10] == pytest.approx(1.0)
+    assert positions[20] == pytest.approx(0.0)
+    assert positions[1] < 0.1
+    assert numpy.all(numpy.diff(positions[:11]) >= 0)
+
+
+def test_out_of_range_keyframes_are_rejected():
+    with pytest.raises(ValueError):
+        Trajectory.plan([0], [0.0, 1.0], [[0.0], [1.5]], rate=10)
+
+
+def test_playback_makes_one_write_per_tick(batch_counting_servo_assembly):
+    backend = batch_counting_servo_assembly
+    board = ServoBoard('SERIAL', backend)
+    trajectory = Trajectory.plan([0, 2], [0.0, 0.05], [[-1.0, -1.0], [1.0, 0.0]], rate=200)
+    player = board.play_trajectory(trajectory)
+    assert len(backend.batches) == player.ticks_played
+    assert player.ticks_played + player.ticks_skipped == len(trajectory)
+    assert backend.servos[0] == 100
+    assert backend.servos[2] == 50
+    assert board.servos[0].position == 1.0
@@ -0,0 +1,121 @@
+import pytest
+
+from robot import BRAKE, Robot
+from robot.backends.dummy import (
+    DummyMotorBoard,
+    DummyMotorChannel,
+    DummyPowerBoard,
+    DummyRobot,
+    DummyServoAssembly,
+)
+
+
+class BatchingMotorBoard(DummyMotorBoard):
+    def __init__(self, channels):
+        super().__init__(channels)
+        self.batches = []
+
+    def apply_commands(self, commands):
+        self.batches.append(dict(commands))
+        super().apply_commands(commands)
+
+
+class BatchingServoAssembly(DummyServoAssembly):
+    def __init__(self):
+        super().__init__(num_servos=4)
+        self.batches = []
+
+    def set_servos(self, positions):
+        self.batches.append(dict(positions))
+        super().set_servos(positions)
+
+
+def _get_robot():
+    motor_backend = BatchingMotorBoard([DummyMotorChannel() for _ in range(2)])
+    servo_backend = BatchingServoAssembly()
+    robot = Robot(
+        wait_for_start_button=False,
+        backend=DummyRobot(
+            motor_boards={'MOTOR': motor_backend},
+            power_boards={'POWER': DummyPowerBoard()},
+            servo_assemblies={'SERVO': servo_backend},
+        ),
+    )
+    return robot, motor_backend, servo_backend
+
+
+def test_transaction_defers_writes_until_exit():
+    robot, motor_backend, servo_backend = _get_robot()
+    with robot.transaction():
+        robot.motor_boards['MOTOR'].m0 = 0.5
+        robot.motor_boards['MOTOR'].m1 = BRAKE
+        robot.servo_boards['SERVO'].servos[0].position = 1.0
+        robot.servo_boards['SERVO'].servos[3].position = -1.0
+        assert motor_backend.channels()[0].output == 0.0
+        assert servo_backend.servos[0] is None
+    assert motor_backend.channels()[0].output == 0.5
+    assert motor_backend.channels()[1].output is None
+    assert servo_backend.servos == [100, None, None, 0]
+    assert len(motor_backend.batches) == 1
+    assert len(servo_backend.batches) == 1
+
+
+def test_transaction_keeps_last_write_per_channel():
+    robot, motor_backend, _ = _get_robot()
+    with robot.transaction():
+        robot.motor_boards['MOTOR'].m0 = 0.5
+        robot.motor_boards['MOTOR'].m0 = 0.25
+        robot.motor_boards['MOTOR'].m1 = 0.75
+    assert len(motor_backend.batches) == 1
+    assert sorted(motor_backend.batches[0]) == [0, 1]
+    assert motor_backend.channels()[0].output == 0.25
+
+
+def test_transaction_rejects_invalid_values_immediately():
+    robot, motor_backend, _ = _get_robot()
+    with pytest.raises(ValueError):
+        with robot.transaction():
+            robot.motor_boards['MOTOR'].m0 = 0.5
+            robot.motor_boards['MOTOR'].m1 = 2.0
+    assert motor_backend.channels()[0].output == 0.0
+    assert motor_backend.batches == []
+
+
+def test_transaction_restores_states_on_error():
+    robot, _, servo_backend = _get_robot()
+    robot.servo_boards['SERVO'].servos[1].position = 0.0
+    with pytest.raises(RuntimeError):
+        with robot.transaction():
+            robot.motor_boards['MOTOR'].m0 = 0.5
+            robot.servo_boards['SERVO'].servos[1].position = 1.0
+            raise RuntimeError("abandon")
+    assert robot.motor_boards['MOTOR'].m0 != 0.5
+    assert robot.servo_boards['SERVO'].servos[1].position == 0.0
+    assert servo_backend.servos[1] == 50
+
+
+def test_failed_commit_restores_boards_which_did_not_commit():
+    robot, motor_backend, servo_backend = _get_robot()
+    robot.motor_boards['MOTOR'].m0 = 0.25
+
+    def fail(commands):
+        raise IOError('board unplugged')
+
+    motor_backend.apply_commands = fail
+    with pytest.raises(IOError):
+        with robot.transaction():
+            robot.motor_boards['MOTOR'].m0 = 0.5
+            robot.motor_boards['MOTOR'].m1 = 0.75
+            robot.servo_boards['SERVO'].servos[1].position = 1.0
+    assert robot.motor_boards['MOTOR'].m0 == 0.25
+    assert robot.motor_boards['MOTOR'].m1 != 0.75
+    assert robot.servo_boards['SERVO'].servos[1].position is None
+    assert servo_backend.servos[1] is None
+
+    # Later writes, outside a transaction, go straight to the boards
+    del motor_backend.apply_commands
+    robot.servo_boards['SERVO'].servos[1].position = 0.0
+    robot.motor_boards['MOTOR'].m1 = 0.5
+    assert servo_backend.servos[1] == 50
+    assert motor_backend.channels()[0].output == 0.25
+    assert motor_backend.channels()[1].output == 0.5
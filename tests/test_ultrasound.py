@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from robot.backends.dummy import DummyServoAssembly
+from robot.servo import ServoBoard
+from robot.ultrasound import UltrasoundFilter, UltrasoundScheduler
+
+
+def _scheduler_with_readings(readings, **kwargs):
+    readings = iter(readings)
+    return UltrasoundScheduler(lambda out_pin, in_pin: next(readings), [(0, 1)], **kwargs)
+
+
+def test_median_filter():
+    scheduler = _scheduler_with_readings([0.010, 0.050, 0.012], window=3)
+    assert scheduler.latest(0, 1) is None
+    for _ in range(3):
+        scheduler.range_once(0, 1)
+    assert scheduler.latest(0, 1).echo_time == 0.012
+
+
+def test_outlier_filter_discards_outliers():
+    scheduler = _scheduler_with_readings(
+        [0.010, 0.011, 0.050, 0.012], filter=UltrasoundFilter.OUTLIER, window=5
+    )
+    scheduler.range_once(0, 1)
+    scheduler.range_once(0, 1)
+    scheduler.range_once(0, 1)
+    assert scheduler.latest(0, 1).echo_time == 0.011
+    assert scheduler.rejected(0, 1) == 1
+    scheduler.range_once(0, 1)
+    assert scheduler.latest(0, 1).echo_time == 0.012
+
+
+def test_readings_convert_to_distance():
+    scheduler = _scheduler_with_readings([0.01], filter=UltrasoundFilter.NONE)
+    scheduler.range_once(0, 1)
+    assert abs(scheduler.latest(0, 1).distance - 1.715) < 1e-9
+
+
+def test_scheduler_ranges_sensors_in_the_background():
+    backend = DummyServoAssembly()
+    backend.ultrasound_times[1] = 0.01
+    backend.ultrasound_times[3] = 0.02
+    board = ServoBoard('SERIAL', backend)
+    with board.ultrasound_scheduler([(0, 1), (2, 3)], interval=0.001) as scheduler:
+        deadline = time.monotonic() + 1.0
+        while scheduler.latest(2, 3) is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+    assert scheduler.latest(0, 1).echo_time == 0.01
+    assert scheduler.latest(2, 3).echo_time == 0.02
+    assert scheduler.latest(2, 3).timestamp <= time.monotonic()
+
+
+def test_scheduler_rejects_pins_beyond_the_board():
+    backend = DummyServoAssembly()
+    board = ServoBoard('SERIAL', backend)
+    with pytest.raises(ValueError):
+        board.ultrasound_scheduler([(backend.gpio_num_pins(), 1)])